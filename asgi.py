@@ -0,0 +1,57 @@
+"""
+Modo de servicio ASGI
+
+Las consultas de la API que más se repiten (elementos por ID e informe de citas
+por fecha) se atienden con manejadores asíncronos y el driver asíncrono de la base
+de datos; el resto de la aplicación Flask se sirve a través de a2wsgi en un pool
+de hilos. Un informe lento espera a la base de datos sin ocupar un hilo, así que
+no deja sin atender a las consultas rápidas.
+
+Uso:
+    pip install -r requirements-async.txt
+    uvicorn asgi:app --host 0.0.0.0 --port 8000
+"""
+
+import asyncio
+import contextlib
+import os
+from dotenv import load_dotenv
+
+# Cargar variables de entorno antes de importar la configuración de la base de datos
+load_dotenv()
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from config.async_database import AsyncDatabaseConnection
+from web_app import create_app, cerrar_conexiones
+from web_controllers import arranque
+from web_controllers.api_async_routes import rutas
+
+
+aplicacion_web = create_app()
+
+
+@contextlib.asynccontextmanager
+async def ciclo_de_vida(app):
+    """
+    Abre el pool asíncrono y calienta la aplicación Flask al arrancar, y cierra
+    ambos pools al detener el servidor
+    """
+    db = AsyncDatabaseConnection()
+    if arranque.CALENTAR:
+        tiempos = await asyncio.to_thread(arranque.calentar, aplicacion_web)
+        print(f"Proceso {os.getpid()} {arranque.resumen(tiempos)}")
+    yield
+    await db.close()
+    cerrar_conexiones()
+
+
+app = Starlette(
+    routes=[
+        *rutas,
+        # Hilos para las rutas síncronas; conviene que no superen DB_POOL_SIZE
+        Mount('/', app=WSGIMiddleware(aplicacion_web, workers=int(os.getenv('ASGI_HILOS_WSGI', '10')))),
+    ],
+    lifespan=ciclo_de_vida,
+)
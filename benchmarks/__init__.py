@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+"""Benchmarks de rendimiento; se ejecutan en proceso sobre el backend SQLite"""
@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark del modo ASGI frente al modo WSGI bajo informes lentos
+
+Arranca el servidor dos veces sobre la misma base SQLite en archivo (modo WAL):
+primero la aplicación Flask sola (uvicorn --interface wsgi, un pool de hilos) y
+después asgi:app (manejadores asíncronos para la API). En ambos casos varios
+clientes piden sin pausa el informe de citas de todo el rango mientras otros
+consultan pacientes por ID, y se mide la latencia de estas consultas rápidas.
+
+Con WSGI cada informe ocupa un hilo durante toda la transferencia, así que las
+consultas rápidas esperan turno; con ASGI los informes solo ocupan una conexión
+(hasta DB_ASYNC_INFORMES a la vez) y las consultas rápidas siguen atendiéndose.
+
+Requiere requirements-async.txt.
+
+Uso:
+    python -m benchmarks.bench_asgi --citas 50000 --informes 12 --consultas 8 --segundos 10
+"""
+
+import argparse
+import http.client
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACIENTES = 2000
+MEDICOS = 50
+INICIO = datetime(2030, 1, 7, 8, 0)
+
+MODOS = {
+    'WSGI': ['--interface', 'wsgi', 'web_app:app'],
+    'ASGI': ['asgi:app'],
+}
+
+
+def crear_datos(ruta, citas, semilla=42):
+    """Crea la base de prueba en un subproceso, para no abrir conexiones en este"""
+    codigo = f"""
+import random
+from datetime import datetime, timedelta
+from config.database import DatabaseConnection
+aleatorio = random.Random({semilla})
+db = DatabaseConnection()
+cursor = db.get_cursor()
+cursor.executemany(
+    "INSERT INTO Paciente (Id, Nombre, Apellido, Cedula) VALUES (?, ?, ?, ?)",
+    ((i, f"Nombre{{i}}", f"Apellido{{i}}", str(1000000000 + i)) for i in range(1, {PACIENTES} + 1))
+)
+cursor.executemany(
+    "INSERT INTO Medico (Id, Nombre, Especialidad) VALUES (?, ?, ?)",
+    ((i, f"Médico {{i}}", "Medicina General") for i in range(1, {MEDICOS} + 1))
+)
+inicio = datetime({INICIO.year}, {INICIO.month}, {INICIO.day}, {INICIO.hour})
+cursor.executemany(
+    "INSERT INTO Cita (IdPaciente, IdMedico, FechaHora, Motivo) VALUES (?, ?, ?, ?)",
+    ((aleatorio.randint(1, {PACIENTES}), i % {MEDICOS} + 1, inicio + timedelta(minutes=30 * (i // {MEDICOS})), "Control")
+     for i in range({citas}))
+)
+db.commit()
+db.close()
+"""
+    subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, env=_entorno(ruta), check=True,
+                   stdout=subprocess.DEVNULL)
+
+
+def _entorno(ruta, hilos=10):
+    """Variables de entorno del servidor: misma base y mismos límites en ambos modos"""
+    entorno = dict(os.environ)
+    entorno.update({
+        'DB_BACKEND': 'sqlite',
+        'SQLITE_PATH': ruta,
+        'SQLITE_WAL': '1',
+        'DB_POOL_SIZE': str(hilos),
+        'DB_POOL_ASYNC_SIZE': str(hilos),
+        'ASGI_HILOS_WSGI': str(hilos),
+        'PYTHONPATH': RAIZ,
+    })
+    return entorno
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _esperar(puerto, limite=30):
+    """Espera a que el servidor acepte conexiones"""
+    fin = time.monotonic() + limite
+    while time.monotonic() < fin:
+        try:
+            with socket.create_connection(('127.0.0.1', puerto), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise Exception(f"El servidor no arrancó en {limite} segundos")
+
+
+def _pedir(conexion, ruta):
+    """Hace una petición GET y lee el cuerpo completo"""
+    conexion.request('GET', ruta)
+    respuesta = conexion.getresponse()
+    respuesta.read()
+    if respuesta.status != 200:
+        raise Exception(f"{ruta}: HTTP {respuesta.status}")
+
+
+def percentil(valores, p):
+    """Percentil p (0-100) por el método del rango más cercano"""
+    if not valores:
+        return float('nan')
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))]
+
+
+def medir_modo(modo, ruta, informes, consultas, segundos, hilos):
+    """
+    Arranca el servidor en un modo y lo somete a la carga mixta
+
+    Returns:
+        dict: Latencias de las consultas rápidas e informes completados
+    """
+    puerto = _puerto_libre()
+    servidor = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', '--port', str(puerto), '--log-level', 'warning', *MODOS[modo]],
+        cwd=RAIZ, env=_entorno(ruta, hilos)
+    )
+    try:
+        _esperar(puerto)
+        fin_informe = (INICIO + timedelta(days=3650)).strftime('%d-%m-%Y')
+        ruta_informe = f"/api/v1/citas/fecha?fecha_inicio={INICIO.strftime('%d-%m-%Y')}&fecha_fin={fin_informe}"
+        # Una pasada de calentamiento por ruta
+        calentamiento = http.client.HTTPConnection('127.0.0.1', puerto, timeout=120)
+        _pedir(calentamiento, '/api/v1/pacientes/1')
+        _pedir(calentamiento, ruta_informe)
+        calentamiento.close()
+
+        latencias = []
+        completados = [0]
+        errores = []
+        lock = threading.Lock()
+        parar = threading.Event()
+
+        def cliente_informes():
+            conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=120)
+            while not parar.is_set():
+                try:
+                    _pedir(conexion, ruta_informe)
+                    with lock:
+                        completados[0] += 1
+                except Exception as e:
+                    errores.append(str(e))
+                    conexion.close()
+
+        def cliente_consultas(semilla):
+            aleatorio = random.Random(semilla)
+            conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=120)
+            while not parar.is_set():
+                inicio = time.perf_counter()
+                try:
+                    _pedir(conexion, f"/api/v1/pacientes/{aleatorio.randint(1, PACIENTES)}")
+                except Exception as e:
+                    errores.append(str(e))
+                    conexion.close()
+                    continue
+                with lock:
+                    latencias.append(time.perf_counter() - inicio)
+
+        clientes = [threading.Thread(target=cliente_informes) for _ in range(informes)]
+        clientes += [threading.Thread(target=cliente_consultas, args=(i,)) for i in range(consultas)]
+        for cliente in clientes:
+            cliente.start()
+        time.sleep(segundos)
+        parar.set()
+        for cliente in clientes:
+            cliente.join()
+    finally:
+        servidor.terminate()
+        servidor.wait(30)
+
+    return {
+        'modo': modo,
+        'consultas': len(latencias),
+        'consultas_s': len(latencias) / segundos,
+        'p50_ms': percentil(latencias, 50) * 1000,
+        'p95_ms': percentil(latencias, 95) * 1000,
+        'p99_ms': percentil(latencias, 99) * 1000,
+        'informes': completados[0],
+        'errores': len(errores),
+    }
+
+
+def ejecutar(citas=50000, informes=12, consultas=8, segundos=10, hilos=10):
+    """
+    Ejecuta el benchmark en los dos modos
+
+    Returns:
+        dict: Configuración y resultados de cada modo
+    """
+    directorio = tempfile.mkdtemp(prefix='bench_asgi_')
+    try:
+        ruta = os.path.join(directorio, 'clinica.db')
+        crear_datos(ruta, citas)
+        resultados = [medir_modo(modo, ruta, informes, consultas, segundos, hilos) for modo in MODOS]
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+    return {
+        'citas': citas, 'informes': informes, 'consultas': consultas,
+        'segundos': segundos, 'hilos': hilos, 'resultados': resultados,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--citas', type=int, default=50000)
+    parser.add_argument('--informes', type=int, default=12, help="Clientes pidiendo el informe sin pausa")
+    parser.add_argument('--consultas', type=int, default=8, help="Clientes consultando pacientes por ID")
+    parser.add_argument('--segundos', type=float, default=10)
+    parser.add_argument('--hilos', type=int, default=10, help="Hilos WSGI y conexiones del pool")
+    args = parser.parse_args()
+
+    resultado = ejecutar(args.citas, args.informes, args.consultas, args.segundos, args.hilos)
+    print(f"\n===== WSGI vs ASGI ({resultado['citas']} citas, {resultado['informes']} clientes de informes, "
+          f"{resultado['consultas']} de consultas, {resultado['hilos']} hilos, {resultado['segundos']:g} s) =====\n")
+    print(f"{'Modo':<6}{'consultas/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'informes':>10}{'errores':>9}")
+    for fila in resultado['resultados']:
+        print(f"{fila['modo']:<6}{fila['consultas_s']:>12.1f}{fila['p50_ms']:>10.1f}{fila['p95_ms']:>10.1f}"
+              f"{fila['p99_ms']:>10.1f}{fila['informes']:>10}{fila['errores']:>9}")
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark de la búsqueda de huecos libres por especialidad
+
+Compara la estrategia ingenua (una consulta por médico y por día, en orden de
+fecha, hasta reunir los huecos pedidos) con DisponibilidadController, que lee
+las citas de todos los médicos con una consulta por ventana de días y mezcla
+las agendas en un único recorrido ordenado.
+
+Se ejecuta siempre sobre una base SQLite en memoria; en SQL Server cada consulta
+añade además la latencia de red, por lo que la diferencia en número de consultas
+pesa más que aquí.
+
+Uso:
+    python -m benchmarks.bench_espacios --medicos 200 --dias 90
+"""
+
+import os
+
+# La base de prueba se crea en memoria, nunca sobre la configurada en .env
+os.environ['DB_BACKEND'] = 'sqlite'
+os.environ['SQLITE_PATH'] = ':memory:'
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from config.database import DatabaseConnection
+from controllers.disponibilidad_controller import (
+    DisponibilidadController, EspacioLibre, espacios_medico, HORARIO_APERTURA, HORARIO_CIERRE, DIAS_ATENCION
+)
+from models.cita import Cita, DURACION_CITA_MINUTOS
+from models.medico import Medico
+
+ESPECIALIDAD = "Medicina General"
+# Lunes; las fechas están en el futuro para que no se recorten por la hora actual
+INICIO = datetime(2030, 1, 7)
+
+
+def crear_datos(medicos, dias, ocupacion, semilla=42):
+    """
+    Llena la base en memoria con médicos y citas en su horario de atención
+
+    Returns:
+        int: Número de citas creadas
+    """
+    aleatorio = random.Random(semilla)
+    db = DatabaseConnection()
+    cursor = db.get_cursor()
+    cursor.executemany(
+        "INSERT INTO Paciente (Id, Nombre, Apellido, Cedula) VALUES (?, ?, ?, ?)",
+        ((i, f"Nombre{i}", f"Apellido{i}", str(1000000000 + i)) for i in range(1, 1001))
+    )
+    cursor.executemany(
+        "INSERT INTO Medico (Id, Nombre, Especialidad) VALUES (?, ?, ?)",
+        ((i, f"Médico {i}", ESPECIALIDAD) for i in range(1, medicos + 1))
+    )
+    duracion = timedelta(minutes=DURACION_CITA_MINUTOS)
+    citas = []
+    for dia in range(dias):
+        fecha = INICIO + timedelta(days=dia)
+        if fecha.weekday() not in DIAS_ATENCION:
+            continue
+        hora = datetime.combine(fecha.date(), HORARIO_APERTURA)
+        cierre = datetime.combine(fecha.date(), HORARIO_CIERRE)
+        while hora + duracion <= cierre:
+            for id_medico in range(1, medicos + 1):
+                if aleatorio.random() < ocupacion:
+                    citas.append((aleatorio.randint(1, 1000), id_medico, hora, "Control"))
+            hora += duracion
+    cursor.executemany(
+        "INSERT INTO Cita (IdPaciente, IdMedico, FechaHora, Motivo) VALUES (?, ?, ?, ?)", citas
+    )
+    db.commit()
+    return len(citas)
+
+
+def busqueda_ingenua(dias, limite):
+    """
+    Una consulta por médico y día, avanzando día a día hasta completar el límite
+
+    Returns:
+        tuple: (huecos encontrados, consultas ejecutadas)
+    """
+    medicos = Medico.obtener_por_especialidad(ESPECIALIDAD)
+    duracion = timedelta(minutes=DURACION_CITA_MINUTOS)
+    espacios = []
+    consultas = 0
+    for dia in range(dias):
+        desde = INICIO + timedelta(days=dia)
+        hasta = desde + timedelta(days=1)
+        del_dia = []
+        for medico in medicos:
+            horario = Cita.obtener_horarios([medico.id], desde - duracion, hasta)[medico.id]
+            consultas += 1
+            for inicio in espacios_medico(horario, desde, hasta, duracion, duracion):
+                del_dia.append(EspacioLibre(inicio, inicio + duracion, medico))
+        del_dia.sort(key=lambda espacio: (espacio.inicio, espacio.medico.id))
+        espacios.extend(del_dia)
+        if limite is not None and len(espacios) >= limite:
+            return espacios[:limite], consultas
+    return espacios, consultas
+
+
+def busqueda_actual(dias, limite):
+    """
+    DisponibilidadController.buscar_espacios_libres, contando sus consultas de citas
+
+    Returns:
+        tuple: (huecos encontrados, consultas ejecutadas)
+    """
+    consultas = 0
+    original = Cita.obtener_horarios
+
+    def contar(*args, **kwargs):
+        nonlocal consultas
+        consultas += 1
+        return original(*args, **kwargs)
+
+    Cita.obtener_horarios = contar
+    try:
+        exito, espacios = DisponibilidadController.buscar_espacios_libres(
+            ESPECIALIDAD,
+            INICIO.strftime('%d-%m-%Y'),
+            (INICIO + timedelta(days=dias - 1)).strftime('%d-%m-%Y'),
+            limite=limite,
+            ahora=INICIO
+        )
+    finally:
+        Cita.obtener_horarios = original
+    if not exito:
+        raise Exception(espacios)
+    return espacios, consultas
+
+
+def medir(funcion, repeticiones, *args):
+    """Devuelve el mejor tiempo de varias ejecuciones y el último resultado"""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(*args)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+
+def ejecutar(medicos=200, dias=90, ocupacion=0.85, repeticiones=3, limites=(20, None)):
+    """
+    Ejecuta el benchmark
+
+    Returns:
+        dict: Tiempo y consultas de cada estrategia para cada límite
+    """
+    citas = crear_datos(medicos, dias, ocupacion)
+    resultados = []
+    for limite in limites:
+        t_ingenua, (espacios_ingenua, consultas_ingenua) = medir(busqueda_ingenua, repeticiones, dias, limite)
+        t_actual, (espacios_actual, consultas_actual) = medir(busqueda_actual, repeticiones, dias, limite)
+        # Ambas estrategias deben devolver exactamente los mismos huecos
+        iguales = [(e.inicio, e.medico.id) for e in espacios_ingenua] == \
+                  [(e.inicio, e.medico.id) for e in espacios_actual]
+        resultados.append({
+            'limite': limite,
+            'espacios': len(espacios_actual),
+            'ingenua_s': t_ingenua,
+            'ingenua_consultas': consultas_ingenua,
+            'actual_s': t_actual,
+            'actual_consultas': consultas_actual,
+            'mejora': t_ingenua / t_actual,
+            'iguales': iguales,
+        })
+    return {'medicos': medicos, 'dias': dias, 'citas': citas, 'resultados': resultados}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--medicos', type=int, default=200)
+    parser.add_argument('--dias', type=int, default=90)
+    parser.add_argument('--ocupacion', type=float, default=0.85)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    resultado = ejecutar(args.medicos, args.dias, args.ocupacion, args.repeticiones)
+    print(f"\n===== HUECOS LIBRES ({resultado['medicos']} médicos x {resultado['dias']} días, "
+          f"{resultado['citas']} citas) =====\n")
+    for fila in resultado['resultados']:
+        limite = fila['limite'] or 'todos'
+        print(f"Límite {limite} ({fila['espacios']} huecos, resultados iguales: {'sí' if fila['iguales'] else 'NO'})")
+        print(f"  Por médico y día:   {fila['ingenua_s'] * 1000:>10.1f} ms  {fila['ingenua_consultas']:>6} consultas")
+        print(f"  Consulta por lotes: {fila['actual_s'] * 1000:>10.1f} ms  {fila['actual_consultas']:>6} consultas")
+        print(f"  Mejora:             {fila['mejora']:>10.2f}x\n")
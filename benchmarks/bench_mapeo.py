@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmark del mapeo de filas de citas a objetos
+
+Compara el mapeo anterior (lectura de cada campo por nombre de atributo, copiado
+en cada método de Cita) con MapeadorCita (posiciones resueltas una vez por
+consulta a partir de cursor.description).
+
+Uso:
+    python -m benchmarks.bench_mapeo --filas 100000 --repeticiones 5
+"""
+
+import argparse
+import gc
+import random
+import time
+from datetime import datetime, timedelta
+
+from config.backends.sqlite import SQLiteBackend
+from models.cita import Cita, CONSULTA_CITAS
+from models.paciente import Paciente
+from models.medico import Medico
+from models.mapeo import MapeadorCita
+
+
+def crear_filas(total, semilla=42):
+    """Genera citas sintéticas en una base SQLite en memoria y devuelve las filas de la consulta"""
+    aleatorio = random.Random(semilla)
+    connection = SQLiteBackend(':memory:').connect()
+    pacientes = max(1, total // 20)
+    medicos = max(1, total // 500)
+    connection.executemany(
+        "INSERT INTO Paciente (Id, Nombre, Apellido, Cedula) VALUES (?, ?, ?, ?)",
+        ((i, f"Nombre{i}", f"Apellido{i}", str(1000000000 + i)) for i in range(1, pacientes + 1))
+    )
+    connection.executemany(
+        "INSERT INTO Medico (Id, Nombre, Especialidad) VALUES (?, ?, ?)",
+        ((i, f"Médico {i}", "Medicina General") for i in range(1, medicos + 1))
+    )
+    inicio = datetime(2024, 1, 1, 8, 0)
+    connection.executemany(
+        "INSERT INTO Cita (IdPaciente, IdMedico, FechaHora, Motivo) VALUES (?, ?, ?, ?)",
+        ((aleatorio.randint(1, pacientes), aleatorio.randint(1, medicos),
+          inicio + timedelta(minutes=15 * i), "Control") for i in range(total))
+    )
+    connection.commit()
+    cursor = connection.execute(CONSULTA_CITAS + " ORDER BY c.FechaHora")
+    return cursor.description, cursor.fetchall()
+
+
+def mapeo_anterior(descripcion, filas):
+    """Mapeo previo a MapeadorCita, tal como estaba repetido en cada método de Cita"""
+    citas = []
+    for row in filas:
+        cita = Cita(
+            id=row.Id,
+            id_paciente=row.IdPaciente,
+            id_medico=row.IdMedico,
+            fecha_hora=row.FechaHora,
+            motivo=row.Motivo
+        )
+        # Crear objetos relacionados con datos parciales
+        cita.paciente = Paciente(
+            id=row.IdPaciente,
+            nombre=row.PacienteNombre,
+            apellido=row.PacienteApellido
+        )
+        cita.medico = Medico(
+            id=row.IdMedico,
+            nombre=row.MedicoNombre,
+            especialidad=row.MedicoEspecialidad
+        )
+        citas.append(cita)
+    return citas
+
+
+def mapeo_actual(descripcion, filas):
+    """Mapeo con posiciones precalculadas"""
+    return MapeadorCita(descripcion).citas(filas)
+
+
+def medir(funcion, descripcion, filas, repeticiones):
+    """Devuelve el mejor tiempo de varias ejecuciones"""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        gc.collect()
+        inicio = time.perf_counter()
+        resultado = funcion(descripcion, filas)
+        mejor = min(mejor, time.perf_counter() - inicio)
+        del resultado
+    return mejor
+
+
+def ejecutar(filas=100000, repeticiones=5):
+    """
+    Ejecuta el benchmark
+
+    Returns:
+        dict: Filas por segundo de cada variante y la mejora relativa
+    """
+    descripcion, datos = crear_filas(filas)
+    anterior = medir(mapeo_anterior, descripcion, datos, repeticiones)
+    actual = medir(mapeo_actual, descripcion, datos, repeticiones)
+    return {
+        'filas': len(datos),
+        'anterior_filas_s': len(datos) / anterior,
+        'actual_filas_s': len(datos) / actual,
+        'mejora': anterior / actual,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=100000)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    resultado = ejecutar(args.filas, args.repeticiones)
+    print(f"\n===== MAPEO DE CITAS ({resultado['filas']} filas) =====\n")
+    print(f"Anterior (por nombre):   {resultado['anterior_filas_s']:>12,.0f} filas/s")
+    print(f"MapeadorCita (índices):  {resultado['actual_filas_s']:>12,.0f} filas/s")
+    print(f"Mejora:                  {resultado['mejora']:>12.2f}x")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark de memoria por fila de los listados de citas
+
+Mide con tracemalloc los bytes retenidos por cita al convertir un conjunto
+sintético de filas con las clases anteriores (un __dict__ por instancia y tres
+objetos nuevos por fila) y con las entidades actuales (__slots__ y mapa de
+identidad para pacientes y médicos repetidos).
+
+Uso:
+    python -m benchmarks.bench_memoria --filas 200000
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from benchmarks.bench_mapeo import crear_filas
+from models.mapeo import MapeadorCita
+
+
+class PacienteAnterior:
+    """Paciente tal como estaba definido antes de __slots__"""
+
+    def __init__(self, id=None, nombre=None, apellido=None, cedula=None, fecha_nacimiento=None, email=None):
+        self.id = id
+        self.nombre = nombre
+        self.apellido = apellido
+        self.cedula = cedula
+        self.fecha_nacimiento = fecha_nacimiento
+        self.email = email
+
+
+class MedicoAnterior:
+    """Medico tal como estaba definido antes de __slots__"""
+
+    def __init__(self, id=None, nombre=None, especialidad=None, email=None):
+        self.id = id
+        self.nombre = nombre
+        self.especialidad = especialidad
+        self.email = email
+
+
+class CitaAnterior:
+    """Cita tal como estaba definida antes de __slots__"""
+
+    def __init__(self, id=None, id_paciente=None, id_medico=None, fecha_hora=None, motivo=None):
+        self.id = id
+        self.id_paciente = id_paciente
+        self.id_medico = id_medico
+        self.fecha_hora = fecha_hora
+        self.motivo = motivo
+        self.paciente = None
+        self.medico = None
+
+
+def mapeo_anterior(descripcion, filas):
+    """Tres objetos con __dict__ por fila, sin compartir pacientes ni médicos"""
+    citas = []
+    for row in filas:
+        cita = CitaAnterior(row.Id, row.IdPaciente, row.IdMedico, row.FechaHora, row.Motivo)
+        cita.paciente = PacienteAnterior(row.IdPaciente, row.PacienteNombre, row.PacienteApellido)
+        cita.medico = MedicoAnterior(row.IdMedico, row.MedicoNombre, row.MedicoEspecialidad)
+        citas.append(cita)
+    return citas
+
+
+def mapeo_actual(descripcion, filas):
+    """Entidades con __slots__ y mapa de identidad"""
+    return MapeadorCita(descripcion).citas(filas)
+
+
+def medir(funcion, descripcion, filas):
+    """Devuelve los bytes retenidos por el resultado de la función"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        resultado = funcion(descripcion, filas)
+        retenido = tracemalloc.get_traced_memory()[0] - base
+    finally:
+        tracemalloc.stop()
+    del resultado
+    return retenido
+
+
+def ejecutar(filas=200000):
+    """
+    Ejecuta el benchmark
+
+    Returns:
+        dict: Bytes por fila de cada variante y la reducción relativa
+    """
+    descripcion, datos = crear_filas(filas)
+    anterior = medir(mapeo_anterior, descripcion, datos)
+    actual = medir(mapeo_actual, descripcion, datos)
+    return {
+        'filas': len(datos),
+        'anterior_bytes_fila': anterior / len(datos),
+        'actual_bytes_fila': actual / len(datos),
+        'reduccion': 1 - actual / anterior,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=200000)
+    args = parser.parse_args()
+
+    resultado = ejecutar(args.filas)
+    print(f"\n===== MEMORIA POR CITA ({resultado['filas']} filas) =====\n")
+    print(f"Anterior (__dict__, sin compartir):   {resultado['anterior_bytes_fila']:>8.1f} bytes/fila")
+    print(f"Actual (__slots__, mapa identidad):   {resultado['actual_bytes_fila']:>8.1f} bytes/fila")
+    print(f"Reducción:                            {resultado['reduccion']:>8.1%}")
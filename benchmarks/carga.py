@@ -0,0 +1,486 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Prueba de carga HTTP con el tráfico típico de recepción
+
+Arranca la aplicación web en un servidor local (gunicorn con wsgi:app, o
+uvicorn con asgi:app) sobre una base SQLite generada con benchmarks.generador y
+la somete a usuarios concurrentes que repiten, en proporciones configurables,
+los flujos reales de recepción:
+
+    listar        GET /citas/
+    crear         GET /citas/crear, POST con el token CSRF del formulario y
+                  seguimiento de la redirección al listado
+    buscar_fecha  GET /citas/fecha y POST con un día que tiene citas
+    ver_paciente  GET /pacientes/ver/<id>
+
+Cada usuario tiene su propia sesión (cookies y conexión persistente). Las citas
+nuevas se reparten entre los médicos en turnos libres posteriores a la última
+cita de la base, así que no chocan entre sí ni entre ejecuciones. Para cada
+nivel de concurrencia se informa de peticiones y flujos por segundo, latencias
+p50/p95/p99 y tasa de errores, en total y por operación.
+
+El cliente corre en la misma máquina que el servidor y le quita CPU; los valores
+sirven para comparar configuraciones y commits entre sí, no como capacidad real.
+
+Uso:
+    python -m benchmarks.carga --escala pequena --usuarios 1,4,16 --segundos 20
+    python -m benchmarks.carga --db bench.db --servidor asgi --usuarios 8
+    python -m benchmarks.carga --mezcla listar=50,ver_paciente=50 --salida carga.json
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlencode, urlsplit
+
+from benchmarks import generador
+from benchmarks.bench_asgi import percentil
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Peso de cada flujo en el tráfico de recepción
+MEZCLA = {'listar': 35, 'ver_paciente': 30, 'buscar_fecha': 20, 'crear': 15}
+
+SERVIDORES = {
+    'gunicorn': lambda puerto: ['-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--log-level', 'warning',
+                                '--bind', f'127.0.0.1:{puerto}', 'wsgi:app'],
+    'asgi': lambda puerto: ['-m', 'uvicorn', '--port', str(puerto), '--log-level', 'warning', 'asgi:app'],
+}
+
+_TOKEN_CSRF = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"')
+
+
+def leer_mezcla(texto):
+    """Convierte 'listar=50,crear=10' en un diccionario de pesos"""
+    mezcla = {}
+    for parte in texto.split(','):
+        flujo, _, peso = parte.partition('=')
+        flujo = flujo.strip()
+        if flujo not in MEZCLA:
+            raise ValueError(f"Flujo desconocido: {flujo}. Use {', '.join(MEZCLA)}")
+        mezcla[flujo] = float(peso or 1)
+    return mezcla
+
+
+def preparar_datos():
+    """
+    Lee de la base configurada los IDs y fechas que usan los flujos
+
+    Returns:
+        dict: Rango de IDs de pacientes, IDs de médicos, días con citas y primer día libre
+    """
+    from config.database import DatabaseConnection
+    db = DatabaseConnection()
+    cursor = db.get_cursor()
+    cursor.execute("SELECT MIN(Id), MAX(Id) FROM Paciente")
+    pacientes = cursor.fetchone()
+    cursor.execute("SELECT Id FROM Medico ORDER BY Id")
+    medicos = [fila[0] for fila in cursor.fetchall()]
+    cursor.execute("SELECT MIN(FechaHora), MAX(FechaHora) FROM Cita")
+    primera, ultima = cursor.fetchone()
+    db.close()
+    if None in pacientes or not medicos or primera is None:
+        raise Exception("La base no tiene datos; genérelos con benchmarks.generador")
+
+    def fecha(valor):
+        return valor if isinstance(valor, datetime) else datetime.fromisoformat(str(valor))
+
+    primera, ultima = fecha(primera), fecha(ultima)
+    # Las citas nuevas empiezan el lunes siguiente a la última cita existente
+    libre = ultima.date() + timedelta(days=7 - ultima.weekday())
+    return {
+        'pacientes': pacientes,
+        'medicos': medicos,
+        'dias': (primera.date(), ultima.date()),
+        'horario_libre': generador.horario_por_indice(libre),
+    }
+
+
+class Sesion:
+    """Usuario del navegador: conexión persistente y cookies propias"""
+
+    def __init__(self, host, puerto, timeout=60):
+        self.host = host
+        self.puerto = puerto
+        self.timeout = timeout
+        self.cookies = {}
+        self.conexion = None
+
+    def pedir(self, metodo, ruta, datos=None):
+        """
+        Hace una petición y lee la respuesta completa
+
+        Returns:
+            tuple: (estado HTTP, cabecera Location, cuerpo en bytes)
+        """
+        if self.conexion is None:
+            self.conexion = http.client.HTTPConnection(self.host, self.puerto, timeout=self.timeout)
+        cabeceras = {}
+        if self.cookies:
+            cabeceras['Cookie'] = '; '.join(f'{nombre}={valor}' for nombre, valor in self.cookies.items())
+        cuerpo = None
+        if datos is not None:
+            cuerpo = urlencode(datos)
+            cabeceras['Content-Type'] = 'application/x-www-form-urlencoded'
+        try:
+            self.conexion.request(metodo, ruta, cuerpo, cabeceras)
+            respuesta = self.conexion.getresponse()
+            contenido = respuesta.read()
+        except Exception:
+            self.conexion.close()
+            self.conexion = None
+            raise
+        for cabecera in respuesta.headers.get_all('Set-Cookie') or ():
+            nombre, _, valor = cabecera.split(';', 1)[0].partition('=')
+            self.cookies[nombre.strip()] = valor
+        if respuesta.will_close:
+            self.conexion.close()
+            self.conexion = None
+        return respuesta.status, respuesta.getheader('Location'), contenido
+
+    def cerrar(self):
+        if self.conexion is not None:
+            self.conexion.close()
+            self.conexion = None
+
+
+class Usuario(threading.Thread):
+    """Hilo que repite flujos de recepción elegidos según la mezcla"""
+
+    def __init__(self, numero, host, puerto, datos, mezcla, turnos, parar, pausa=0.0):
+        super().__init__(daemon=True)
+        self.sesion = Sesion(host, puerto)
+        self.aleatorio = random.Random(numero)
+        self.datos = datos
+        self.flujos = list(mezcla)
+        self.pesos = list(mezcla.values())
+        self.turnos = turnos
+        self.parar = parar
+        self.pausa = pausa
+        # (operación, inicio, segundos, error o None) y (flujo, inicio, segundos, con error)
+        self.peticiones = []
+        self.completados = []
+
+    def _pedir(self, operacion, metodo, ruta, datos=None, esperado=200):
+        inicio = time.perf_counter()
+        error = None
+        try:
+            estado, destino, cuerpo = self.sesion.pedir(metodo, ruta, datos)
+            if estado != esperado:
+                error = f"HTTP {estado}"
+        except Exception as e:
+            estado, destino, cuerpo = None, None, b''
+            error = type(e).__name__
+        self.peticiones.append((operacion, inicio, time.perf_counter() - inicio, error))
+        if error:
+            raise _FlujoFallido(f"{operacion}: {error}")
+        return destino, cuerpo
+
+    def _token(self, cuerpo):
+        encontrado = _TOKEN_CSRF.search(cuerpo.decode('utf-8', 'replace'))
+        if not encontrado:
+            raise _FlujoFallido("Formulario sin token CSRF")
+        return encontrado.group(1)
+
+    def listar(self):
+        self._pedir('GET /citas/', 'GET', '/citas/')
+
+    def ver_paciente(self):
+        id_paciente = self.aleatorio.randint(*self.datos['pacientes'])
+        self._pedir('GET /pacientes/ver/<id>', 'GET', f'/pacientes/ver/{id_paciente}')
+
+    def buscar_fecha(self):
+        _, cuerpo = self._pedir('GET /citas/fecha', 'GET', '/citas/fecha')
+        desde, hasta = self.datos['dias']
+        dia = desde + timedelta(days=self.aleatorio.randint(0, (hasta - desde).days))
+        self._pedir('POST /citas/fecha', 'POST', '/citas/fecha', {
+            'csrf_token': self._token(cuerpo), 'fecha_inicio': dia.strftime('%Y-%m-%d'),
+        })
+
+    def crear(self):
+        _, cuerpo = self._pedir('GET /citas/crear', 'GET', '/citas/crear')
+        medicos = self.datos['medicos']
+        turno = next(self.turnos)
+        fecha_hora = self.datos['horario_libre'](turno // len(medicos))
+        destino, cuerpo_respuesta = self._pedir('POST /citas/crear', 'POST', '/citas/crear', {
+            'csrf_token': self._token(cuerpo),
+            'id_paciente': self.aleatorio.randint(*self.datos['pacientes']),
+            'id_medico': medicos[turno % len(medicos)],
+            'fecha': fecha_hora.strftime('%Y-%m-%d'),
+            'hora': fecha_hora.strftime('%H:%M'),
+            'motivo': 'Prueba de carga',
+        }, esperado=302)
+        # Como el navegador, se sigue la redirección al listado
+        self._pedir('GET /citas/', 'GET', urlsplit(destino).path or '/citas/')
+
+    def run(self):
+        while not self.parar.is_set():
+            flujo = self.aleatorio.choices(self.flujos, self.pesos)[0]
+            inicio = time.perf_counter()
+            fallido = False
+            try:
+                getattr(self, flujo)()
+            except _FlujoFallido:
+                fallido = True
+            self.completados.append((flujo, inicio, time.perf_counter() - inicio, fallido))
+            if self.pausa:
+                # Tiempo de reflexión del usuario, con media self.pausa
+                self.parar.wait(self.aleatorio.expovariate(1 / self.pausa))
+        self.sesion.cerrar()
+
+
+class _FlujoFallido(Exception):
+    """Una petición del flujo falló; el resto del flujo no se ejecuta"""
+
+
+class _Turnos:
+    """Contador compartido de turnos libres para crear citas sin solapes"""
+
+    def __init__(self):
+        self._siguiente = 0
+        self._lock = threading.Lock()
+
+    def __next__(self):
+        with self._lock:
+            turno = self._siguiente
+            self._siguiente += 1
+            return turno
+
+
+def _resumen(latencias, errores, segundos):
+    """Latencias en milisegundos, ritmo por segundo y tasa de errores"""
+    total = len(latencias)
+    return {
+        'cantidad': total,
+        'por_segundo': round(total / segundos, 2),
+        'p50_ms': round(percentil(latencias, 50) * 1000, 2),
+        'p95_ms': round(percentil(latencias, 95) * 1000, 2),
+        'p99_ms': round(percentil(latencias, 99) * 1000, 2),
+        'errores': errores,
+        'tasa_errores': round(errores / total, 4) if total else 0.0,
+    }
+
+
+def medir_nivel(host, puerto, datos, mezcla, turnos, usuarios, segundos, calentamiento, pausa):
+    """
+    Somete el servidor a un número de usuarios concurrentes
+
+    Solo cuentan las peticiones y flujos que empiezan y terminan dentro de la
+    ventana de medición, después del calentamiento.
+
+    Returns:
+        dict: Resumen total, por operación y por flujo, y los errores más frecuentes
+    """
+    parar = threading.Event()
+    hilos = [Usuario(i, host, puerto, datos, mezcla, turnos, parar, pausa) for i in range(usuarios)]
+    for hilo in hilos:
+        hilo.start()
+    time.sleep(calentamiento)
+    desde = time.perf_counter()
+    time.sleep(segundos)
+    hasta = time.perf_counter()
+    parar.set()
+    for hilo in hilos:
+        hilo.join()
+
+    dentro = lambda inicio, duracion: inicio >= desde and inicio + duracion <= hasta
+    peticiones = [p for hilo in hilos for p in hilo.peticiones if dentro(p[1], p[2])]
+    completados = [f for hilo in hilos for f in hilo.completados if dentro(f[1], f[2])]
+
+    operaciones = {}
+    for operacion, _, duracion, error in peticiones:
+        fila = operaciones.setdefault(operacion, ([], [0]))
+        fila[0].append(duracion)
+        fila[1][0] += error is not None
+    flujos = {}
+    for flujo, _, duracion, fallido in completados:
+        fila = flujos.setdefault(flujo, ([], [0]))
+        fila[0].append(duracion)
+        fila[1][0] += fallido
+    motivos = {}
+    for operacion, _, _, error in peticiones:
+        if error:
+            clave = f"{operacion}: {error}"
+            motivos[clave] = motivos.get(clave, 0) + 1
+
+    return {
+        'usuarios': usuarios,
+        'peticiones': _resumen([p[2] for p in peticiones], sum(p[3] is not None for p in peticiones), segundos),
+        'flujos': _resumen([f[2] for f in completados], sum(f[3] for f in completados), segundos),
+        'por_operacion': {
+            operacion: _resumen(latencias, errores[0], segundos)
+            for operacion, (latencias, errores) in sorted(operaciones.items())
+        },
+        'por_flujo': {
+            flujo: _resumen(latencias, errores[0], segundos)
+            for flujo, (latencias, errores) in sorted(flujos.items())
+        },
+        'errores_frecuentes': sorted(motivos.items(), key=lambda par: -par[1])[:5],
+    }
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _esperar_servidor(servidor, puerto, limite=60):
+    """Espera a que la aplicación responda en / (no basta con que acepte conexiones)"""
+    fin = time.monotonic() + limite
+    while time.monotonic() < fin:
+        if servidor.poll() is not None:
+            raise Exception(f"El servidor terminó al arrancar (código {servidor.returncode})")
+        try:
+            conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=5)
+            conexion.request('GET', '/')
+            if conexion.getresponse().status == 200:
+                conexion.close()
+                return
+            conexion.close()
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise Exception(f"El servidor no respondió en {limite} segundos")
+
+
+def arrancar_servidor(tipo, ruta_db, procesos=None, hilos=None):
+    """
+    Arranca el servidor local sobre la base SQLite indicada
+
+    Returns:
+        tuple: (proceso del servidor, puerto)
+    """
+    puerto = _puerto_libre()
+    entorno = dict(os.environ)
+    entorno.update({'DB_BACKEND': 'sqlite', 'SQLITE_PATH': ruta_db, 'SQLITE_WAL': '1', 'PYTHONPATH': RAIZ})
+    # El registro de peticiones lentas y el de accesos inundarían la salida bajo carga
+    entorno.setdefault('DB_UMBRAL_LENTA_MS', 'inf')
+    entorno.setdefault('DB_UMBRAL_PETICION_MS', 'inf')
+    entorno.setdefault('GUNICORN_ACCESSLOG', os.devnull)
+    if procesos:
+        entorno['GUNICORN_WORKERS'] = str(procesos)
+    if hilos:
+        entorno['GUNICORN_THREADS'] = str(hilos)
+        entorno['ASGI_HILOS_WSGI'] = str(hilos)
+        entorno['DB_POOL_SIZE'] = str(max(hilos, int(entorno.get('DB_POOL_SIZE', '10'))))
+    servidor = subprocess.Popen([sys.executable, *SERVIDORES[tipo](puerto)], cwd=RAIZ, env=entorno)
+    try:
+        _esperar_servidor(servidor, puerto)
+    except Exception:
+        servidor.terminate()
+        servidor.wait(30)
+        raise
+    return servidor, puerto
+
+
+def ejecutar(ruta_db, niveles=(1, 4, 16), segundos=20, calentamiento=3, mezcla=None, pausa=0.0,
+             servidor='gunicorn', procesos=None, hilos=None):
+    """
+    Arranca el servidor y mide cada nivel de concurrencia
+
+    Returns:
+        dict: Configuración y resultados de cada nivel
+    """
+    generador.configurar_sqlite(ruta_db)
+    datos = preparar_datos()
+    mezcla = mezcla or MEZCLA
+    turnos = _Turnos()
+    proceso, puerto = arrancar_servidor(servidor, ruta_db, procesos, hilos)
+    try:
+        resultados = []
+        for usuarios in niveles:
+            print(f"  {usuarios} usuarios...")
+            resultados.append(medir_nivel('127.0.0.1', puerto, datos, mezcla, turnos,
+                                          usuarios, segundos, calentamiento, pausa))
+    finally:
+        proceso.terminate()
+        proceso.wait(30)
+    return {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'servidor': servidor,
+        'procesos': procesos,
+        'hilos': hilos,
+        'mezcla': mezcla,
+        'segundos': segundos,
+        'pausa': pausa,
+        'resultados': resultados,
+    }
+
+
+def imprimir(resultado):
+    """Tablas de resultados por nivel de concurrencia y por operación"""
+    mezcla = ', '.join(f'{flujo}={peso:g}' for flujo, peso in resultado['mezcla'].items())
+    print(f"\n===== CARGA ({resultado['servidor']}, {resultado['segundos']:g} s por nivel, {mezcla}) =====\n")
+    print(f"{'Usuarios':>8}{'pet/s':>9}{'flujos/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errores':>9}")
+    for nivel in resultado['resultados']:
+        peticiones, flujos = nivel['peticiones'], nivel['flujos']
+        print(f"{nivel['usuarios']:>8}{peticiones['por_segundo']:>9.1f}{flujos['por_segundo']:>10.1f}"
+              f"{peticiones['p50_ms']:>9.1f}{peticiones['p95_ms']:>9.1f}{peticiones['p99_ms']:>9.1f}"
+              f"{peticiones['tasa_errores']:>9.1%}")
+    for nivel in resultado['resultados']:
+        print(f"\n--- {nivel['usuarios']} usuarios ---")
+        print(f"{'Operación':<26}{'cantidad':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errores':>9}")
+        for operacion, fila in nivel['por_operacion'].items():
+            print(f"{operacion:<26}{fila['cantidad']:>9}{fila['p50_ms']:>9.1f}{fila['p95_ms']:>9.1f}"
+                  f"{fila['p99_ms']:>9.1f}{fila['tasa_errores']:>9.1%}")
+        for motivo, cantidad in nivel['errores_frecuentes']:
+            print(f"  error: {motivo} ({cantidad})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', help="Base SQLite ya generada (recibe las citas creadas); por defecto una temporal")
+    parser.add_argument('--escala', choices=generador.ESCALAS, default='pequena',
+                        help="Tamaño de la base temporal")
+    parser.add_argument('--usuarios', default='1,4,16', help="Niveles de concurrencia separados por comas")
+    parser.add_argument('--segundos', type=float, default=20, help="Duración de la medición de cada nivel")
+    parser.add_argument('--calentamiento', type=float, default=3, help="Segundos descartados al inicio de cada nivel")
+    parser.add_argument('--mezcla', type=leer_mezcla, help="Pesos de los flujos, p. ej. listar=35,crear=15")
+    parser.add_argument('--pausa', type=float, default=0.0, help="Tiempo medio de reflexión entre flujos (s)")
+    parser.add_argument('--servidor', choices=SERVIDORES, default='gunicorn')
+    parser.add_argument('--procesos', type=int, help="Workers de gunicorn (GUNICORN_WORKERS)")
+    parser.add_argument('--hilos', type=int, help="Hilos por worker (GUNICORN_THREADS / ASGI_HILOS_WSGI)")
+    parser.add_argument('--salida', help="Archivo JSON de resultados")
+    args = parser.parse_args()
+
+    temporal = None
+    ruta_db = args.db
+    if not ruta_db:
+        temporal = tempfile.mkdtemp(prefix='carga_')
+        ruta_db = os.path.join(temporal, 'clinica.db')
+        generador.configurar_sqlite(ruta_db)
+        pacientes, medicos, citas = generador.ESCALAS[args.escala]
+        print(f"Generando base temporal ({args.escala})...")
+        generador.generar(pacientes, medicos, citas)
+        from config.database import DatabaseConnection
+        DatabaseConnection().close()
+
+    try:
+        print("\n===== PRUEBA DE CARGA =====\n")
+        resultado = ejecutar(
+            ruta_db, [int(n) for n in args.usuarios.split(',')], args.segundos, args.calentamiento,
+            args.mezcla, args.pausa, args.servidor, args.procesos, args.hilos
+        )
+    finally:
+        if temporal:
+            shutil.rmtree(temporal, ignore_errors=True)
+
+    imprimir(resultado)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(resultado, archivo, ensure_ascii=False, indent=2)
+        print(f"\nResultados guardados en {args.salida}")
@@ -0,0 +1,353 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Suite de benchmarks de controladores y rutas web
+
+Mide cada método de consulta de los controladores y cada ruta web (con el
+cliente de pruebas de Flask, sin red) sobre una base SQLite local generada con
+benchmarks.generador. Los datos y los parámetros de cada escenario son
+deterministas, así que los resultados de dos commits son comparables. Los
+resultados se guardan en JSON y se pueden comparar con una ejecución anterior.
+
+Uso:
+    python -m benchmarks.ejecutar --escala pequena --salida base.json
+    python -m benchmarks.ejecutar --escala pequena --comparar base.json
+    python -m benchmarks.ejecutar --db grande.db --filtro citas --repeticiones 50
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks import generador
+
+# Registro de consultas lentas desactivado: los escenarios grandes lo llenarían
+os.environ.setdefault('DB_UMBRAL_LENTA_MS', 'inf')
+os.environ.setdefault('DB_UMBRAL_PETICION_MS', 'inf')
+
+VERSION_FORMATO = 1
+
+
+def _consumir(iterable):
+    """Recorre un iterador completo y devuelve cuántos elementos tenía"""
+    total = 0
+    for _ in iterable:
+        total += 1
+    return total
+
+
+def _contexto(db):
+    """IDs y fechas reales de la base, y muestras deterministas para los escenarios"""
+    cursor = db.get_cursor()
+    cursor.execute("SELECT MIN(Id), MAX(Id) FROM Paciente")
+    pacientes = cursor.fetchone()
+    cursor.execute("SELECT MIN(Id), MAX(Id) FROM Medico")
+    medicos = cursor.fetchone()
+    cursor.execute("SELECT MIN(Id), MAX(Id), MIN(FechaHora) FROM Cita")
+    citas = cursor.fetchone()
+    cursor.execute("SELECT Cedula FROM Paciente WHERE Id = ?", (pacientes[0],))
+    cedula = cursor.fetchone()[0]
+    db.release()
+    if None in pacientes or None in medicos or None in citas[:2]:
+        raise Exception("La base no tiene datos; genérelos con benchmarks.generador")
+    aleatorio = random.Random(7)
+    primera = citas[2] if isinstance(citas[2], datetime) else datetime.fromisoformat(str(citas[2]))
+    return {
+        'pacientes': [aleatorio.randint(*pacientes) for _ in range(64)],
+        'medicos': [aleatorio.randint(*medicos) for _ in range(64)],
+        'citas': [aleatorio.randint(*citas[:2]) for _ in range(64)],
+        'cedula': cedula,
+        'dia': primera.strftime('%d-%m-%Y'),
+        'dia_iso': primera.strftime('%Y-%m-%d'),
+        'fin_semana': (primera + timedelta(days=6)).strftime('%d-%m-%Y'),
+        'hora': primera.strftime('%d-%m-%Y %H:%M'),
+        'ahora': primera,
+        'textos': ['pérez', 'maria gar', 'nunez', 'jose', 'valdes zu'],
+    }
+
+
+def escenarios_controladores(ctx):
+    """Escenarios (nombre, función) de los métodos de consulta de los controladores"""
+    from controllers.paciente_controller import PacienteController
+    from controllers.medico_controller import MedicoController
+    from controllers.cita_controller import CitaController
+    from controllers.disponibilidad_controller import DisponibilidadController
+    from controllers.exportacion_controller import ExportacionController
+
+    def ciclo(clave):
+        """Devuelve un valor distinto de la muestra en cada llamada"""
+        valores = ctx[clave]
+        posicion = [0]
+
+        def siguiente():
+            posicion[0] = (posicion[0] + 1) % len(valores)
+            return valores[posicion[0]]
+        return siguiente
+
+    paciente, medico, cita, texto = ciclo('pacientes'), ciclo('medicos'), ciclo('citas'), ciclo('textos')
+
+    def recorrer_paginas(listar, paginas=10):
+        cursor = None
+        for _ in range(paginas):
+            pagina = listar(cursor, 50)
+            cursor = pagina.siguiente
+            if not cursor:
+                break
+
+    def exportar_semana():
+        exito, citas = ExportacionController.preparar_citas(ctx['dia'], ctx['fin_semana'])
+        return _consumir(ExportacionController.generar_csv(citas))
+
+    return [
+        ('pacientes.listar_paginados', lambda: PacienteController.listar_pacientes_paginados(None, 50)),
+        ('pacientes.recorrer_10_paginas', lambda: recorrer_paginas(PacienteController.listar_pacientes_paginados)),
+        ('pacientes.buscar_por_id', lambda: PacienteController.buscar_paciente_por_id(paciente())),
+        ('pacientes.buscar_por_id_sin_cache', lambda: PacienteController.buscar_paciente_por_id(paciente(), usar_cache=False)),
+        ('pacientes.buscar_por_cedula', lambda: PacienteController.buscar_paciente_por_cedula(ctx['cedula'])),
+        ('pacientes.buscar_texto', lambda: PacienteController.buscar_pacientes(texto(), None, 20)),
+        ('pacientes.sugerir', lambda: PacienteController.sugerir_pacientes(texto())),
+        ('pacientes.listar_todos', PacienteController.listar_pacientes),
+        ('medicos.listar_paginados', lambda: MedicoController.listar_medicos_paginados(None, 50)),
+        ('medicos.listar_todos', MedicoController.listar_medicos),
+        ('medicos.buscar_por_id', lambda: MedicoController.buscar_medico_por_id(medico())),
+        ('medicos.por_especialidad', lambda: MedicoController.buscar_medicos_por_especialidad('cardiologia')),
+        ('medicos.sugerir_especialidades', lambda: MedicoController.sugerir_especialidades('ped')),
+        ('citas.listar_paginadas', lambda: CitaController.listar_citas_paginadas(None, 50)),
+        ('citas.recorrer_10_paginas', lambda: recorrer_paginas(CitaController.listar_citas_paginadas)),
+        ('citas.buscar_por_id', lambda: CitaController.buscar_cita_por_id(cita())),
+        ('citas.por_paciente', lambda: CitaController.buscar_citas_por_paciente(paciente())),
+        ('citas.por_medico', lambda: CitaController.buscar_citas_por_medico(medico())),
+        ('citas.por_fecha_dia', lambda: CitaController.buscar_citas_por_fecha(ctx['dia'])),
+        ('citas.iterar_semana', lambda: _consumir(CitaController.iterar_citas_por_fecha(ctx['dia'], ctx['fin_semana']))),
+        ('disponibilidad.verificar', lambda: DisponibilidadController.verificar_disponibilidad(medico(), ctx['hora'])),
+        ('disponibilidad.espacios_libres', lambda: DisponibilidadController.buscar_espacios_libres(
+            'Medicina General', ctx['dia'], ctx['fin_semana'], ahora=ctx['ahora'])),
+        ('exportacion.csv_semana', exportar_semana),
+    ]
+
+
+def escenarios_web(ctx):
+    """Escenarios (nombre, función) de las rutas web con el cliente de pruebas de Flask"""
+    from web_app import create_app
+    app = create_app({'WTF_CSRF_ENABLED': False, 'TESTING': True})
+    cliente = app.test_client()
+
+    def pedir(metodo, url, **kwargs):
+        def llamar():
+            respuesta = cliente.open(url, method=metodo, **kwargs)
+            # Las respuestas por partes se generan al leer el cuerpo
+            datos = respuesta.get_data()
+            respuesta.close()
+            if respuesta.status_code >= 400:
+                raise Exception(f"{metodo} {url}: HTTP {respuesta.status_code}")
+            return len(datos)
+        return llamar
+
+    p, m, c = ctx['pacientes'][0], ctx['medicos'][0], ctx['citas'][0]
+    return [
+        ('web.inicio', pedir('GET', '/')),
+        ('web.pacientes.listar', pedir('GET', '/pacientes/')),
+        ('web.pacientes.ver', pedir('GET', f'/pacientes/ver/{p}')),
+        ('web.pacientes.busqueda', pedir('GET', '/pacientes/busqueda?q=perez')),
+        ('web.pacientes.buscar_cedula', pedir('POST', '/pacientes/buscar', data={'cedula': ctx['cedula']})),
+        ('web.pacientes.sugerir', pedir('GET', '/pacientes/sugerir?q=mar')),
+        ('web.medicos.listar', pedir('GET', '/medicos/')),
+        ('web.medicos.ver', pedir('GET', f'/medicos/ver/{m}')),
+        ('web.medicos.especialidad', pedir('POST', '/medicos/especialidad', data={'especialidad': 'Pediatría'})),
+        ('web.medicos.sugerir', pedir('GET', '/medicos/especialidades/sugerir?q=car')),
+        ('web.citas.listar', pedir('GET', '/citas/')),
+        ('web.citas.ver', pedir('GET', f'/citas/ver/{c}')),
+        ('web.citas.crear_formulario', pedir('GET', '/citas/crear')),
+        ('web.citas.editar_formulario', pedir('GET', f'/citas/editar/{c}')),
+        ('web.citas.por_paciente', pedir('GET', f'/citas/paciente/{p}')),
+        ('web.citas.por_medico', pedir('GET', f'/citas/medico/{m}')),
+        ('web.citas.por_fecha', pedir('POST', '/citas/fecha', data={'fecha_inicio': ctx['dia_iso']})),
+        ('web.citas.exportar_semana', pedir(
+            'GET', f"/citas/exportar?fecha_inicio={ctx['dia']}&fecha_fin={ctx['fin_semana']}")),
+        ('web.citas.disponibilidad', pedir('GET', f"/citas/disponibilidad?id_medico={m}&fecha_hora={ctx['hora']}")),
+        ('web.citas.espacios', pedir(
+            'GET', f"/citas/espacios/buscar?especialidad=Pediatría&fecha_inicio={ctx['dia']}")),
+        ('web.api.pacientes', pedir('GET', '/api/v1/pacientes?limite=50')),
+        ('web.api.citas', pedir('GET', '/api/v1/citas?limite=50')),
+        ('web.api.cita', pedir('GET', f'/api/v1/citas/{c}')),
+        ('web.api.citas_fecha', pedir('GET', f"/api/v1/citas/fecha?fecha_inicio={ctx['dia']}")),
+    ]
+
+
+def medir(funcion, repeticiones, calentamiento):
+    """
+    Ejecuta un escenario varias veces
+
+    Returns:
+        dict: Tiempos en milisegundos (mínimo, mediana, p95, media) y operaciones por segundo
+    """
+    for _ in range(calentamiento):
+        funcion()
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    mediana = statistics.median(tiempos)
+    return {
+        'min_ms': round(tiempos[0], 4),
+        'mediana_ms': round(mediana, 4),
+        'p95_ms': round(tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))], 4),
+        'media_ms': round(statistics.fmean(tiempos), 4),
+        'ops_s': round(1000 / mediana, 1) if mediana else None,
+    }
+
+
+def _commit():
+    """Commit actual del repositorio, si está disponible"""
+    try:
+        salida = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+        return salida.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def ejecutar(repeticiones=20, calentamiento=2, filtro=None, grupos=('controladores', 'web')):
+    """
+    Ejecuta los escenarios sobre la base configurada
+
+    Returns:
+        dict: Metadatos de la ejecución y resultados por escenario
+    """
+    from config.database import DatabaseConnection
+    db = DatabaseConnection()
+    ctx = _contexto(db)
+    cursor = db.get_cursor()
+    escala = {}
+    for tabla, clave in (('Paciente', 'pacientes'), ('Medico', 'medicos'), ('Cita', 'citas')):
+        cursor.execute(f"SELECT COUNT(*) FROM {tabla}")
+        escala[clave] = cursor.fetchone()[0]
+    db.release()
+
+    escenarios = []
+    if 'controladores' in grupos:
+        escenarios += [('controladores', nombre, funcion) for nombre, funcion in escenarios_controladores(ctx)]
+    if 'web' in grupos:
+        escenarios += [('web', nombre, funcion) for nombre, funcion in escenarios_web(ctx)]
+
+    resultados = {}
+    for grupo, nombre, funcion in escenarios:
+        if filtro and filtro not in nombre:
+            continue
+        try:
+            resultados[nombre] = {'grupo': grupo, **medir(funcion, repeticiones, calentamiento)}
+        except Exception as e:
+            resultados[nombre] = {'grupo': grupo, 'error': str(e)}
+        finally:
+            db.release()
+        fila = resultados[nombre]
+        if 'error' in fila:
+            print(f"  {nombre:<40} ERROR: {fila['error']}")
+        else:
+            print(f"  {nombre:<40} {fila['mediana_ms']:>10.3f} ms  (p95 {fila['p95_ms']:.3f})")
+
+    return {
+        'version': VERSION_FORMATO,
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'backend': db.backend.__class__.__name__,
+        'cache': os.getenv('CACHE_HABILITADA', '1') == '1',
+        'escala': escala,
+        'repeticiones': repeticiones,
+        'escenarios': resultados,
+    }
+
+
+def comparar(base, actual, umbral=0.10):
+    """
+    Compara las medianas de dos ejecuciones
+
+    Returns:
+        list: (escenario, mediana base, mediana actual, cambio relativo) de los escenarios comunes
+    """
+    filas = []
+    for nombre, fila in actual['escenarios'].items():
+        anterior = base['escenarios'].get(nombre)
+        if not anterior or 'error' in anterior or 'error' in fila:
+            continue
+        cambio = fila['mediana_ms'] / anterior['mediana_ms'] - 1 if anterior['mediana_ms'] else 0.0
+        filas.append((nombre, anterior['mediana_ms'], fila['mediana_ms'], cambio))
+    print(f"\n===== COMPARACIÓN ({base.get('commit') or 'base'} -> {actual.get('commit') or 'actual'}) =====\n")
+    if base.get('escala') != actual.get('escala'):
+        print(f"Aviso: escalas distintas ({base.get('escala')} frente a {actual.get('escala')})\n")
+    for nombre, anterior, ahora, cambio in filas:
+        marca = ''
+        if cambio > umbral:
+            marca = '  más lento'
+        elif cambio < -umbral:
+            marca = '  más rápido'
+        print(f"  {nombre:<40} {anterior:>10.3f} -> {ahora:>10.3f} ms  {cambio:>+7.1%}{marca}")
+    return filas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', help="Base SQLite ya generada; por defecto se genera una temporal")
+    parser.add_argument('--escala', choices=generador.ESCALAS, default='pequena',
+                        help="Tamaño de la base temporal")
+    parser.add_argument('--usar-env', action='store_true', help="Usa la base configurada en .env")
+    parser.add_argument('--repeticiones', type=int, default=20)
+    parser.add_argument('--calentamiento', type=int, default=2)
+    parser.add_argument('--filtro', help="Solo los escenarios cuyo nombre contiene este texto")
+    parser.add_argument('--grupo', choices=('controladores', 'web'), help="Solo un grupo de escenarios")
+    parser.add_argument('--sin-cache', action='store_true', help="Desactiva la caché de pacientes y médicos")
+    parser.add_argument('--salida', help="Archivo JSON de resultados")
+    parser.add_argument('--comparar', help="JSON de una ejecución anterior para comparar")
+    args = parser.parse_args()
+
+    if args.sin_cache:
+        os.environ['CACHE_HABILITADA'] = '0'
+        import models.cache_entidades
+        models.cache_entidades.HABILITADA = False
+
+    temporal = None
+    if not args.usar_env:
+        if args.db:
+            generador.configurar_sqlite(args.db)
+        else:
+            temporal = tempfile.mkdtemp(prefix='bench_')
+            generador.configurar_sqlite(os.path.join(temporal, 'clinica.db'))
+            pacientes, medicos, citas = generador.ESCALAS[args.escala]
+            print(f"Generando base temporal ({args.escala})...")
+            generador.generar(pacientes, medicos, citas)
+
+    try:
+        grupos = (args.grupo,) if args.grupo else ('controladores', 'web')
+        print("\n===== BENCHMARKS =====\n")
+        resultado = ejecutar(args.repeticiones, args.calentamiento, args.filtro, grupos)
+    finally:
+        if temporal:
+            import shutil
+            from config.database import DatabaseConnection
+            DatabaseConnection().close()
+            shutil.rmtree(temporal, ignore_errors=True)
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(resultado, archivo, ensure_ascii=False, indent=2)
+        print(f"\nResultados guardados en {args.salida}")
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            comparar(json.load(archivo), resultado)
+    errores = [nombre for nombre, fila in resultado['escenarios'].items() if 'error' in fila]
+    sys.exit(1 if errores else 0)
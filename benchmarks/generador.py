@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Generador determinista de datos sintéticos de la clínica
+
+Crea pacientes, médicos y citas con la misma semilla siempre igual, de modo que
+dos ejecuciones de los benchmarks sobre commits distintos midan exactamente los
+mismos datos. Los nombres llevan acentos y eñes para ejercitar la búsqueda, las
+especialidades tienen frecuencias desiguales y las citas respetan el horario de
+atención sin solaparse, con una ocupación configurable por médico.
+
+Los datos se escriben en la base configurada (DB_BACKEND); las tablas deben
+estar vacías. Las filas se generan e insertan por lotes, así que millones de
+citas no ocupan memoria.
+
+Uso:
+    python -m benchmarks.generador --escala mediana --db bench.db
+    python -m benchmarks.generador --pacientes 100000 --medicos 500 --citas 2000000 --db grande.db
+"""
+
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from config.database import DatabaseConnection
+from controllers.disponibilidad_controller import HORARIO_APERTURA, HORARIO_CIERRE, DIAS_ATENCION
+from models.cita import DURACION_CITA_MINUTOS
+from models.texto import normalizar
+
+# Tamaños predefinidos: (pacientes, médicos, citas)
+ESCALAS = {
+    'minima': (200, 10, 2000),
+    'pequena': (2000, 50, 20000),
+    'mediana': (20000, 200, 300000),
+    'grande': (100000, 500, 2000000),
+}
+# Primer día con citas (lunes); en el futuro, para que la búsqueda de huecos no lo recorte
+INICIO = date(2030, 1, 7)
+TAMANO_LOTE = 10000
+
+NOMBRES = [
+    'José', 'María', 'Ana', 'Luis', 'Andrés', 'Sofía', 'Martín', 'Lucía', 'Jesús', 'Camila',
+    'Raúl', 'Valentina', 'Tomás', 'Daniela', 'Iván', 'Gabriela', 'Óscar', 'Isabel', 'Ramón', 'Elena',
+    'Joaquín', 'Paula', 'Nicolás', 'Verónica', 'Sebastián', 'Mónica', 'Héctor', 'Inés', 'Julián', 'Begoña',
+]
+APELLIDOS = [
+    'Pérez', 'García', 'Rodríguez', 'Núñez', 'Muñoz', 'Chica', 'Ramírez', 'Vásquez', 'Castañeda', 'López',
+    'Martínez', 'Sánchez', 'Gómez', 'Fernández', 'Díaz', 'Álvarez', 'Jiménez', 'Ordóñez', 'Peña', 'Ibáñez',
+    'Romero', 'Torres', 'Suárez', 'Benítez', 'Guzmán', 'Herrera', 'Cáceres', 'Montaño', 'Valdés', 'Zúñiga',
+]
+# Especialidad y peso relativo en la plantilla de médicos
+ESPECIALIDADES = [
+    ('Medicina General', 8), ('Pediatría', 4), ('Cardiología', 3), ('Ginecología', 3),
+    ('Traumatología', 3), ('Dermatología', 2), ('Oftalmología', 2), ('Neurología', 1),
+    ('Psiquiatría', 1), ('Otorrinolaringología', 1), ('Endocrinología', 1), ('Gastroenterología', 1),
+]
+MOTIVOS = [
+    'Control', 'Consulta general', 'Dolor de cabeza', 'Chequeo anual', 'Revisión de exámenes',
+    'Fiebre', 'Dolor abdominal', 'Renovación de receta', 'Seguimiento', None,
+]
+
+
+def _sin_acentos(texto):
+    return normalizar(texto).replace(' ', '')
+
+
+def generar_pacientes(cantidad, semilla=42):
+    """
+    Genera pacientes en orden: (nombre, apellido, cédula, fecha de nacimiento, email)
+
+    Las cédulas son únicas: 7919 es primo con el rango, así que i * 7919 recorre
+    el rango sin repetir.
+    """
+    aleatorio = random.Random(semilla)
+    for i in range(1, cantidad + 1):
+        nombre = aleatorio.choice(NOMBRES)
+        apellido = f"{aleatorio.choice(APELLIDOS)} {aleatorio.choice(APELLIDOS)}"
+        cedula = str(1000000000 + (i * 7919) % 9000000000)
+        nacimiento = date(1940, 1, 1) + timedelta(days=aleatorio.randrange(80 * 365))
+        email = None
+        if aleatorio.random() < 0.7:
+            email = f"{_sin_acentos(nombre)}.{_sin_acentos(apellido.split()[0])}{i}@ejemplo.com"
+        yield nombre, apellido, cedula, nacimiento, email
+
+
+def generar_medicos(cantidad, semilla=42):
+    """Genera médicos en orden: (nombre, especialidad, email)"""
+    aleatorio = random.Random(semilla + 1)
+    especialidades = [nombre for nombre, _ in ESPECIALIDADES]
+    pesos = [peso for _, peso in ESPECIALIDADES]
+    for i in range(1, cantidad + 1):
+        # Al menos un médico de cada especialidad
+        if i <= len(especialidades):
+            especialidad = especialidades[i - 1]
+        else:
+            especialidad = aleatorio.choices(especialidades, pesos)[0]
+        nombre = f"{aleatorio.choice(NOMBRES)} {aleatorio.choice(APELLIDOS)}"
+        yield nombre, especialidad, f"medico{i}@clinica.ejemplo.com"
+
+
+def horario_por_indice(inicio=INICIO):
+    """Función que convierte el número de turno de un médico en su fecha y hora"""
+    dias = sorted(DIAS_ATENCION)
+    apertura = datetime.combine(inicio, HORARIO_APERTURA)
+    turnos_por_dia = int(
+        (datetime.combine(inicio, HORARIO_CIERRE) - apertura).total_seconds() // (DURACION_CITA_MINUTOS * 60)
+    )
+    lunes = inicio - timedelta(days=inicio.weekday())
+    duracion = timedelta(minutes=DURACION_CITA_MINUTOS)
+
+    def horario(indice):
+        dia, turno = divmod(indice, turnos_por_dia)
+        semana, posicion = divmod(dia, len(dias))
+        fecha = lunes + timedelta(days=semana * 7 + dias[posicion])
+        return datetime.combine(fecha, HORARIO_APERTURA) + turno * duracion
+
+    return horario
+
+
+def generar_citas(cantidad, pacientes, medicos, ocupacion=0.85, semilla=42, inicio=INICIO,
+                  primer_paciente=1, primer_medico=1):
+    """
+    Genera citas en orden: (id paciente, id médico, fecha y hora, motivo)
+
+    Las citas se reparten entre los médicos por turnos; cada médico avanza por sus
+    horarios de atención y deja libre un turno con probabilidad 1 - ocupacion, así
+    que nunca hay dos citas solapadas del mismo médico.
+    """
+    aleatorio = random.Random(semilla + 2)
+    horario = horario_por_indice(inicio)
+    siguiente = [0] * medicos
+    for i in range(cantidad):
+        medico = i % medicos
+        while aleatorio.random() > ocupacion:
+            siguiente[medico] += 1
+        turno = siguiente[medico]
+        siguiente[medico] += 1
+        yield (
+            primer_paciente + aleatorio.randrange(pacientes),
+            primer_medico + medico,
+            horario(turno),
+            aleatorio.choice(MOTIVOS),
+        )
+
+
+def _insertar(db, query, filas, tamano_lote, etiqueta):
+    """Inserta las filas por lotes con executemany y confirma cada lote"""
+    cursor = db.get_cursor()
+    db.backend.preparar_lote(cursor)
+    total = 0
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= tamano_lote:
+            cursor.executemany(query, lote)
+            db.commit()
+            total += len(lote)
+            lote = []
+            if total % (tamano_lote * 10) == 0:
+                print(f"  {etiqueta}: {total}")
+    if lote:
+        cursor.executemany(query, lote)
+        db.commit()
+        total += len(lote)
+    return total
+
+
+def _primer_id(db, tabla):
+    cursor = db.get_cursor()
+    cursor.execute(f"SELECT MIN(Id) FROM {tabla}")
+    return cursor.fetchone()[0]
+
+
+def generar(pacientes, medicos, citas, ocupacion=0.85, semilla=42, tamano_lote=TAMANO_LOTE):
+    """
+    Llena la base configurada con datos sintéticos
+
+    Returns:
+        dict: Filas creadas por tabla y segundos empleados
+
+    Raises:
+        Exception: Si las tablas ya tienen datos
+    """
+    db = DatabaseConnection()
+    cursor = db.get_cursor()
+    for tabla in ('Paciente', 'Medico', 'Cita'):
+        cursor.execute(f"SELECT COUNT(*) FROM {tabla}")
+        if cursor.fetchone()[0]:
+            raise Exception(f"La tabla {tabla} ya tiene datos; el generador necesita una base vacía")
+
+    inicio = time.perf_counter()
+    _insertar(
+        db, "INSERT INTO Paciente (Nombre, Apellido, Cedula, FechaNacimiento, Email) VALUES (?, ?, ?, ?, ?)",
+        generar_pacientes(pacientes, semilla), tamano_lote, 'pacientes'
+    )
+    _insertar(
+        db, "INSERT INTO Medico (Nombre, Especialidad, Email) VALUES (?, ?, ?)",
+        generar_medicos(medicos, semilla), tamano_lote, 'médicos'
+    )
+    # Los IDs son consecutivos a partir del primero asignado por el motor
+    _insertar(
+        db, "INSERT INTO Cita (IdPaciente, IdMedico, FechaHora, Motivo) VALUES (?, ?, ?, ?)",
+        generar_citas(citas, pacientes, medicos, ocupacion, semilla,
+                      primer_paciente=_primer_id(db, 'Paciente'), primer_medico=_primer_id(db, 'Medico')),
+        tamano_lote, 'citas'
+    )
+    db.release()
+    return {
+        'pacientes': pacientes, 'medicos': medicos, 'citas': citas,
+        'semilla': semilla, 'segundos': time.perf_counter() - inicio,
+    }
+
+
+def configurar_sqlite(ruta):
+    """Usa una base SQLite local en lugar de la configurada en .env (antes de la primera conexión)"""
+    os.environ['DB_BACKEND'] = 'sqlite'
+    os.environ['SQLITE_PATH'] = ruta
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--escala', choices=ESCALAS, default='pequena')
+    parser.add_argument('--pacientes', type=int, help="Sustituye el valor de la escala")
+    parser.add_argument('--medicos', type=int, help="Sustituye el valor de la escala")
+    parser.add_argument('--citas', type=int, help="Sustituye el valor de la escala")
+    parser.add_argument('--ocupacion', type=float, default=0.85)
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--db', default='bench.db', help="Archivo SQLite de destino")
+    parser.add_argument('--usar-env', action='store_true',
+                        help="Escribe en la base configurada en .env en lugar de --db")
+    args = parser.parse_args()
+
+    if not args.usar_env:
+        configurar_sqlite(args.db)
+    pacientes, medicos, citas = ESCALAS[args.escala]
+    resultado = generar(
+        args.pacientes or pacientes, args.medicos or medicos, args.citas or citas,
+        args.ocupacion, args.semilla
+    )
+    print(f"\nGenerados {resultado['pacientes']} pacientes, {resultado['medicos']} médicos y "
+          f"{resultado['citas']} citas en {resultado['segundos']:.1f} s")
@@ -0,0 +1,210 @@
+import asyncio
+import contextlib
+import os
+import time
+from config import instrumentacion
+from config.database import DatabaseConnection
+from config.pool import PoolTimeoutError
+
+
+class AsyncConnectionPool:
+    """Pool acotado de conexiones asíncronas; las esperas no ocupan ningún hilo"""
+
+    def __init__(self, factory, max_size=10, timeout=30):
+        """
+        Inicializa el pool
+
+        Args:
+            factory (callable): Corrutina que abre una conexión nueva
+            max_size (int): Número máximo de conexiones abiertas a la vez
+            timeout (float): Segundos de espera por una conexión libre
+        """
+        if max_size < 1:
+            raise ValueError("El tamaño máximo del pool debe ser al menos 1")
+        self.factory = factory
+        self.max_size = max_size
+        self.timeout = timeout
+        # LIFO, como el pool síncrono
+        self._idle = []
+        self._size = 0
+        self._closed = False
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        """
+        Entrega una conexión del pool
+
+        Raises:
+            PoolTimeoutError: Si no se libera ninguna conexión a tiempo
+        """
+        deadline = time.monotonic() + self.timeout
+        async with self._cond:
+            while True:
+                if self._closed:
+                    raise Exception("El pool de conexiones está cerrado")
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"No hay conexiones disponibles tras {self.timeout} segundos "
+                        f"(máximo {self.max_size})"
+                    )
+                try:
+                    await asyncio.wait_for(self._cond.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+        # Hay espacio reservado para una conexión nueva
+        try:
+            return await self.factory()
+        except BaseException:
+            async with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    async def release(self, connection, discard=False):
+        """Devuelve una conexión al pool, sin transacciones pendientes"""
+        if not discard:
+            try:
+                await connection.rollback()
+            except Exception:
+                discard = True
+        async with self._cond:
+            if discard or self._closed:
+                self._size -= 1
+            else:
+                self._idle.append(connection)
+                connection = None
+            self._cond.notify()
+        if connection is not None:
+            with contextlib.suppress(Exception):
+                await connection.close()
+
+    async def close(self):
+        """Cierra las conexiones libres y rechaza nuevas solicitudes"""
+        async with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for connection in idle:
+            with contextlib.suppress(Exception):
+                await connection.close()
+
+    def estadisticas(self):
+        """Conexiones abiertas, libres y máximo configurado"""
+        return {
+            'abiertas': self._size,
+            'en_uso': self._size - len(self._idle),
+            'libres': len(self._idle),
+            'maximo': self.max_size,
+        }
+
+
+class AsyncDatabaseConnection:
+    """
+    Acceso asíncrono a la base de datos para el modo ASGI (aiosqlite o aioodbc)
+
+    Usa el mismo backend que DatabaseConnection, de modo que el dialecto SQL y el
+    esquema son los mismos; solo cambia el driver.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        """Una sola instancia por proceso, creada dentro del bucle de eventos"""
+        if cls._instance is None:
+            instance = super(AsyncDatabaseConnection, cls).__new__(cls)
+            instance._inicializar_pool()
+            cls._instance = instance
+        return cls._instance
+
+    def _inicializar_pool(self):
+        """Crea el pool con la configuración del entorno"""
+        # El pool síncrono valida la configuración y, en SQLite, crea el esquema
+        self.backend = DatabaseConnection().backend
+        max_size = int(os.getenv('DB_POOL_ASYNC_SIZE', os.getenv('DB_POOL_SIZE', '10')))
+        if self.backend.pool_maximo:
+            max_size = min(max_size, self.backend.pool_maximo)
+        self.pool = AsyncConnectionPool(
+            self.backend.connect_async,
+            max_size=max_size,
+            timeout=float(os.getenv('DB_POOL_TIMEOUT', '30'))
+        )
+        # Los informes largos comparten el pool con las consultas rápidas; este límite
+        # deja siempre conexiones libres para las segundas
+        self.informes = asyncio.Semaphore(
+            int(os.getenv('DB_ASYNC_INFORMES', str(max(1, max_size // 2))))
+        )
+
+    @contextlib.asynccontextmanager
+    async def conexion(self):
+        """Reserva una conexión del pool durante el bloque async with"""
+        connection = await self.pool.acquire()
+        # Con cualquier error, cancelación (cliente desconectado) o cierre de un
+        # generador a medias, la conexión puede quedar a mitad de una consulta y
+        # se descarta en lugar de volver al pool
+        descartar = True
+        try:
+            yield connection
+            descartar = False
+        finally:
+            await self.pool.release(connection, discard=descartar)
+
+    async def consultar(self, query, parametros=()):
+        """
+        Ejecuta una consulta y lee todas sus filas
+
+        Returns:
+            tuple: (cursor.description, lista de filas)
+        """
+        async with self.conexion() as connection:
+            cursor = await connection.cursor()
+            inicio = time.perf_counter()
+            try:
+                await cursor.execute(query, parametros)
+                filas = await cursor.fetchall()
+                if instrumentacion.HABILITADA:
+                    instrumentacion.registrar(query, time.perf_counter() - inicio, len(filas))
+                return cursor.description, filas
+            finally:
+                await cursor.close()
+
+    async def iterar(self, query, parametros=(), tamano_lote=500):
+        """
+        Ejecuta una consulta y entrega sus filas por lotes
+
+        La conexión queda reservada mientras dura el recorrido; entre lotes el
+        bucle de eventos atiende otras peticiones.
+
+        Yields:
+            tuple: (cursor.description, lista de filas del lote)
+        """
+        async with self.conexion() as connection:
+            cursor = await connection.cursor()
+            # Solo cuenta la espera a la base de datos, no el tiempo entre lotes
+            tiempo, total = 0.0, 0
+            try:
+                inicio = time.perf_counter()
+                await cursor.execute(query, parametros)
+                while True:
+                    filas = await cursor.fetchmany(tamano_lote)
+                    tiempo += time.perf_counter() - inicio
+                    if not filas:
+                        break
+                    total += len(filas)
+                    yield cursor.description, filas
+                    inicio = time.perf_counter()
+            finally:
+                await cursor.close()
+                if instrumentacion.HABILITADA:
+                    instrumentacion.registrar(query, tiempo, total)
+
+    async def close(self):
+        """Cierra todas las conexiones asíncronas"""
+        await self.pool.close()
+        AsyncDatabaseConnection._instance = None
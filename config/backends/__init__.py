@@ -0,0 +1,25 @@
+import os
+
+
+def obtener_backend(nombre=None):
+    """
+    Crea el backend de almacenamiento configurado
+
+    Args:
+        nombre (str, opcional): 'sqlserver' o 'sqlite'; por defecto DB_BACKEND
+
+    Returns:
+        Backend: Instancia del backend solicitado
+    """
+    nombre = (nombre or os.getenv('DB_BACKEND', 'sqlserver')).lower()
+    # Importación diferida para no exigir pyodbc cuando se usa SQLite
+    if nombre == 'sqlserver':
+        from config.backends.sqlserver import SQLServerBackend
+        return SQLServerBackend()
+    if nombre == 'sqlite':
+        from config.backends.sqlite import SQLiteBackend
+        return SQLiteBackend(
+            ruta=os.getenv('SQLITE_PATH', 'clinica.db'),
+            wal=os.getenv('SQLITE_WAL', '1') == '1'
+        )
+    raise ValueError(f"Backend de base de datos no soportado: {nombre}")
@@ -0,0 +1,75 @@
+class Backend:
+    """Interfaz común de los motores de base de datos soportados"""
+
+    nombre = None
+    # Límite de conexiones simultáneas que admite el motor (None = sin límite)
+    pool_maximo = None
+    # Marcador SQL para un parámetro de tipo fecha
+    sql_fecha = "?"
+    # Cláusula que limita el número de filas; va después del ORDER BY
+    sql_limite = "LIMIT ?"
+    # Excepciones del driver que indican una restricción violada (FK, UNIQUE, ...)
+    errores_integridad = ()
+    # Sugerencia de tabla que mantiene bloqueado hasta el commit el rango leído
+    sql_bloqueo = ""
+
+    def connect(self):
+        """Abre una conexión nueva con autocommit desactivado"""
+        raise NotImplementedError
+
+    async def connect_async(self):
+        """Abre una conexión con el driver asíncrono del motor (modo ASGI)"""
+        raise NotImplementedError
+
+    def sql_pagina(self, limite, desplazamiento):
+        """
+        Cláusula que salta filas y limita el resultado; va después del ORDER BY
+
+        Returns:
+            tuple: (sql, parámetros en el orden en que aparecen)
+        """
+        return "LIMIT ? OFFSET ?", (limite, desplazamiento)
+
+    def sql_busqueda_pacientes(self, terminos):
+        """
+        Búsqueda de texto completo sobre Paciente para términos ya normalizados
+
+        Todos los términos deben aparecer (como prefijo de alguna palabra) en el
+        nombre, apellido, cédula o email.
+
+        Returns:
+            tuple or None: (JOIN y WHERE sobre el alias p, parámetros, expresión de
+                orden por relevancia), o None si el motor no tiene índice de texto
+        """
+        return None
+
+    def valor_fecha(self, fecha):
+        """Convierte una fecha al valor que espera sql_fecha"""
+        return fecha
+
+    def iniciar_escritura(self, connection):
+        """
+        Abre la transacción de escritura antes de leer los datos que esa escritura valida
+
+        Junto con sql_bloqueo, impide que otra conexión escriba entre la
+        comprobación y la escritura.
+        """
+        pass
+
+    def preparar_lote(self, cursor):
+        """Ajusta el cursor antes de un executemany de muchas filas"""
+        pass
+
+    def sql_insertar(self, tabla, columnas, valores=None):
+        """
+        Construye un INSERT que devuelve el Id generado en la misma sentencia
+
+        Args:
+            tabla (str): Tabla destino
+            columnas (list): Columnas a insertar
+            valores (list, opcional): Expresión SQL de cada valor; por defecto '?'
+
+        Returns:
+            str: Sentencia cuyo resultado es una fila con la columna Id
+        """
+        raise NotImplementedError
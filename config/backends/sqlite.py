@@ -0,0 +1,153 @@
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+from datetime import date, datetime
+from functools import lru_cache
+from config.backends.base import Backend
+
+ESQUEMA = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'sql', 'sqlite_schema.sql')
+
+# Conversión explícita de fechas (los adaptadores por defecto están obsoletos desde Python 3.12)
+sqlite3.register_adapter(datetime, lambda valor: valor.isoformat(' '))
+sqlite3.register_adapter(date, lambda valor: valor.isoformat())
+sqlite3.register_converter('TIMESTAMP', lambda valor: datetime.fromisoformat(valor.decode()))
+sqlite3.register_converter('DATE', lambda valor: date.fromisoformat(valor.decode()))
+
+
+@lru_cache(maxsize=256)
+def _clase_fila(columnas):
+    """Crea (una sola vez por conjunto de columnas) la clase de fila con acceso por atributo"""
+    return namedtuple('Fila', columnas, rename=True)
+
+
+class _FabricaFilas:
+    """row_factory que imita pyodbc.Row: acceso por índice y por nombre de columna"""
+
+    __slots__ = ('descripcion', 'crear')
+
+    def __init__(self):
+        self.descripcion = None
+        self.crear = None
+
+    def __call__(self, cursor, fila):
+        descripcion = cursor.description
+        if descripcion is not self.descripcion:
+            self.descripcion = descripcion
+            self.crear = _clase_fila(tuple(columna[0] for columna in descripcion))._make
+        return self.crear(fila)
+
+
+class SQLiteBackend(Backend):
+    """Backend SQLite en proceso, para ejecución local, pruebas de carga y benchmarks"""
+
+    nombre = 'sqlite'
+    errores_integridad = (sqlite3.IntegrityError,)
+
+    def __init__(self, ruta='clinica.db', wal=True):
+        """
+        Inicializa el backend
+
+        Args:
+            ruta (str): Archivo de la base de datos o ':memory:' para trabajar en memoria
+            wal (bool): Activa el modo WAL (lectores concurrentes con un escritor)
+        """
+        self.en_memoria = ruta == ':memory:'
+        self.wal = wal and not self.en_memoria
+        self._esquema_creado = False
+        self._lock = threading.Lock()
+        if self.en_memoria:
+            # Base compartida entre las conexiones del proceso; una única conexión
+            # a la vez evita los bloqueos de tabla de la caché compartida
+            self.ruta = f"file:clinica_memoria_{id(self)}?mode=memory&cache=shared"
+            self.pool_maximo = 1
+            # La base en memoria existe mientras quede una conexión abierta
+            self._ancla = self._abrir()
+        else:
+            self.ruta = ruta
+            self._ancla = None
+
+    def _abrir(self):
+        """Abre una conexión configurada para el resto de la aplicación"""
+        connection = sqlite3.connect(
+            self.ruta,
+            uri=self.en_memoria,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+            timeout=30
+        )
+        connection.row_factory = _FabricaFilas()
+        connection.execute("PRAGMA foreign_keys = ON")
+        if self.wal:
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    async def connect_async(self):
+        """
+        Abre una conexión aiosqlite para el modo ASGI
+
+        El esquema lo crea connect(), así que debe haberse abierto antes el pool síncrono.
+        """
+        try:
+            import aiosqlite
+        except ImportError:
+            raise Exception("El modo asíncrono con SQLite requiere el paquete aiosqlite")
+        connection = await aiosqlite.connect(
+            self.ruta,
+            uri=self.en_memoria,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            timeout=30
+        )
+        connection.row_factory = _FabricaFilas()
+        await connection.execute("PRAGMA foreign_keys = ON")
+        if self.wal:
+            await connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    def connect(self):
+        """Abre una conexión nueva y crea el esquema la primera vez"""
+        connection = self._abrir()
+        if not self._esquema_creado:
+            with self._lock:
+                if not self._esquema_creado:
+                    busqueda_existia = connection.execute(
+                        "SELECT 1 FROM sqlite_master WHERE name = 'PacienteBusqueda'"
+                    ).fetchone()
+                    # Bases creadas antes de las versiones de fila
+                    for tabla in ('Paciente', 'Medico', 'Cita'):
+                        columnas = [fila[1] for fila in connection.execute(f"PRAGMA table_info({tabla})")]
+                        if columnas and 'Version' not in columnas:
+                            connection.execute(
+                                f"ALTER TABLE {tabla} ADD COLUMN Version INTEGER NOT NULL DEFAULT 1"
+                            )
+                    with open(ESQUEMA, encoding='utf-8') as archivo:
+                        connection.executescript(archivo.read())
+                    if not busqueda_existia:
+                        # Base creada antes del índice de texto: se indexan los pacientes existentes
+                        connection.execute("INSERT INTO PacienteBusqueda (PacienteBusqueda) VALUES ('rebuild')")
+                    connection.commit()
+                    self._esquema_creado = True
+        return connection
+
+    def sql_busqueda_pacientes(self, terminos):
+        """MATCH sobre la tabla FTS5 PacienteBusqueda, ordenado por bm25 (el apellido pesa más)"""
+        expresion = " ".join(f'"{termino}"*' for termino in terminos)
+        return (
+            "INNER JOIN PacienteBusqueda b ON b.rowid = p.Id WHERE PacienteBusqueda MATCH ?",
+            [expresion],
+            "bm25(PacienteBusqueda, 2.0, 3.0, 2.0, 1.0)"
+        )
+
+    def iniciar_escritura(self, connection):
+        """BEGIN IMMEDIATE toma el bloqueo de escritura de la base antes de la lectura"""
+        if not connection.in_transaction:
+            connection.execute("BEGIN IMMEDIATE")
+
+    def sql_insertar(self, tabla, columnas, valores=None):
+        """INSERT con RETURNING Id (SQLite 3.35 o superior)"""
+        valores = valores or ['?'] * len(columnas)
+        return (
+            f"INSERT INTO {tabla} ({', '.join(columnas)}) "
+            f"VALUES ({', '.join(valores)}) RETURNING Id"
+        )
@@ -0,0 +1,74 @@
+import os
+import pyodbc
+from config.backends.base import Backend
+
+
+class SQLServerBackend(Backend):
+    """Backend para SQL Server mediante pyodbc"""
+
+    nombre = 'sqlserver'
+    sql_fecha = "CONVERT(DATE, ?, 105)"
+    sql_limite = "OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY"
+    errores_integridad = (pyodbc.IntegrityError,)
+    # Bloqueo de actualización sobre el rango de claves leído (serializable) hasta el commit
+    sql_bloqueo = " WITH (UPDLOCK, HOLDLOCK)"
+
+    def connect(self):
+        """Establece una conexión nueva a SQL Server"""
+        connection = pyodbc.connect(self._cadena_conexion())
+        connection.autocommit = False
+        return connection
+
+    async def connect_async(self):
+        """Establece una conexión aioodbc (pyodbc en un hilo propio) para el modo ASGI"""
+        try:
+            import aioodbc
+        except ImportError:
+            raise Exception("El modo asíncrono con SQL Server requiere el paquete aioodbc")
+        return await aioodbc.connect(dsn=self._cadena_conexion(), autocommit=False)
+
+    def _cadena_conexion(self):
+        """Cadena de conexión ODBC a partir de las variables de entorno"""
+        server = os.getenv('DB_SERVER', 'localhost')
+        database = os.getenv('DB_NAME', 'ClinicaDB')
+        username = os.getenv('DB_USER', 'sa')
+        password = os.getenv('DB_PASSWORD', '')
+        # Obtener el driver desde .env o usar el valor por defecto 'SQL Server'
+        driver = os.getenv('DB_DRIVER', 'SQL Server')
+
+        return (
+            f"DRIVER={{{driver}}};"
+            f"SERVER={server};"
+            f"DATABASE={database};"
+            f"UID={username};"
+            f"PWD={password};"
+        )
+
+    def sql_pagina(self, limite, desplazamiento):
+        """OFFSET ... FETCH recibe primero las filas a saltar"""
+        return "OFFSET ? ROWS FETCH NEXT ? ROWS ONLY", (desplazamiento, limite)
+
+    def sql_busqueda_pacientes(self, terminos):
+        """CONTAINSTABLE sobre el índice de texto completo de config/sql/sqlserver_busqueda.sql"""
+        expresion = " AND ".join(f'"{termino}*"' for termino in terminos)
+        return (
+            "INNER JOIN CONTAINSTABLE(Paciente, (Nombre, Apellido, Cedula, Email), ?) b ON b.[KEY] = p.Id",
+            [expresion],
+            "b.RANK DESC"
+        )
+
+    def valor_fecha(self, fecha):
+        """CONVERT con estilo 105 espera el formato DD-MM-YYYY"""
+        return fecha.strftime('%d-%m-%Y')
+
+    def preparar_lote(self, cursor):
+        """Envía los parámetros del executemany en bloque en lugar de fila a fila"""
+        cursor.fast_executemany = True
+
+    def sql_insertar(self, tabla, columnas, valores=None):
+        """INSERT con OUTPUT INSERTED.Id (la tabla no debe tener triggers)"""
+        valores = valores or ['?'] * len(columnas)
+        return (
+            f"INSERT INTO {tabla} ({', '.join(columnas)}) "
+            f"OUTPUT INSERTED.Id VALUES ({', '.join(valores)})"
+        )
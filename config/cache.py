@@ -0,0 +1,139 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Marca interna para distinguir "no está en caché" de un valor None
+_AUSENTE = object()
+
+
+class CacheLRU:
+    """Caché en memoria con expiración por tiempo (TTL) y desalojo LRU, segura entre hilos"""
+
+    def __init__(self, max_entradas=1024, ttl=60, max_bytes=None, tamano=None):
+        """
+        Inicializa la caché
+
+        Args:
+            max_entradas (int): Número máximo de claves; al superarlo se desaloja la menos usada
+            ttl (float): Segundos de validez de cada entrada (0 = sin expiración)
+            max_bytes (int, opcional): Tamaño total máximo de los valores; al superarlo
+                se desalojan las menos usadas
+            tamano (callable, opcional): Devuelve el tamaño en bytes de un valor;
+                necesario con max_bytes
+        """
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.tamano = tamano
+        self._datos = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Aumenta con cada invalidación; evita guardar valores leídos antes de un cambio
+        self._generacion = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.invalidaciones = 0
+
+    def _buscar(self, clave, ahora, vigente=None):
+        """Devuelve el valor vigente o _AUSENTE (requiere el lock)"""
+        entrada = self._datos.get(clave)
+        if entrada is None:
+            return _AUSENTE
+        valor, expira, tamano = entrada
+        if expira and expira <= ahora:
+            del self._datos[clave]
+            self._bytes -= tamano
+            return _AUSENTE
+        if vigente is not None and not vigente(valor):
+            del self._datos[clave]
+            self._bytes -= tamano
+            self.invalidaciones += 1
+            return _AUSENTE
+        self._datos.move_to_end(clave)
+        return valor
+
+    def obtener(self, clave, cargar, vigente=None):
+        """
+        Lectura a través de la caché
+
+        Args:
+            clave: Clave de la entrada
+            cargar (callable): Función que obtiene el valor si no está en caché;
+                los resultados None no se guardan
+            vigente (callable, opcional): Recibe el valor guardado y devuelve False
+                si ya no vale; entonces se descarta y se vuelve a cargar
+
+        Returns:
+            El valor en caché o el recién cargado
+        """
+        with self._lock:
+            valor = self._buscar(clave, time.monotonic(), vigente)
+            if valor is not _AUSENTE:
+                self.aciertos += 1
+                return valor
+            self.fallos += 1
+            generacion = self._generacion
+
+        valor = cargar()
+        if valor is not None:
+            with self._lock:
+                # Si hubo una invalidación durante la carga el valor puede estar desactualizado
+                if generacion == self._generacion:
+                    self._guardar(clave, valor)
+        return valor
+
+    def _guardar(self, clave, valor):
+        """Inserta una entrada y desaloja las menos usadas (requiere el lock)"""
+        expira = time.monotonic() + self.ttl if self.ttl else None
+        tamano = self.tamano(valor) if self.tamano else 0
+        if self.max_bytes is not None and tamano > self.max_bytes:
+            return
+        anterior = self._datos.pop(clave, None)
+        if anterior is not None:
+            self._bytes -= anterior[2]
+        self._datos[clave] = (valor, expira, tamano)
+        self._bytes += tamano
+        while len(self._datos) > self.max_entradas or (
+                self.max_bytes is not None and self._bytes > self.max_bytes):
+            _, (_, _, desalojado) = self._datos.popitem(last=False)
+            self._bytes -= desalojado
+            self.desalojos += 1
+
+    def invalidar(self, *claves):
+        """Elimina las claves indicadas"""
+        with self._lock:
+            self._generacion += 1
+            for clave in claves:
+                entrada = self._datos.pop(clave, None)
+                if entrada is not None:
+                    self._bytes -= entrada[2]
+                    self.invalidaciones += 1
+
+    def limpiar(self):
+        """Elimina todas las entradas"""
+        with self._lock:
+            self._generacion += 1
+            self._datos.clear()
+            self._bytes = 0
+
+    def estadisticas(self):
+        """
+        Obtiene los contadores de uso de la caché
+
+        Returns:
+            dict: Aciertos, fallos, tasa de aciertos, desalojos, invalidaciones y tamaño
+                (entradas y, si se miden, bytes)
+        """
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+                'desalojos': self.desalojos,
+                'invalidaciones': self.invalidaciones,
+                'entradas': len(self._datos),
+                'max_entradas': self.max_entradas,
+                **({'bytes': self._bytes, 'max_bytes': self.max_bytes} if self.tamano else {}),
+            }
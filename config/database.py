@@ -1,65 +1,114 @@
 import os
-import pyodbc
+import threading
 from dotenv import load_dotenv
+from config import instrumentacion
+from config.backends import obtener_backend
+from config.pool import ConnectionPool
 
 # Cargar variables de entorno
 load_dotenv()
 
 class DatabaseConnection:
-    """Clase para gestionar la conexión a la base de datos SQL Server"""
-    
+    """Clase para gestionar las conexiones a la base de datos (SQL Server o SQLite)"""
+
     _instance = None
-    
+    _lock = threading.Lock()
+
     def __new__(cls):
-        """Implementación del patrón Singleton para la conexión a BD"""
+        """Implementación del patrón Singleton para el pool de conexiones"""
         if cls._instance is None:
-            cls._instance = super(DatabaseConnection, cls).__new__(cls)
-            cls._instance._connect()
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(DatabaseConnection, cls).__new__(cls)
+                    instance._inicializar_pool()
+                    cls._instance = instance
+        return cls._instance
+
+    @classmethod
+    def actual(cls):
+        """Instancia del proceso actual, o None si todavía no se ha conectado"""
         return cls._instance
-    
+
+    @classmethod
+    def _tras_fork(cls):
+        """
+        En el proceso hijo de un fork se descarta el pool heredado
+
+        Las conexiones del padre no se cierran desde el hijo (cerrarlas afectaría
+        también al padre); cada proceso abre las suyas en el primer uso.
+        """
+        cls._instance = None
+        cls._lock = threading.Lock()
+
+    def _inicializar_pool(self):
+        """Crea el pool de conexiones con la configuración del entorno"""
+        # Cada hilo trabaja con su propia conexión del pool
+        self._local = threading.local()
+        self.backend = obtener_backend()
+        max_size = int(os.getenv('DB_POOL_SIZE', '10'))
+        if self.backend.pool_maximo:
+            max_size = min(max_size, self.backend.pool_maximo)
+        self.pool = ConnectionPool(
+            self._connect,
+            max_size=max_size,
+            min_size=int(os.getenv('DB_POOL_MIN', '1')),
+            timeout=float(os.getenv('DB_POOL_TIMEOUT', '30')),
+            max_idle=float(os.getenv('DB_POOL_MAX_IDLE', '300')),
+            ping_after=float(os.getenv('DB_POOL_PING', '30'))
+        )
+        # Abrir las conexiones mínimas para detectar errores de configuración al inicio
+        self.pool.prefill()
+        print("Conexión a la base de datos establecida con éxito.")
+
     def _connect(self):
-        """Establece la conexión a la base de datos"""
+        """Establece una conexión nueva a la base de datos"""
         try:
-            server = os.getenv('DB_SERVER', 'localhost')
-            database = os.getenv('DB_NAME', 'ClinicaDB')
-            username = os.getenv('DB_USER', 'sa')
-            password = os.getenv('DB_PASSWORD', '')
-            # Obtener el driver desde .env o usar el valor por defecto 'SQL Server'
-            driver = os.getenv('DB_DRIVER', 'SQL Server')
-            
-            connection_string = (
-                f"DRIVER={{{driver}}};"
-                f"SERVER={server};"
-                f"DATABASE={database};"
-                f"UID={username};"
-                f"PWD={password};"
-            )
-            
-            self.connection = pyodbc.connect(connection_string)
-            self.connection.autocommit = False
-            print("Conexión a la base de datos establecida con éxito.")
+            return self.backend.connect()
         except Exception as e:
             print(f"Error al conectar a la base de datos: {e}")
             raise e
-    
+
     def get_connection(self):
-        """Retorna la conexión activa"""
-        return self.connection
-    
+        """Retorna la conexión asignada al hilo actual, tomándola del pool si hace falta"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self.pool.acquire()
+            self._local.connection = connection
+        return connection
+
     def get_cursor(self):
         """Retorna un cursor para ejecutar consultas"""
-        return self.connection.cursor()
-    
+        cursor = self.get_connection().cursor()
+        if instrumentacion.HABILITADA:
+            return instrumentacion.CursorInstrumentado(cursor)
+        return cursor
+
     def commit(self):
         """Confirma los cambios en la base de datos"""
-        self.connection.commit()
-        
+        self.get_connection().commit()
+
     def rollback(self):
         """Revierte los cambios en caso de error"""
-        self.connection.rollback()
-    
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.rollback()
+
+    def release(self):
+        """Devuelve al pool la conexión del hilo actual (p. ej. al terminar una petición)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            self._local.connection = None
+            self.pool.release(connection)
+
     def close(self):
-        """Cierra la conexión a la base de datos"""
-        if hasattr(self, 'connection') and self.connection:
-            self.connection.close()
-            print("Conexión a la base de datos cerrada.")
\ No newline at end of file
+        """Cierra todas las conexiones a la base de datos"""
+        self.release()
+        self.pool.close()
+        print("Conexión a la base de datos cerrada.")
+        if DatabaseConnection._instance is self:
+            DatabaseConnection._instance = None
+
+
+# Servidores pre-fork (gunicorn): cada worker tiene su propio pool
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=DatabaseConnection._tras_fork)
@@ -0,0 +1,281 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from config import metricas
+
+# Medición de las consultas de cada cursor (DB_INSTRUMENTACION=0 la desactiva)
+HABILITADA = os.getenv('DB_INSTRUMENTACION', '1') == '1'
+# Consultas que tardan al menos esto se escriben en el registro de consultas lentas
+UMBRAL_CONSULTA_MS = float(os.getenv('DB_UMBRAL_LENTA_MS', '100'))
+# Peticiones cuyo tiempo total en la base de datos llega a esto se registran con
+# sus sentencias principales
+UMBRAL_PETICION_MS = float(os.getenv('DB_UMBRAL_PETICION_MS', '500'))
+# Sentencias que se detallan en el registro de una petición lenta
+SENTENCIAS_PRINCIPALES = 5
+# Longitud máxima del texto SQL en el registro
+LARGO_SQL = 500
+
+# Registro de la petición en curso; cada hilo y cada tarea asyncio tiene el suyo
+_registro = contextvars.ContextVar('registro_consultas', default=None)
+
+
+def _crear_logger():
+    """Logger de consultas lentas: una línea JSON por evento, en DB_LOG_LENTAS o en stderr"""
+    logger = logging.getLogger('clinica.consultas_lentas')
+    if not logger.handlers:
+        ruta = os.getenv('DB_LOG_LENTAS')
+        handler = logging.FileHandler(ruta, encoding='utf-8') if ruta else logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+logger = _crear_logger()
+
+
+@functools.lru_cache(maxsize=1024)
+def normalizar_sql(query):
+    """Texto SQL en una sola línea y recortado; agrupa la misma sentencia escrita en varias líneas"""
+    texto = ' '.join(query.split())
+    return texto if len(texto) <= LARGO_SQL else texto[:LARGO_SQL] + '...'
+
+
+def _escribir(evento, **datos):
+    """Escribe un evento en el registro estructurado (salvo dentro de metricas.sin_registrar)"""
+    if not metricas.registrando():
+        return
+    datos = {'evento': evento, 'fecha': datetime.now(timezone.utc).isoformat(timespec='milliseconds'), **datos}
+    logger.info(json.dumps(datos, ensure_ascii=False, default=str))
+
+
+class RegistroConsultas:
+    """Consultas ejecutadas durante una petición: número, tiempo, filas y detalle por sentencia"""
+
+    __slots__ = ('ruta', 'consultas', 'tiempo', 'filas', 'sentencias', '_inicio')
+
+    def __init__(self, ruta=None):
+        self.ruta = ruta
+        self.consultas = 0
+        self.tiempo = 0.0
+        self.filas = 0
+        # (origen, sql) -> [ejecuciones, segundos, filas]
+        self.sentencias = {}
+        self._inicio = time.perf_counter()
+
+    def agregar(self, clave, tiempo, filas, nueva):
+        """Suma el tiempo y las filas de una operación de cursor a su sentencia"""
+        self.tiempo += tiempo
+        self.filas += filas
+        sentencia = self.sentencias.get(clave)
+        if sentencia is None:
+            sentencia = self.sentencias[clave] = [0, 0.0, 0]
+        if nueva:
+            self.consultas += 1
+            sentencia[0] += 1
+        sentencia[1] += tiempo
+        sentencia[2] += filas
+
+    def principales(self, cantidad=SENTENCIAS_PRINCIPALES):
+        """Sentencias que más tiempo sumaron, de mayor a menor"""
+        ordenadas = sorted(self.sentencias.items(), key=lambda item: item[1][1], reverse=True)
+        return [
+            {'origen': origen, 'sql': sql, 'veces': veces, 'ms': round(tiempo * 1000, 3), 'filas': filas}
+            for (origen, sql), (veces, tiempo, filas) in ordenadas[:cantidad]
+        ]
+
+    def server_timing(self):
+        """Valor de la cabecera Server-Timing con el tiempo en base de datos y el total"""
+        total = (time.perf_counter() - self._inicio) * 1000
+        return (
+            f'db;dur={self.tiempo * 1000:.2f};desc="{self.consultas} consultas, {self.filas} filas", '
+            f'app;dur={total:.2f}'
+        )
+
+
+def iniciar(ruta=None):
+    """
+    Empieza a medir las consultas del contexto actual (una petición)
+
+    Returns:
+        tuple: (registro, token para finalizar)
+    """
+    registro = RegistroConsultas(ruta)
+    return registro, _registro.set(registro)
+
+
+def actual():
+    """Registro del contexto actual, o None si no se está midiendo"""
+    return _registro.get()
+
+
+def finalizar(token):
+    """
+    Termina la medición; si la petición pasó mucho tiempo en la base de datos,
+    la escribe en el registro de consultas lentas con sus sentencias principales
+
+    Returns:
+        RegistroConsultas: El registro terminado
+    """
+    registro = _registro.get()
+    try:
+        _registro.reset(token)
+    except ValueError:
+        # El token se creó en otro contexto (p. ej. un servidor que cambia de hilo)
+        _registro.set(None)
+    if registro is not None and registro.tiempo * 1000 >= UMBRAL_PETICION_MS:
+        _escribir(
+            'peticion_lenta', ruta=registro.ruta, consultas=registro.consultas,
+            ms=round(registro.tiempo * 1000, 3), filas=registro.filas,
+            principales=registro.principales()
+        )
+    return registro
+
+
+def registrar(query, tiempo, filas, origen=None):
+    """Registra una consulta completa medida fuera de un cursor instrumentado (p. ej. en modo asíncrono)"""
+    sql = normalizar_sql(query)
+    metricas.consultas.observar(tiempo)
+    registro = _registro.get()
+    if registro is not None:
+        registro.agregar((origen, sql), tiempo, filas, True)
+    if tiempo * 1000 >= UMBRAL_CONSULTA_MS:
+        _escribir(
+            'consulta_lenta', origen=origen, sql=sql, ms=round(tiempo * 1000, 3), filas=filas,
+            ruta=registro.ruta if registro is not None else None
+        )
+
+
+def _origen(profundidad):
+    """
+    Función que ejecutó la sentencia (p. ej. 'Cita.obtener_por_fecha')
+
+    Los métodos privados de los modelos (Cita._consultar) se atribuyen al método
+    público que los llamó, que es el que identifica la consulta.
+    """
+    frame = sys._getframe(profundidad)
+    for _ in range(4):
+        nombre = frame.f_code.co_name
+        if not nombre.startswith('_') or frame.f_back is None:
+            break
+        frame = frame.f_back
+    return getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)
+
+
+class CursorInstrumentado:
+    """
+    Envoltorio de un cursor DB-API que mide cada sentencia
+
+    El tiempo de una sentencia incluye su ejecución y la lectura de sus filas (en
+    SQLite la mayor parte del trabajo ocurre al leer). Cada sentencia se cierra al
+    leer su última fila (o la única, con fetchone), al ejecutar la siguiente o al
+    cerrar el cursor; entonces se suma al registro de la petición y, si superó el
+    umbral, se escribe en el registro de consultas lentas. Los parámetros no se
+    registran, porque contienen datos de pacientes.
+    """
+
+    __slots__ = ('_cursor', '_clave', '_tiempo', '_filas', '_nueva')
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._clave = None
+        self._tiempo = 0.0
+        self._filas = 0
+        self._nueva = False
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+    @property
+    def fast_executemany(self):
+        return self._cursor.fast_executemany
+
+    @fast_executemany.setter
+    def fast_executemany(self, valor):
+        # Opción de pyodbc que activa SQLServerBackend.preparar_lote
+        self._cursor.fast_executemany = valor
+
+    def _ejecutar(self, metodo, query, args):
+        if self._clave is not None:
+            self._terminar()
+        self._clave = (_origen(3), normalizar_sql(query))
+        self._nueva = True
+        inicio = time.perf_counter()
+        try:
+            metodo(query, *args)
+        except Exception as e:
+            metricas.errores_bd.incrementar(type(e).__name__)
+            raise
+        finally:
+            self._tiempo = time.perf_counter() - inicio
+            self._filas = 0
+        return self
+
+    def execute(self, query, *args):
+        return self._ejecutar(self._cursor.execute, query, args)
+
+    def executemany(self, query, *args):
+        return self._ejecutar(self._cursor.executemany, query, args)
+
+    def _terminar(self):
+        """Cierra la medición de la sentencia actual; las lecturas posteriores se suman aparte"""
+        clave, tiempo, filas = self._clave, self._tiempo, self._filas
+        registro = _registro.get()
+        if registro is not None:
+            registro.agregar(clave, tiempo, filas, self._nueva)
+        if self._nueva:
+            metricas.consultas.observar(tiempo)
+        if self._nueva and tiempo * 1000 >= UMBRAL_CONSULTA_MS:
+            _escribir(
+                'consulta_lenta', origen=clave[0], sql=clave[1], ms=round(tiempo * 1000, 3),
+                filas=filas, ruta=registro.ruta if registro is not None else None
+            )
+        self._nueva = False
+        self._tiempo = 0.0
+        self._filas = 0
+
+    def fetchone(self):
+        inicio = time.perf_counter()
+        fila = self._cursor.fetchone()
+        self._tiempo += time.perf_counter() - inicio
+        if fila is not None:
+            self._filas += 1
+        if self._clave is not None:
+            self._terminar()
+        return fila
+
+    def fetchall(self):
+        inicio = time.perf_counter()
+        filas = self._cursor.fetchall()
+        self._tiempo += time.perf_counter() - inicio
+        self._filas += len(filas)
+        if self._clave is not None:
+            self._terminar()
+        return filas
+
+    def fetchmany(self, size=None):
+        inicio = time.perf_counter()
+        filas = self._cursor.fetchmany(size) if size is not None else self._cursor.fetchmany()
+        self._tiempo += time.perf_counter() - inicio
+        self._filas += len(filas)
+        if self._clave is not None and (not filas or (size is not None and len(filas) < size)):
+            self._terminar()
+        return filas
+
+    def __iter__(self):
+        while True:
+            filas = self.fetchmany(100)
+            if not filas:
+                return
+            yield from filas
+
+    def close(self):
+        if self._clave is not None and (self._nueva or self._tiempo):
+            self._terminar()
+        self._cursor.close()
@@ -0,0 +1,348 @@
+import contextlib
+import contextvars
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Límites (en segundos) de los histogramas de latencia
+LIMITES_PETICION = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_CONSULTA = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+# Carpeta donde cada worker de gunicorn vuelca sus métricas para que /metrics sume
+# todos los procesos; vacía = solo las del proceso que atiende la petición
+DIRECTORIO = os.getenv('METRICAS_DIRECTORIO', '')
+# Segundos entre volcados de cada worker; acota el retraso de los totales
+INTERVALO = float(os.getenv('METRICAS_INTERVALO', '5'))
+
+# Falso dentro de sin_registrar(): lo que se mide ahí no es tráfico real
+_registrando = contextvars.ContextVar('metricas_registrando', default=True)
+
+
+def registrando():
+    """Indica si lo que ocurre en el contexto actual debe registrarse"""
+    return _registrando.get()
+
+
+@contextlib.contextmanager
+def sin_registrar():
+    """
+    No registra las métricas ni el registro de consultas lentas del bloque
+
+    Se usa al calentar un proceso: sus peticiones internas no deben contar como
+    tráfico en los histogramas ni aparecer como peticiones lentas.
+    """
+    token = _registrando.set(False)
+    try:
+        yield
+    finally:
+        _registrando.reset(token)
+
+
+def _escapar(valor):
+    """Escapa el valor de una etiqueta según el formato de exposición de Prometheus"""
+    return str(valor).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _etiquetas(nombres, valores, extra=''):
+    """Texto {a="1",b="2"} de una serie"""
+    pares = [f'{nombre}="{_escapar(valor)}"' for nombre, valor in zip(nombres, valores)]
+    if extra:
+        pares.append(extra)
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+def _numero(valor):
+    """Número en el formato de exposición (+Inf, enteros sin decimales)"""
+    if valor == math.inf:
+        return '+Inf'
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return repr(valor)
+
+
+def _sumar(series, otros):
+    """
+    Suma elemento a elemento las series de este proceso y las volcadas por otros
+
+    Args:
+        series (dict): Tupla de valores de etiquetas -> lista de contadores
+        otros (iterable): Estados de otros procesos, listas de [valores, serie]
+
+    Returns:
+        dict: Mismo formato que series, con los totales
+    """
+    total = {valores: list(serie) for valores, serie in list(series.items())}
+    for estado in otros:
+        for valores, serie in estado:
+            valores = tuple(valores)
+            actual = total.get(valores)
+            total[valores] = list(serie) if actual is None else [a + b for a, b in zip(actual, serie)]
+    return total
+
+
+class Contador:
+    """
+    Contador monótono con etiquetas
+
+    Los incrementos no toman ningún lock: cada serie es una lista de un elemento
+    y, con el GIL, una actualización concurrente perdida es posible pero rara y
+    no afecta a la tendencia, que es lo que se mide.
+    """
+
+    tipo = 'counter'
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._series = {}
+
+    def incrementar(self, *valores, cantidad=1):
+        if not _registrando.get():
+            return
+        serie = self._series.get(valores)
+        if serie is None:
+            serie = self._series.setdefault(valores, [0])
+        serie[0] += cantidad
+
+    def estado(self):
+        """Series del proceso en un formato que se puede guardar en JSON"""
+        return [[list(valores), list(serie)] for valores, serie in list(self._series.items())]
+
+    def lineas(self, otros=None):
+        """Líneas de exposición, sumando los estados de otros procesos si se indican"""
+        series = _sumar(self._series, [estado for _, _, estado in otros or ()])
+        for valores, serie in series.items():
+            yield f"{self.nombre}{_etiquetas(self.etiquetas, valores)} {_numero(serie[0])}"
+
+
+class Histograma:
+    """Histograma de latencias con etiquetas; mismas garantías que Contador"""
+
+    tipo = 'histogram'
+
+    def __init__(self, nombre, ayuda, etiquetas=(), limites=LIMITES_PETICION):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.limites = tuple(limites)
+        self._series = {}
+
+    def observar(self, valor, *valores):
+        if not _registrando.get():
+            return
+        serie = self._series.get(valores)
+        if serie is None:
+            # Un contador por intervalo (el último, por encima del mayor límite), la suma y el total
+            serie = self._series.setdefault(valores, [0] * (len(self.limites) + 1) + [0.0, 0])
+        serie[bisect_left(self.limites, valor)] += 1
+        serie[-2] += valor
+        serie[-1] += 1
+
+    def estado(self):
+        """Series del proceso en un formato que se puede guardar en JSON"""
+        return [[list(valores), list(serie)] for valores, serie in list(self._series.items())]
+
+    def lineas(self, otros=None):
+        """Líneas de exposición, sumando los estados de otros procesos si se indican"""
+        n = len(self.limites)
+        series = _sumar(self._series, [estado for _, _, estado in otros or ()])
+        for valores, serie in series.items():
+            acumulado = 0
+            for limite, cantidad in zip(self.limites + (math.inf,), serie[:n + 1]):
+                acumulado += cantidad
+                le = f'le="{_numero(limite)}"'
+                yield f"{self.nombre}_bucket{_etiquetas(self.etiquetas, valores, le)} {acumulado}"
+            yield f"{self.nombre}_sum{_etiquetas(self.etiquetas, valores)} {_numero(serie[-2])}"
+            yield f"{self.nombre}_count{_etiquetas(self.etiquetas, valores)} {serie[-1]}"
+
+
+class Lectura:
+    """
+    Métrica cuyos valores se leen al exponer de un objeto que ya los lleva
+    (p. ej. el estado del pool o los contadores de la caché)
+    """
+
+    def __init__(self, nombre, ayuda, etiquetas, leer, tipo='gauge'):
+        """
+        Args:
+            leer (callable): Devuelve pares (tupla de valores de etiquetas, valor)
+            tipo (str): 'gauge' o 'counter'
+        """
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.leer = leer
+        self.tipo = tipo
+
+    def estado(self):
+        """Valores actuales en un formato que se puede guardar en JSON"""
+        return [[list(valores), valor] for valores, valor in self.leer()]
+
+    def lineas(self, otros=None):
+        """
+        Líneas de exposición
+
+        Los valores de cada proceso (estado del pool, de su caché) no se suman:
+        con otros procesos cada serie lleva además la etiqueta worker con su pid,
+        y solo se incluyen los procesos que siguen vivos.
+        """
+        if otros is None:
+            for valores, valor in self.leer():
+                yield f"{self.nombre}{_etiquetas(self.etiquetas, valores)} {_numero(valor)}"
+            return
+        etiquetas = self.etiquetas + ('worker',)
+        for valores, valor in self.leer():
+            yield f"{self.nombre}{_etiquetas(etiquetas, tuple(valores) + (os.getpid(),))} {_numero(valor)}"
+        for pid, vivo, estado in otros:
+            if vivo:
+                for valores, valor in estado:
+                    yield f"{self.nombre}{_etiquetas(etiquetas, tuple(valores) + (pid,))} {_numero(valor)}"
+
+
+_registradas = []
+
+
+def registrar(metrica):
+    """Añade una métrica a la exposición de /metrics y la devuelve"""
+    _registradas.append(metrica)
+    return metrica
+
+
+def exponer():
+    """
+    Texto de todas las métricas en el formato de exposición de Prometheus (0.0.4)
+
+    Con DIRECTORIO, los contadores e histogramas son la suma de todos los
+    workers (incluidos los ya reciclados, para que los totales no bajen) con el
+    retraso de un volcado como máximo.
+    """
+    volcados = _leer_volcados() if DIRECTORIO else None
+    lineas = []
+    for metrica in _registradas:
+        lineas.append(f"# HELP {metrica.nombre} {metrica.ayuda}")
+        lineas.append(f"# TYPE {metrica.nombre} {metrica.tipo}")
+        try:
+            otros = None
+            if volcados is not None:
+                otros = [(pid, vivo, estados[metrica.nombre])
+                         for pid, vivo, estados in volcados if metrica.nombre in estados]
+            lineas.extend(metrica.lineas(otros))
+        except Exception as e:
+            print(f"Error al leer la métrica {metrica.nombre}: {e}")
+    return '\n'.join(lineas) + '\n'
+
+
+# Archivo de volcado del proceso actual: (pid, ruta); se renueva tras un fork
+_archivo = None
+
+
+def _ruta_volcado():
+    """Archivo propio del proceso; el instante de creación evita pisar el de un pid reutilizado"""
+    global _archivo
+    pid = os.getpid()
+    if _archivo is None or _archivo[0] != pid:
+        _archivo = (pid, os.path.join(DIRECTORIO, f"{pid}-{time.time_ns()}.json"))
+    return _archivo[1]
+
+
+def _vivo(pid):
+    """Indica si el proceso sigue en ejecución"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def volcar():
+    """Guarda en DIRECTORIO las métricas de este proceso para que las sumen los demás"""
+    if not DIRECTORIO:
+        return
+    ruta = _ruta_volcado()
+    datos = {
+        'pid': os.getpid(),
+        'metricas': {metrica.nombre: metrica.estado() for metrica in _registradas},
+    }
+    temporal = ruta + '.tmp'
+    try:
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump(datos, archivo)
+        # Reemplazo atómico: quien lee nunca ve un archivo a medio escribir
+        os.replace(temporal, ruta)
+    except Exception as e:
+        print(f"Error al volcar las métricas: {e}")
+
+
+def _leer_volcados():
+    """
+    Métricas volcadas por los demás procesos
+
+    Returns:
+        list: (pid, sigue vivo, {nombre de métrica: estado}) por archivo
+    """
+    propio = os.path.basename(_ruta_volcado())
+    try:
+        # El nombre empieza por el pid y sigue con el instante de creación, así
+        # que los archivos de un mismo pid quedan del más antiguo al más reciente
+        nombres = sorted(nombre for nombre in os.listdir(DIRECTORIO)
+                         if nombre.endswith('.json') and nombre != propio)
+    except OSError as e:
+        print(f"Error al leer las métricas de los workers: {e}")
+        return []
+    volcados = []
+    # Con un pid reutilizado solo el archivo más reciente puede ser de un proceso vivo
+    recientes = {}
+    for nombre in nombres:
+        try:
+            with open(os.path.join(DIRECTORIO, nombre), encoding='utf-8') as archivo:
+                datos = json.load(archivo)
+        except (OSError, ValueError) as e:
+            print(f"Error al leer las métricas de {nombre}: {e}")
+            continue
+        recientes[datos['pid']] = len(volcados)
+        volcados.append([datos['pid'], False, datos['metricas']])
+    for pid, indice in recientes.items():
+        volcados[indice][1] = pid != os.getpid() and _vivo(pid)
+    return [tuple(volcado) for volcado in volcados]
+
+
+def iniciar_volcado():
+    """Vuelca las métricas del proceso cada INTERVALO segundos en un hilo (una vez por worker)"""
+    if not DIRECTORIO:
+        return
+
+    def volcar_periodicamente():
+        while True:
+            time.sleep(INTERVALO)
+            volcar()
+
+    volcar()
+    threading.Thread(target=volcar_periodicamente, name='volcado-metricas', daemon=True).start()
+
+
+# Métricas de la aplicación; los indicadores del pool y de la caché se registran
+# donde se conocen esos objetos (web_app)
+peticiones = registrar(Histograma(
+    'clinica_http_peticion_segundos',
+    "Duración de las peticiones hasta generar la respuesta, por ruta y método",
+    ('ruta', 'metodo'), LIMITES_PETICION
+))
+respuestas = registrar(Contador(
+    'clinica_http_respuestas_total', "Respuestas enviadas por ruta y código de estado", ('ruta', 'codigo')
+))
+errores = registrar(Contador(
+    'clinica_http_errores_total', "Excepciones no controladas por ruta y tipo", ('ruta', 'tipo')
+))
+consultas = registrar(Histograma(
+    'clinica_bd_consulta_segundos', "Duración de las consultas SQL, incluida la lectura de filas",
+    (), LIMITES_CONSULTA
+))
+errores_bd = registrar(Contador(
+    'clinica_bd_errores_total', "Sentencias SQL que terminaron con error, por tipo", ('tipo',)
+))
@@ -0,0 +1,227 @@
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeoutError(Exception):
+    """Se lanza cuando no hay conexiones libres dentro del tiempo de espera"""
+
+
+class ConnectionPool:
+    """Pool acotado de conexiones reutilizables y seguro entre hilos"""
+
+    def __init__(self, factory, max_size=10, min_size=0, timeout=30,
+                 max_idle=300, ping_after=30, health_check=None):
+        """
+        Inicializa el pool
+
+        Args:
+            factory (callable): Función que abre una conexión nueva
+            max_size (int): Número máximo de conexiones abiertas a la vez
+            min_size (int): Conexiones que se mantienen aunque estén inactivas
+            timeout (float): Segundos de espera por una conexión libre
+            max_idle (float): Segundos de inactividad tras los que se cierra una conexión
+            ping_after (float): Segundos de inactividad tras los que se verifica la
+                conexión al entregarla (0 verifica siempre)
+            health_check (callable, opcional): Función que recibe la conexión y
+                lanza una excepción si no está operativa
+        """
+        if max_size < 1:
+            raise ValueError("El tamaño máximo del pool debe ser al menos 1")
+        self.factory = factory
+        self.max_size = max_size
+        self.min_size = min(min_size, max_size)
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.ping_after = ping_after
+        self.health_check = health_check or self._ping
+        # Conexiones libres como pares (conexión, último uso); LIFO para
+        # reutilizar las más recientes y dejar expirar las demás
+        self._idle = deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+        # Contadores de contención: veces que hubo que esperar, segundos esperados
+        # y esperas que terminaron sin conexión
+        self.esperas = 0
+        self.tiempo_espera = 0.0
+        self.agotadas = 0
+
+    @staticmethod
+    def _ping(connection):
+        """Verificación por defecto: ejecuta una consulta trivial"""
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _discard(connection):
+        """Cierra una conexión ignorando errores"""
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _collect_expired(self, now):
+        """Retira del pool las conexiones inactivas por más de max_idle (requiere el lock)"""
+        expired = []
+        if not self.max_idle:
+            return expired
+        # Las más antiguas están al inicio de la cola
+        while self._idle and self._size > self.min_size:
+            connection, last_used = self._idle[0]
+            if now - last_used < self.max_idle:
+                break
+            self._idle.popleft()
+            self._size -= 1
+            expired.append(connection)
+        return expired
+
+    def prefill(self):
+        """Abre las conexiones mínimas configuradas"""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                connection = self.factory()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append((connection, time.monotonic()))
+                self._cond.notify()
+
+    def acquire(self):
+        """
+        Entrega una conexión operativa del pool
+
+        Returns:
+            Connection: Conexión reservada para el llamador
+
+        Raises:
+            PoolTimeoutError: Si no se libera ninguna conexión a tiempo
+        """
+        deadline = time.monotonic() + self.timeout
+        waiting_since = None
+        while True:
+            connection = None
+            create = False
+            expired = []
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise Exception("El pool de conexiones está cerrado")
+                    now = time.monotonic()
+                    expired.extend(self._collect_expired(now))
+                    if self._idle:
+                        connection, last_used = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        create = True
+                        break
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self.agotadas += 1
+                        if waiting_since is not None:
+                            self.tiempo_espera += now - waiting_since
+                        raise PoolTimeoutError(
+                            f"No hay conexiones disponibles tras {self.timeout} segundos "
+                            f"(máximo {self.max_size})"
+                        )
+                    if waiting_since is None:
+                        waiting_since = now
+                        self.esperas += 1
+                    self._cond.wait(remaining)
+                if waiting_since is not None:
+                    self.tiempo_espera += now - waiting_since
+                    waiting_since = None
+
+            for old in expired:
+                self._discard(old)
+
+            if create:
+                # Hay espacio reservado para una conexión nueva
+                try:
+                    return self.factory()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+
+            if self.ping_after is not None and now - last_used >= self.ping_after:
+                try:
+                    self.health_check(connection)
+                except Exception as e:
+                    print(f"Conexión descartada por fallo en la verificación: {e}")
+                    self._discard(connection)
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    continue
+            return connection
+
+    def release(self, connection, discard=False):
+        """
+        Devuelve una conexión al pool
+
+        Args:
+            connection: Conexión obtenida con acquire()
+            discard (bool): Cierra la conexión en lugar de reutilizarla
+        """
+        if not discard:
+            try:
+                # Ninguna transacción pendiente pasa al siguiente usuario
+                connection.rollback()
+            except Exception:
+                discard = True
+
+        with self._cond:
+            if discard or self._closed:
+                self._size -= 1
+                self._cond.notify()
+            else:
+                self._idle.append((connection, time.monotonic()))
+                self._cond.notify()
+                connection = None
+
+        if connection is not None:
+            self._discard(connection)
+
+    def close(self):
+        """Cierra todas las conexiones libres y rechaza nuevas solicitudes"""
+        with self._cond:
+            self._closed = True
+            idle = [connection for connection, _ in self._idle]
+            self._size -= len(idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for connection in idle:
+            self._discard(connection)
+
+    def estadisticas(self):
+        """
+        Obtiene el estado actual del pool
+
+        Returns:
+            dict: Conexiones abiertas, en uso, libres y máximo configurado, y
+                contadores de esperas por una conexión libre
+        """
+        with self._cond:
+            return {
+                'abiertas': self._size,
+                'en_uso': self._size - len(self._idle),
+                'libres': len(self._idle),
+                'maximo': self.max_size,
+                'esperas': self.esperas,
+                'tiempo_espera': self.tiempo_espera,
+                'agotadas': self.agotadas,
+            }
@@ -0,0 +1,124 @@
+-- Esquema de la base de datos para el backend SQLite
+CREATE TABLE IF NOT EXISTS Paciente (
+    Id INTEGER PRIMARY KEY,
+    Nombre TEXT NOT NULL,
+    Apellido TEXT NOT NULL,
+    Cedula TEXT NOT NULL UNIQUE,
+    FechaNacimiento DATE,
+    Email TEXT,
+    Version INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS Medico (
+    Id INTEGER PRIMARY KEY,
+    Nombre TEXT NOT NULL,
+    Especialidad TEXT NOT NULL,
+    Email TEXT,
+    Version INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS Cita (
+    Id INTEGER PRIMARY KEY,
+    IdPaciente INTEGER NOT NULL REFERENCES Paciente (Id),
+    IdMedico INTEGER NOT NULL REFERENCES Medico (Id),
+    FechaHora TIMESTAMP NOT NULL,
+    Motivo TEXT,
+    Version INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE INDEX IF NOT EXISTS IX_Cita_IdPaciente ON Cita (IdPaciente);
+-- Agenda de cada médico: detección de solapamientos y búsqueda de huecos libres
+-- (también cubre la clave foránea IdMedico). Es único: un médico no puede tener
+-- dos citas a la misma hora aunque lleguen a la vez o por la importación masiva
+CREATE UNIQUE INDEX IF NOT EXISTS UX_Cita_IdMedico_FechaHora ON Cita (IdMedico, FechaHora);
+DROP INDEX IF EXISTS IX_Cita_IdMedico;
+DROP INDEX IF EXISTS IX_Cita_IdMedico_FechaHora;
+
+-- Índices para la paginación por clave de los listados
+CREATE INDEX IF NOT EXISTS IX_Cita_FechaHora_Id ON Cita (FechaHora, Id);
+CREATE INDEX IF NOT EXISTS IX_Paciente_Apellido_Nombre_Id ON Paciente (Apellido, Nombre, Id);
+CREATE INDEX IF NOT EXISTS IX_Medico_Nombre_Id ON Medico (Nombre, Id);
+
+-- Catálogo de especialidades y búsqueda de médicos por especialidad
+CREATE INDEX IF NOT EXISTS IX_Medico_Especialidad ON Medico (Especialidad, Nombre);
+
+-- Búsqueda de texto completo de pacientes (sin distinguir mayúsculas ni acentos)
+CREATE VIRTUAL TABLE IF NOT EXISTS PacienteBusqueda USING fts5(
+    Nombre, Apellido, Cedula, Email,
+    content='Paciente', content_rowid='Id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS TR_Paciente_Busqueda_Insertar AFTER INSERT ON Paciente BEGIN
+    INSERT INTO PacienteBusqueda (rowid, Nombre, Apellido, Cedula, Email)
+    VALUES (new.Id, new.Nombre, new.Apellido, new.Cedula, new.Email);
+END;
+
+CREATE TRIGGER IF NOT EXISTS TR_Paciente_Busqueda_Eliminar AFTER DELETE ON Paciente BEGIN
+    INSERT INTO PacienteBusqueda (PacienteBusqueda, rowid, Nombre, Apellido, Cedula, Email)
+    VALUES ('delete', old.Id, old.Nombre, old.Apellido, old.Cedula, old.Email);
+END;
+
+-- Solo cuando cambian columnas indexadas (no con la versión de fila)
+DROP TRIGGER IF EXISTS TR_Paciente_Busqueda_Actualizar;
+CREATE TRIGGER TR_Paciente_Busqueda_Actualizar
+AFTER UPDATE OF Nombre, Apellido, Cedula, Email ON Paciente BEGIN
+    INSERT INTO PacienteBusqueda (PacienteBusqueda, rowid, Nombre, Apellido, Cedula, Email)
+    VALUES ('delete', old.Id, old.Nombre, old.Apellido, old.Cedula, old.Email);
+    INSERT INTO PacienteBusqueda (rowid, Nombre, Apellido, Cedula, Email)
+    VALUES (new.Id, new.Nombre, new.Apellido, new.Cedula, new.Email);
+END;
+
+-- Versión de fila (equivale a rowversion en SQL Server): un único contador para
+-- toda la base que aumenta con cada inserción y modificación, así que una fila
+-- nunca repite la versión de otra, ni siquiera si reutiliza el Id de una fila
+-- eliminada. Se usa para las ETag de la API
+CREATE TABLE IF NOT EXISTS VersionFila (
+    Id INTEGER PRIMARY KEY CHECK (Id = 1),
+    Valor INTEGER NOT NULL
+);
+
+-- En bases existentes el contador empieza por encima de las versiones ya asignadas
+INSERT OR IGNORE INTO VersionFila (Id, Valor)
+SELECT 1, COALESCE(MAX(Valor), 0) FROM (
+    SELECT MAX(Version) AS Valor FROM Paciente
+    UNION ALL SELECT MAX(Version) FROM Medico
+    UNION ALL SELECT MAX(Version) FROM Cita
+);
+
+CREATE TRIGGER IF NOT EXISTS TR_Paciente_Version_Insertar AFTER INSERT ON Paciente BEGIN
+    UPDATE VersionFila SET Valor = Valor + 1;
+    UPDATE Paciente SET Version = (SELECT Valor FROM VersionFila) WHERE Id = new.Id;
+END;
+
+DROP TRIGGER IF EXISTS TR_Paciente_Version;
+CREATE TRIGGER TR_Paciente_Version AFTER UPDATE ON Paciente
+WHEN new.Version = old.Version BEGIN
+    UPDATE VersionFila SET Valor = Valor + 1;
+    UPDATE Paciente SET Version = (SELECT Valor FROM VersionFila) WHERE Id = new.Id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TR_Medico_Version_Insertar AFTER INSERT ON Medico BEGIN
+    UPDATE VersionFila SET Valor = Valor + 1;
+    UPDATE Medico SET Version = (SELECT Valor FROM VersionFila) WHERE Id = new.Id;
+END;
+
+DROP TRIGGER IF EXISTS TR_Medico_Version;
+CREATE TRIGGER TR_Medico_Version AFTER UPDATE ON Medico
+WHEN new.Version = old.Version BEGIN
+    UPDATE VersionFila SET Valor = Valor + 1;
+    UPDATE Medico SET Version = (SELECT Valor FROM VersionFila) WHERE Id = new.Id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS TR_Cita_Version_Insertar AFTER INSERT ON Cita BEGIN
+    UPDATE VersionFila SET Valor = Valor + 1;
+    UPDATE Cita SET Version = (SELECT Valor FROM VersionFila) WHERE Id = new.Id;
+END;
+
+DROP TRIGGER IF EXISTS TR_Cita_Version;
+CREATE TRIGGER TR_Cita_Version AFTER UPDATE ON Cita
+WHEN new.Version = old.Version BEGIN
+    UPDATE VersionFila SET Valor = Valor + 1;
+    UPDATE Cita SET Version = (SELECT Valor FROM VersionFila) WHERE Id = new.Id;
+END;
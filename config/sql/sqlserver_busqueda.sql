@@ -0,0 +1,25 @@
+-- Índice de texto completo para la búsqueda de pacientes en SQL Server
+-- Requiere el componente Full-Text Search. Sin él, la aplicación usa el índice en memoria.
+-- Ejecutar una vez sobre ClinicaDB; el script se puede repetir sin errores
+
+IF NOT EXISTS (SELECT 1 FROM sys.fulltext_catalogs WHERE name = 'CatalogoClinica')
+    CREATE FULLTEXT CATALOG CatalogoClinica WITH ACCENT_SENSITIVITY = OFF;
+GO
+
+-- La cédula se busca por prefijo con este índice (rango sobre Cedula)
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Paciente_Cedula')
+    CREATE INDEX IX_Paciente_Cedula ON Paciente (Cedula);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('Paciente'))
+BEGIN
+    -- El índice de texto necesita el nombre de la clave primaria de Paciente
+    DECLARE @clave sysname = (
+        SELECT name FROM sys.indexes
+        WHERE object_id = OBJECT_ID('Paciente') AND is_primary_key = 1
+    );
+    EXEC('CREATE FULLTEXT INDEX ON Paciente (Nombre, Apellido, Cedula, Email) '
+         + 'KEY INDEX ' + QUOTENAME(@clave) + ' ON CatalogoClinica '
+         + 'WITH CHANGE_TRACKING AUTO');
+END
+GO
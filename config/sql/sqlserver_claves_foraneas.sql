@@ -0,0 +1,13 @@
+-- Claves foráneas de Cita para la base de datos SQL Server
+-- La creación de citas depende de ellas para validar paciente y médico en el mismo INSERT.
+-- Ejecutar una vez sobre ClinicaDB; el script se puede repetir sin errores
+
+IF NOT EXISTS (SELECT 1 FROM sys.foreign_keys WHERE name = 'FK_Cita_Paciente')
+    ALTER TABLE Cita WITH CHECK
+    ADD CONSTRAINT FK_Cita_Paciente FOREIGN KEY (IdPaciente) REFERENCES Paciente (Id);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.foreign_keys WHERE name = 'FK_Cita_Medico')
+    ALTER TABLE Cita WITH CHECK
+    ADD CONSTRAINT FK_Cita_Medico FOREIGN KEY (IdMedico) REFERENCES Medico (Id);
+GO
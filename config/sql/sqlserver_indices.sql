@@ -0,0 +1,35 @@
+-- Índices recomendados para la base de datos SQL Server
+-- Ejecutar una vez sobre ClinicaDB; el script se puede repetir sin errores
+
+-- Paginación por clave de los listados
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Cita_FechaHora_Id')
+    CREATE INDEX IX_Cita_FechaHora_Id ON Cita (FechaHora, Id)
+    INCLUDE (IdPaciente, IdMedico, Motivo);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Paciente_Apellido_Nombre_Id')
+    CREATE INDEX IX_Paciente_Apellido_Nombre_Id ON Paciente (Apellido, Nombre, Id)
+    INCLUDE (Cedula, FechaNacimiento, Email);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Medico_Nombre_Id')
+    CREATE INDEX IX_Medico_Nombre_Id ON Medico (Nombre, Id)
+    INCLUDE (Especialidad, Email);
+GO
+
+-- Agenda de cada médico: detección de solapamientos y búsqueda de huecos libres.
+-- Es único: un médico no puede tener dos citas a la misma hora
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'UX_Cita_IdMedico_FechaHora')
+    CREATE UNIQUE INDEX UX_Cita_IdMedico_FechaHora ON Cita (IdMedico, FechaHora)
+    INCLUDE (Id);
+GO
+
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Cita_IdMedico_FechaHora')
+    DROP INDEX IX_Cita_IdMedico_FechaHora ON Cita;
+GO
+
+-- Catálogo de especialidades y búsqueda de médicos por especialidad
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Medico_Especialidad')
+    CREATE INDEX IX_Medico_Especialidad ON Medico (Especialidad, Nombre)
+    INCLUDE (Email);
+GO
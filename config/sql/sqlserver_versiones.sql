@@ -0,0 +1,15 @@
+-- Versiones de fila para las ETag de la API JSON (/api/v1)
+-- SQL Server actualiza una columna rowversion en cada modificación de la fila
+-- Ejecutar una vez sobre ClinicaDB; el script se puede repetir sin errores
+
+IF COL_LENGTH('Paciente', 'Version') IS NULL
+    ALTER TABLE Paciente ADD Version rowversion;
+GO
+
+IF COL_LENGTH('Medico', 'Version') IS NULL
+    ALTER TABLE Medico ADD Version rowversion;
+GO
+
+IF COL_LENGTH('Cita', 'Version') IS NULL
+    ALTER TABLE Cita ADD Version rowversion;
+GO
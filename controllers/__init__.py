@@ -1,4 +1,7 @@
 # controllers/__init__.py
 from controllers.paciente_controller import PacienteController
 from controllers.medico_controller import MedicoController
-from controllers.cita_controller import CitaController
\ No newline at end of file
+from controllers.cita_controller import CitaController
+from controllers.importacion_controller import ImportacionController
+from controllers.exportacion_controller import ExportacionController
+from controllers.disponibilidad_controller import DisponibilidadController
@@ -1,7 +1,9 @@
+import contextlib
 from datetime import datetime
-from models.cita import Cita
+from models.cita import Cita, ReferenciaInvalida, HorarioOcupado
 from models.paciente import Paciente
 from models.medico import Medico
+from controllers.paginacion import Pagina, tamano_pagina, decodificar_cursor
 
 class CitaController:
     """Controlador para gestionar operaciones con citas médicas"""
@@ -18,25 +20,18 @@ class CitaController:
             motivo (str, opcional): Motivo de la consulta
             
         Returns:
-            tuple: (éxito, mensaje o cita)
+            tuple: (éxito, mensaje o cita); la cita creada lleva su paciente y su médico
         """
         try:
-            # Verificar que existen el paciente y el médico
-            paciente = Paciente.obtener_por_id(id_paciente)
-            if not paciente:
-                return False, f"No existe un paciente con ID {id_paciente}"
-            
-            medico = Medico.obtener_por_id(id_medico)
-            if not medico:
-                return False, f"No existe un médico con ID {id_medico}"
-            
             # Convertir la fecha y hora de texto a objeto datetime
             try:
                 fecha_obj = datetime.strptime(fecha_hora, "%d-%m-%Y %H:%M")
             except ValueError:
                 return False, "Formato de fecha y hora incorrecto. Use DD-MM-YYYY HH:MM"
             
-            # Crear la nueva cita
+            # Crear la nueva cita (la existencia del paciente y del médico la
+            # validan las claves foráneas en el mismo INSERT, y el horario libre
+            # se comprueba en la misma transacción)
             nueva_cita = Cita(
                 id_paciente=id_paciente,
                 id_medico=id_medico,
@@ -47,12 +42,19 @@ class CitaController:
             # Guardar en la base de datos
             cita_creada = Cita.crear(nueva_cita)
             
-            # Completar los datos relacionados para devolver
-            cita_creada.paciente = paciente
-            cita_creada.medico = medico
+            # Paciente y médico completos, como en las citas leídas; salen de la
+            # caché de entidades, así que normalmente no consultan la base
+            try:
+                cita_creada.paciente = Paciente.obtener_por_id(id_paciente)
+                cita_creada.medico = Medico.obtener_por_id(id_medico)
+            except Exception as e:
+                # La cita ya está guardada; solo falta el detalle para mostrarla
+                print(f"Error al cargar paciente y médico de la cita: {e}")
             
             return True, cita_creada
             
+        except (ReferenciaInvalida, HorarioOcupado) as e:
+            return False, str(e)
         except Exception as e:
             return False, f"Error al crear cita: {str(e)}"
     
@@ -70,6 +72,33 @@ class CitaController:
             print(f"Error al listar citas: {e}")
             return []
     
+    @staticmethod
+    def listar_citas_paginadas(cursor=None, limite=None, con_version=False):
+        """
+        Obtiene una página de citas ordenadas por fecha
+        
+        Args:
+            cursor (str, opcional): Token devuelto en la página anterior
+            limite (int, opcional): Número de citas por página
+            con_version (bool): Lee también la versión de fila de cada cita, su paciente y su médico
+            
+        Returns:
+            Pagina: Citas de la página y token de la siguiente
+        """
+        limite = tamano_pagina(limite)
+        try:
+            despues = decodificar_cursor(cursor)
+            if despues:
+                despues = (datetime.fromisoformat(despues[0]), int(despues[1]))
+        except (ValueError, TypeError, IndexError):
+            despues = None
+        try:
+            citas = Cita.obtener_pagina(limite + 1, despues, con_version)
+            return Pagina.desde_resultados(citas, limite, lambda c: (c.fecha_hora, c.id))
+        except Exception as e:
+            print(f"Error al listar citas: {e}")
+            return Pagina([], limite=limite)
+    
     @staticmethod
     def buscar_cita_por_id(id):
         """
@@ -87,6 +116,46 @@ class CitaController:
             print(f"Error al buscar cita: {e}")
             return None
     
+    @staticmethod
+    def obtener_version_cita(id):
+        """
+        Obtiene las versiones de fila de una cita, su paciente y su médico sin leer sus datos
+        
+        Args:
+            id (int): ID de la cita
+            
+        Returns:
+            tuple or None: Versiones actuales, o None si la cita no existe
+        """
+        try:
+            return Cita.obtener_version(id)
+        except Exception as e:
+            print(f"Error al obtener versión de la cita: {e}")
+            return None
+    
+    @staticmethod
+    async def buscar_cita_por_id_async(id):
+        """
+        Busca una cita por su ID con el acceso asíncrono a datos (modo ASGI)
+        
+        Returns:
+            Cita or None: La cita encontrada o None
+        """
+        try:
+            return await Cita.obtener_por_id_async(id)
+        except Exception as e:
+            print(f"Error al buscar cita: {e}")
+            return None
+    
+    @staticmethod
+    async def obtener_version_cita_async(id):
+        """Versión de obtener_version_cita para el modo ASGI"""
+        try:
+            return await Cita.obtener_version_async(id)
+        except Exception as e:
+            print(f"Error al obtener versión de la cita: {e}")
+            return None
+    
     @staticmethod
     def buscar_citas_por_paciente(id_paciente):
         """
@@ -146,30 +215,88 @@ class CitaController:
             list: Lista de citas en el rango de fechas
         """
         try:
-            # Convertir las fechas de texto a objetos datetime
-            try:
-                fecha_inicio_obj = datetime.strptime(fecha_inicio, "%d-%m-%Y")
-                
-                # Si no se proporciona fecha_fin, usar la misma fecha de inicio
-                if fecha_fin:
-                    fecha_fin_obj = datetime.strptime(fecha_fin, "%d-%m-%Y")
-                    # Ajustar al final del día
-                    fecha_fin_obj = fecha_fin_obj.replace(hour=23, minute=59, second=59)
-                else:
-                    fecha_fin_obj = fecha_inicio_obj.replace(hour=23, minute=59, second=59)
-                
-                # Ajustar al inicio del día para fecha_inicio
-                fecha_inicio_obj = fecha_inicio_obj.replace(hour=0, minute=0, second=0)
-                
-            except ValueError:
-                print("Formato de fecha incorrecto. Use DD-MM-YYYY")
+            rango = CitaController._rango_fechas(fecha_inicio, fecha_fin)
+            if rango is None:
                 return []
             
-            return Cita.obtener_por_fecha(fecha_inicio_obj, fecha_fin_obj)
+            return Cita.obtener_por_fecha(*rango)
         except Exception as e:
             print(f"Error al buscar citas por fecha: {e}")
             return []
     
+    @staticmethod
+    def iterar_citas_por_fecha(fecha_inicio, fecha_fin=None):
+        """
+        Genera las citas de un rango de fechas a medida que se leen de la base de datos
+        
+        Args:
+            fecha_inicio (str): Fecha de inicio en formato DD-MM-YYYY
+            fecha_fin (str, opcional): Fecha de fin en formato DD-MM-YYYY
+            
+        Yields:
+            Cita: Citas del rango ordenadas por fecha
+            
+        Raises:
+            Exception: Si falla la lectura; quien envía la respuesta por partes
+                decide cómo terminarla
+        """
+        rango = CitaController._rango_fechas(fecha_inicio, fecha_fin)
+        if rango is None:
+            return
+        yield from Cita.iterar_por_fecha(*rango)
+    
+    @staticmethod
+    async def iterar_citas_por_fecha_async(fecha_inicio, fecha_fin=None):
+        """
+        Genera por lotes las citas de un rango de fechas con el acceso asíncrono a datos
+        
+        Args:
+            fecha_inicio (str): Fecha de inicio en formato DD-MM-YYYY
+            fecha_fin (str, opcional): Fecha de fin en formato DD-MM-YYYY
+            
+        Yields:
+            list: Citas de cada lote ordenadas por fecha
+            
+        Raises:
+            Exception: Si falla la lectura; quien envía la respuesta por partes
+                decide cómo terminarla
+        """
+        rango = CitaController._rango_fechas(fecha_inicio, fecha_fin)
+        if rango is None:
+            return
+        async with contextlib.aclosing(Cita.iterar_por_fecha_async(*rango)) as lotes:
+            async for lote in lotes:
+                yield lote
+    
+    @staticmethod
+    def _rango_fechas(fecha_inicio, fecha_fin=None):
+        """
+        Convierte un rango de fechas DD-MM-YYYY en datetimes de inicio y fin del día
+        
+        Returns:
+            tuple or None: (inicio, fin) o None si el formato es incorrecto
+        """
+        # Convertir las fechas de texto a objetos datetime
+        try:
+            fecha_inicio_obj = datetime.strptime(fecha_inicio, "%d-%m-%Y")
+            
+            # Si no se proporciona fecha_fin, usar la misma fecha de inicio
+            if fecha_fin:
+                fecha_fin_obj = datetime.strptime(fecha_fin, "%d-%m-%Y")
+                # Ajustar al final del día
+                fecha_fin_obj = fecha_fin_obj.replace(hour=23, minute=59, second=59)
+            else:
+                fecha_fin_obj = fecha_inicio_obj.replace(hour=23, minute=59, second=59)
+            
+            # Ajustar al inicio del día para fecha_inicio
+            fecha_inicio_obj = fecha_inicio_obj.replace(hour=0, minute=0, second=0)
+            
+        except ValueError:
+            print("Formato de fecha incorrecto. Use DD-MM-YYYY")
+            return None
+        
+        return fecha_inicio_obj, fecha_fin_obj
+    
     @staticmethod
     def actualizar_cita(id, id_paciente, id_medico, fecha_hora, motivo=None):
         """
@@ -186,39 +313,30 @@ class CitaController:
             tuple: (éxito, mensaje)
         """
         try:
-            # Verificar que la cita existe
-            cita = Cita.obtener_por_id(id)
-            if not cita:
-                return False, f"No se encontró la cita con ID {id}"
-            
-            # Verificar que existen el paciente y el médico
-            paciente = Paciente.obtener_por_id(id_paciente)
-            if not paciente:
-                return False, f"No existe un paciente con ID {id_paciente}"
-            
-            medico = Medico.obtener_por_id(id_medico)
-            if not medico:
-                return False, f"No existe un médico con ID {id_medico}"
-            
             # Convertir la fecha y hora de texto a objeto datetime
             try:
                 fecha_obj = datetime.strptime(fecha_hora, "%d-%m-%Y %H:%M")
             except ValueError:
                 return False, "Formato de fecha y hora incorrecto. Use DD-MM-YYYY HH:MM"
             
-            # Actualizar datos
-            cita.id_paciente = id_paciente
-            cita.id_medico = id_medico
-            cita.fecha_hora = fecha_obj
-            cita.motivo = motivo
+            # Actualizar datos; un UPDATE sin filas afectadas indica que la cita no existe.
+            # El horario libre (sin contar esta cita) se comprueba en la misma transacción
+            cita = Cita(
+                id=id,
+                id_paciente=id_paciente,
+                id_medico=id_medico,
+                fecha_hora=fecha_obj,
+                motivo=motivo
+            )
             
             # Guardar cambios
-            resultado = Cita.actualizar(cita)
-            if resultado:
+            if Cita.actualizar(cita):
                 return True, "Cita actualizada correctamente"
             else:
-                return False, "No se pudo actualizar la cita"
+                return False, f"No se encontró la cita con ID {id}"
                 
+        except (ReferenciaInvalida, HorarioOcupado) as e:
+            return False, str(e)
         except Exception as e:
             return False, f"Error al actualizar cita: {str(e)}"
     
@@ -0,0 +1,181 @@
+import heapq
+import os
+from datetime import datetime, timedelta
+from models.cita import Cita, HorarioOcupado, DURACION_CITA_MINUTOS
+from models.medico import Medico
+from models import agenda
+
+# Horario de atención de la clínica
+HORARIO_APERTURA = datetime.strptime(os.getenv('HORARIO_APERTURA', '08:00'), '%H:%M').time()
+HORARIO_CIERRE = datetime.strptime(os.getenv('HORARIO_CIERRE', '18:00'), '%H:%M').time()
+# Días de atención (0 = lunes ... 6 = domingo)
+DIAS_ATENCION = frozenset(int(dia) for dia in os.getenv('HORARIO_DIAS', '0,1,2,3,4').split(','))
+# Espacios que se devuelven por defecto en cada búsqueda
+ESPACIOS_POR_BUSQUEDA = 20
+# Días de la primera ventana de consulta; cada ventana siguiente dobla la anterior
+VENTANA_DIAS = 1
+
+
+class EspacioLibre:
+    """Hueco libre en la agenda de un médico"""
+
+    __slots__ = ('inicio', 'fin', 'medico')
+
+    def __init__(self, inicio, fin, medico):
+        self.inicio = inicio
+        self.fin = fin
+        self.medico = medico
+
+    def __str__(self):
+        return f"{self.inicio.strftime('%d-%m-%Y %H:%M')} - {self.fin.strftime('%H:%M')} con Dr(a). {self.medico.nombre}"
+
+
+def espacios_medico(ocupadas, desde, hasta, duracion, duracion_cita=None,
+                    apertura=HORARIO_APERTURA, cierre=HORARIO_CIERRE, dias=DIAS_ATENCION):
+    """
+    Genera en orden los huecos libres de un médico con un único recorrido de su agenda
+
+    Args:
+        ocupadas (list): (fecha_hora, id_cita) ordenadas por fecha; debe incluir las
+            citas que empiezan antes de 'desde' y terminan después
+        desde (datetime): Primer instante en que puede empezar un hueco
+        hasta (datetime): Instante en que debe haber terminado el último hueco
+        duracion (timedelta): Duración de cada hueco
+        duracion_cita (timedelta, opcional): Duración de las citas existentes
+
+    Yields:
+        datetime: Hora de inicio de cada hueco
+    """
+    duracion_cita = duracion_cita or timedelta(minutes=DURACION_CITA_MINUTOS)
+    ocupadas = iter(ocupadas)
+    siguiente = next(ocupadas, None)
+    dia = desde.date()
+    while dia <= hasta.date():
+        if dia.weekday() in dias:
+            actual = max(datetime.combine(dia, apertura), desde)
+            fin_dia = min(datetime.combine(dia, cierre), hasta)
+            while actual + duracion <= fin_dia:
+                # Las citas que terminan antes del hueco ya no influyen
+                while siguiente is not None and siguiente[0] + duracion_cita <= actual:
+                    siguiente = next(ocupadas, None)
+                if siguiente is not None and siguiente[0] < actual + duracion:
+                    # Se solapa: el hueco siguiente empieza cuando termina esa cita
+                    actual = siguiente[0] + duracion_cita
+                    continue
+                yield actual
+                actual += duracion
+        dia += timedelta(days=1)
+
+
+def _redondear(fecha, minutos=15):
+    """Redondea hacia arriba al siguiente múltiplo de 'minutos' dentro de la hora"""
+    base = fecha.replace(minute=0, second=0, microsecond=0)
+    paso = timedelta(minutes=minutos)
+    return base + -(-(fecha - base) // paso) * paso
+
+
+class DisponibilidadController:
+    """Controlador para consultar la disponibilidad de los médicos"""
+
+    @staticmethod
+    def verificar_disponibilidad(id_medico, fecha_hora, excluir_id=None):
+        """
+        Verifica que el médico no tenga otra cita que se solape con la hora indicada
+
+        Args:
+            id_medico (int): ID del médico
+            fecha_hora (str or datetime): Hora de inicio, en formato DD-MM-YYYY HH:MM si es texto
+            excluir_id (int, opcional): Cita que se está modificando, para no compararla consigo misma
+
+        Returns:
+            tuple: (disponible, mensaje)
+        """
+        if isinstance(fecha_hora, str):
+            try:
+                fecha_hora = datetime.strptime(fecha_hora, "%d-%m-%Y %H:%M")
+            except ValueError:
+                return False, "Formato de fecha y hora incorrecto. Use DD-MM-YYYY HH:MM"
+
+        try:
+            if agenda.HABILITADA:
+                conflicto = agenda.agenda.buscar_conflicto(id_medico, fecha_hora, excluir_id)
+            else:
+                conflicto = Cita.buscar_conflicto(id_medico, fecha_hora, excluir_id)
+        except Exception as e:
+            return False, f"Error al verificar disponibilidad: {str(e)}"
+
+        if conflicto:
+            # Mismo mensaje que el rechazo del alta
+            return False, str(HorarioOcupado(conflicto))
+        return True, "Horario disponible"
+
+    @staticmethod
+    def buscar_espacios_libres(especialidad, fecha_inicio, fecha_fin=None, duracion_minutos=None,
+                               limite=ESPACIOS_POR_BUSQUEDA, ahora=None):
+        """
+        Busca los primeros huecos libres entre todos los médicos de una especialidad
+
+        Las citas de todos los médicos se leen con una consulta por ventana de días
+        (no una por médico y día); cada agenda se recorre una sola vez y los huecos
+        de todos los médicos se mezclan en orden de hora.
+
+        Args:
+            especialidad (str): Especialidad médica
+            fecha_inicio (str): Fecha de inicio en formato DD-MM-YYYY
+            fecha_fin (str, opcional): Fecha de fin en formato DD-MM-YYYY; por defecto la de inicio
+            duracion_minutos (int, opcional): Duración del hueco; por defecto la de una cita
+            limite (int, opcional): Huecos como máximo; None devuelve todos los del rango
+            ahora (datetime, opcional): Instante actual; no se ofrecen huecos anteriores
+
+        Returns:
+            tuple: (éxito, mensaje o lista de EspacioLibre ordenada por hora)
+        """
+        try:
+            inicio = datetime.strptime(fecha_inicio, "%d-%m-%Y")
+            fin = datetime.strptime(fecha_fin, "%d-%m-%Y") if fecha_fin else inicio
+        except ValueError:
+            return False, "Formato de fecha incorrecto. Use DD-MM-YYYY"
+        if fin < inicio:
+            return False, "La fecha de fin es anterior a la de inicio"
+        duracion = timedelta(minutes=duracion_minutos or DURACION_CITA_MINUTOS)
+        if duracion <= timedelta():
+            return False, "La duración debe ser mayor que cero"
+
+        try:
+            medicos = Medico.obtener_por_especialidad(especialidad)
+            if not medicos:
+                return False, f"No hay médicos con la especialidad {especialidad}"
+
+            desde = max(inicio, _redondear(ahora or datetime.now()))
+            hasta = fin + timedelta(days=1)
+            duracion_cita = timedelta(minutes=DURACION_CITA_MINUTOS)
+            espacios = []
+            ventana = timedelta(days=VENTANA_DIAS)
+            while desde < hasta and (limite is None or len(espacios) < limite):
+                # Las ventanas terminan a medianoche, así que ningún hueco queda partido
+                fin_ventana = min(datetime.combine(desde.date(), datetime.min.time()) + ventana, hasta)
+                horarios = Cita.obtener_horarios(
+                    [medico.id for medico in medicos], desde - duracion_cita, fin_ventana
+                )
+                por_medico = [
+                    DisponibilidadController._espacios_de(
+                        medico, horarios[medico.id], desde, fin_ventana, duracion, duracion_cita
+                    )
+                    for medico in medicos
+                ]
+                for espacio in heapq.merge(*por_medico, key=lambda espacio: (espacio.inicio, espacio.medico.id)):
+                    espacios.append(espacio)
+                    if limite is not None and len(espacios) >= limite:
+                        break
+                desde = fin_ventana
+                ventana *= 2
+            return True, espacios
+
+        except Exception as e:
+            return False, f"Error al buscar espacios libres: {str(e)}"
+
+    @staticmethod
+    def _espacios_de(medico, ocupadas, desde, hasta, duracion, duracion_cita):
+        """Genera los huecos libres de un médico como objetos EspacioLibre"""
+        for inicio in espacios_medico(ocupadas, desde, hasta, duracion, duracion_cita):
+            yield EspacioLibre(inicio, inicio + duracion, medico)
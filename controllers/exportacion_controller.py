@@ -0,0 +1,175 @@
+import csv
+import io
+import tempfile
+from controllers.cita_controller import CitaController
+from models.cita import Cita
+
+# Filas CSV que se acumulan antes de entregar cada bloque
+FILAS_POR_BLOQUE = 500
+# Bytes por bloque al enviar un archivo ya generado
+TAMANO_BLOQUE_ARCHIVO = 64 * 1024
+
+# Los nombres coinciden con los que acepta la importación masiva
+COLUMNAS = ['id', 'fecha_hora', 'id_paciente', 'paciente', 'id_medico', 'medico', 'especialidad', 'motivo']
+# Primera columna de la fila que cierra un CSV cortado por un error de lectura;
+# la importación la rechaza, así que el archivo no pasa por completo
+MARCA_ERROR = '#ERROR'
+ERROR_INCOMPLETA = "Error al leer las citas; la exportación está incompleta"
+
+
+def _fila(cita):
+    """Valores de una cita en el orden de COLUMNAS"""
+    return [
+        cita.id,
+        cita.fecha_hora.strftime('%d-%m-%Y %H:%M') if cita.fecha_hora else '',
+        cita.id_paciente,
+        f"{cita.paciente.nombre} {cita.paciente.apellido}" if cita.paciente else '',
+        cita.id_medico,
+        cita.medico.nombre if cita.medico else '',
+        cita.medico.especialidad if cita.medico else '',
+        cita.motivo or '',
+    ]
+
+
+class ExportacionController:
+    """Controlador para exportar citas a CSV o Excel sin cargarlas completas en memoria"""
+
+    FORMATOS = ('csv', 'xlsx')
+
+    @staticmethod
+    def preparar_citas(fecha_inicio=None, fecha_fin=None, id_medico=None, id_paciente=None):
+        """
+        Valida los filtros y prepara el iterador de citas a exportar
+
+        Args:
+            fecha_inicio (str, opcional): Fecha de inicio en formato DD-MM-YYYY
+            fecha_fin (str, opcional): Fecha de fin en formato DD-MM-YYYY; por defecto
+                el mismo día de inicio
+            id_medico (int, opcional): Solo las citas de este médico
+            id_paciente (int, opcional): Solo las citas de este paciente
+
+        Returns:
+            tuple: (éxito, mensaje o iterador de citas)
+        """
+        inicio = fin = None
+        if fecha_inicio:
+            rango = CitaController._rango_fechas(fecha_inicio, fecha_fin)
+            if rango is None:
+                return False, "Formato de fecha incorrecto. Use DD-MM-YYYY"
+            inicio, fin = rango
+        elif fecha_fin:
+            return False, "Indique la fecha de inicio del rango"
+        # La consulta se ejecuta al empezar a recorrer el iterador
+        return True, Cita.iterar_filtradas(inicio, fin, id_medico, id_paciente)
+
+    @staticmethod
+    def generar_csv(citas, filas_por_bloque=FILAS_POR_BLOQUE, error=None):
+        """
+        Genera el CSV por bloques de texto a medida que se leen las citas
+
+        Args:
+            citas (iterable): Citas a exportar
+            filas_por_bloque (int): Filas acumuladas antes de entregar cada bloque
+            error (callable, opcional): Se llama al terminar las citas; si devuelve
+                un mensaje, el CSV termina con la fila [MARCA_ERROR, mensaje]
+
+        Yields:
+            str: Bloque de líneas CSV; el primero incluye el BOM para que Excel
+                reconozca la codificación UTF-8
+        """
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        buffer.write('\ufeff')
+        escritor.writerow(COLUMNAS)
+        pendientes = 0
+        for cita in citas:
+            escritor.writerow(_fila(cita))
+            pendientes += 1
+            if pendientes >= filas_por_bloque:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                pendientes = 0
+        mensaje = error() if error else None
+        if mensaje:
+            escritor.writerow([MARCA_ERROR, mensaje])
+        yield buffer.getvalue()
+
+    @staticmethod
+    def escribir_csv(citas, archivo):
+        """
+        Escribe el CSV en un archivo de texto abierto (con newline='')
+
+        Returns:
+            int: Número de citas exportadas
+        """
+        escritor = csv.writer(archivo)
+        archivo.write('\ufeff')
+        escritor.writerow(COLUMNAS)
+        total = 0
+        for cita in citas:
+            escritor.writerow(_fila(cita))
+            total += 1
+        return total
+
+    @staticmethod
+    def escribir_xlsx(citas, archivo):
+        """
+        Escribe un libro de Excel en modo de solo escritura (memoria constante)
+
+        Args:
+            citas (iterable): Citas a exportar
+            archivo: Ruta o archivo binario abierto
+
+        Returns:
+            int: Número de citas exportadas
+
+        Raises:
+            Exception: Si el paquete opcional openpyxl no está instalado
+        """
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise Exception("La exportación a Excel requiere el paquete openpyxl")
+
+        libro = Workbook(write_only=True)
+        hoja = libro.create_sheet("Citas")
+        hoja.append(COLUMNAS)
+        total = 0
+        for cita in citas:
+            fila = _fila(cita)
+            # La fecha se guarda como fecha de Excel y no como texto
+            fila[1] = cita.fecha_hora
+            hoja.append(fila)
+            total += 1
+        libro.save(archivo)
+        return total
+
+    @staticmethod
+    def generar_xlsx(citas):
+        """
+        Genera el libro de Excel en un archivo temporal y devuelve su contenido por bloques
+
+        Un .xlsx es un ZIP que solo se puede cerrar al final, así que el libro se
+        escribe completo en disco antes de empezar a enviarlo.
+
+        Returns:
+            generator: Bloques de bytes del archivo; el temporal se borra al terminar
+        """
+        archivo = tempfile.TemporaryFile()
+        try:
+            ExportacionController.escribir_xlsx(citas, archivo)
+        except Exception:
+            archivo.close()
+            raise
+        archivo.seek(0)
+
+        def bloques():
+            with archivo:
+                while True:
+                    bloque = archivo.read(TAMANO_BLOQUE_ARCHIVO)
+                    if not bloque:
+                        break
+                    yield bloque
+
+        return bloques()
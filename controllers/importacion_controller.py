@@ -0,0 +1,256 @@
+import csv
+import json
+import os
+import time
+from datetime import datetime
+from models.paciente import Paciente
+from models.medico import Medico
+from models.cita import Cita
+
+# Filas que se insertan y confirman en cada lote
+TAMANO_LOTE = 1000
+# Errores que se conservan con detalle en el resumen (el resto solo se cuentan)
+MAX_ERRORES = 20
+
+
+class ResumenImportacion:
+    """Resultado y rendimiento de una importación masiva"""
+
+    def __init__(self, entidad):
+        self.entidad = entidad
+        self.leidos = 0
+        self.insertados = 0
+        self.rechazados = 0
+        self.lotes = 0
+        self.errores = []
+        self.segundos = 0.0
+
+    def rechazar(self, linea, motivo, cantidad=1):
+        """Registra filas descartadas con el número de línea y el motivo"""
+        self.rechazados += cantidad
+        if len(self.errores) < MAX_ERRORES:
+            self.errores.append((linea, motivo))
+
+    @property
+    def filas_por_segundo(self):
+        """Filas leídas por segundo durante toda la importación"""
+        return self.leidos / self.segundos if self.segundos else 0.0
+
+    def __str__(self):
+        lineas = [
+            f"Importación de {self.entidad}",
+            f"  Filas leídas:    {self.leidos}",
+            f"  Insertadas:      {self.insertados} en {self.lotes} lote(s)",
+            f"  Rechazadas:      {self.rechazados}",
+            f"  Tiempo:          {self.segundos:.2f} s ({self.filas_por_segundo:,.0f} filas/s)",
+        ]
+        for linea, motivo in self.errores:
+            lineas.append(f"  Línea {linea}: {motivo}")
+        if self.rechazados > len(self.errores):
+            lineas.append(f"  ... y {self.rechazados - len(self.errores)} rechazo(s) más")
+        return "\n".join(lineas)
+
+
+def _texto(registro, campo, obligatorio=True):
+    """Obtiene un campo como texto sin espacios; vacío equivale a ausente"""
+    valor = registro.get(campo)
+    valor = str(valor).strip() if valor is not None else ""
+    if not valor:
+        if obligatorio:
+            raise ValueError(f"Falta el campo '{campo}'")
+        return None
+    return valor
+
+
+def _entero(registro, campo):
+    """Obtiene un campo obligatorio como entero"""
+    valor = _texto(registro, campo)
+    try:
+        return int(valor)
+    except ValueError:
+        raise ValueError(f"El campo '{campo}' debe ser un número entero")
+
+
+def _fecha_hora(valor, formato, campo):
+    """Convierte DD-MM-YYYY (formato de la aplicación) o ISO 8601"""
+    try:
+        return datetime.strptime(valor, formato)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(valor)
+    except ValueError:
+        raise ValueError(f"Formato incorrecto en '{campo}': {valor}")
+
+
+class ImportacionController:
+    """Controlador para la carga masiva de pacientes, médicos y citas desde archivos"""
+
+    ENTIDADES = ('pacientes', 'medicos', 'citas')
+    FORMATOS = ('csv', 'jsonl')
+
+    @staticmethod
+    def importar(entidad, ruta, formato=None, tamano_lote=TAMANO_LOTE):
+        """
+        Importa un archivo CSV o JSONL validando e insertando por lotes
+
+        Las columnas (o claves JSON) son las de los formularios: nombre, apellido,
+        cedula, fecha_nacimiento, email para pacientes; nombre, especialidad, email
+        para médicos; id_paciente, id_medico, fecha_hora, motivo para citas.
+
+        Args:
+            entidad (str): 'pacientes', 'medicos' o 'citas'
+            ruta (str): Archivo a importar
+            formato (str, opcional): 'csv' o 'jsonl'; por defecto según la extensión
+            tamano_lote (int): Filas por executemany y por confirmación
+
+        Returns:
+            tuple: (éxito, mensaje o ResumenImportacion)
+        """
+        if entidad not in ImportacionController.ENTIDADES:
+            return False, f"Entidad desconocida: {entidad}. Use {', '.join(ImportacionController.ENTIDADES)}"
+        formato = (formato or os.path.splitext(ruta)[1].lstrip('.')).lower()
+        if formato not in ImportacionController.FORMATOS:
+            return False, f"Formato no soportado: {formato}. Use csv o jsonl"
+        if not os.path.isfile(ruta):
+            return False, f"No existe el archivo {ruta}"
+        if tamano_lote < 1:
+            return False, "El tamaño de lote debe ser mayor que cero"
+
+        try:
+            validar, insertar = ImportacionController._preparar(entidad)
+            resumen = ResumenImportacion(entidad)
+            inicio = time.perf_counter()
+
+            lote = []
+            primera_linea = None
+            for linea, registro, error in ImportacionController._leer_registros(ruta, formato):
+                resumen.leidos += 1
+                if error:
+                    resumen.rechazar(linea, error)
+                    continue
+                try:
+                    lote.append(validar(registro))
+                except ValueError as e:
+                    resumen.rechazar(linea, str(e))
+                    continue
+                primera_linea = primera_linea or linea
+                if len(lote) >= tamano_lote:
+                    ImportacionController._insertar_lote(insertar, lote, primera_linea, linea, resumen)
+                    lote = []
+                    primera_linea = None
+            if lote:
+                ImportacionController._insertar_lote(insertar, lote, primera_linea, linea, resumen)
+
+            resumen.segundos = time.perf_counter() - inicio
+            return True, resumen
+
+        except Exception as e:
+            return False, f"Error al importar {entidad}: {str(e)}"
+
+    @staticmethod
+    def _leer_registros(ruta, formato):
+        """
+        Recorre el archivo sin cargarlo completo en memoria
+
+        Yields:
+            tuple: (número de línea, registro como dict o None, mensaje de error o None)
+        """
+        if formato == 'csv':
+            with open(ruta, newline='', encoding='utf-8-sig') as archivo:
+                lector = csv.DictReader(archivo)
+                for registro in lector:
+                    yield lector.line_num, registro, None
+        else:
+            with open(ruta, encoding='utf-8-sig') as archivo:
+                for linea, texto in enumerate(archivo, start=1):
+                    if not texto.strip():
+                        continue
+                    try:
+                        registro = json.loads(texto)
+                    except ValueError:
+                        yield linea, None, "JSON inválido"
+                        continue
+                    if not isinstance(registro, dict):
+                        yield linea, None, "Se esperaba un objeto JSON"
+                        continue
+                    yield linea, registro, None
+
+    @staticmethod
+    def _insertar_lote(insertar, lote, primera_linea, ultima_linea, resumen):
+        """Inserta y confirma un lote; si falla se descarta completo y se continúa"""
+        try:
+            resumen.insertados += insertar(lote)
+            resumen.lotes += 1
+        except Exception as e:
+            resumen.rechazar(f"{primera_linea}-{ultima_linea}", f"Lote descartado: {e}", len(lote))
+
+    @staticmethod
+    def _preparar(entidad):
+        """
+        Carga en una consulta los datos de referencia y construye el validador
+
+        Returns:
+            tuple: (función que convierte un registro en modelo, función que inserta un lote)
+        """
+        if entidad == 'pacientes':
+            # Cédulas existentes más las de los lotes ya confirmados; las del lote
+            # en curso se guardan aparte hasta que se inserta
+            cedulas = Paciente.obtener_cedulas()
+            pendientes = set()
+
+            def validar(registro):
+                cedula = _texto(registro, 'cedula')
+                if cedula in cedulas or cedula in pendientes:
+                    raise ValueError(f"Ya existe un paciente con la cédula {cedula}")
+                paciente = Paciente(
+                    nombre=_texto(registro, 'nombre'),
+                    apellido=_texto(registro, 'apellido'),
+                    cedula=cedula,
+                    fecha_nacimiento=_fecha_hora(
+                        _texto(registro, 'fecha_nacimiento'), "%d-%m-%Y", 'fecha_nacimiento'
+                    ).date(),
+                    email=_texto(registro, 'email', obligatorio=False)
+                )
+                pendientes.add(cedula)
+                return paciente
+
+            def insertar(lote):
+                try:
+                    insertados = Paciente.crear_lote(lote)
+                    cedulas.update(pendientes)
+                    return insertados
+                finally:
+                    # Si el lote se descarta, sus cédulas siguen libres
+                    pendientes.clear()
+
+            return validar, insertar
+
+        if entidad == 'medicos':
+            def validar(registro):
+                return Medico(
+                    nombre=_texto(registro, 'nombre'),
+                    especialidad=_texto(registro, 'especialidad'),
+                    email=_texto(registro, 'email', obligatorio=False)
+                )
+
+            return validar, Medico.crear_lote
+
+        ids_pacientes = Paciente.obtener_ids()
+        ids_medicos = Medico.obtener_ids()
+
+        def validar(registro):
+            id_paciente = _entero(registro, 'id_paciente')
+            if id_paciente not in ids_pacientes:
+                raise ValueError(f"No existe un paciente con ID {id_paciente}")
+            id_medico = _entero(registro, 'id_medico')
+            if id_medico not in ids_medicos:
+                raise ValueError(f"No existe un médico con ID {id_medico}")
+            return Cita(
+                id_paciente=id_paciente,
+                id_medico=id_medico,
+                fecha_hora=_fecha_hora(_texto(registro, 'fecha_hora'), "%d-%m-%Y %H:%M", 'fecha_hora'),
+                motivo=_texto(registro, 'motivo', obligatorio=False)
+            )
+
+        return validar, Cita.crear_lote
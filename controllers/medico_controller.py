@@ -1,4 +1,6 @@
 from models.medico import Medico
+from models.texto import normalizar
+from controllers.paginacion import Pagina, tamano_pagina, decodificar_cursor
 
 class MedicoController:
     """Controlador para gestionar operaciones con médicos"""
@@ -46,22 +48,87 @@ class MedicoController:
             return []
     
     @staticmethod
-    def buscar_medico_por_id(id):
+    def listar_medicos_paginados(cursor=None, limite=None, con_version=False):
+        """
+        Obtiene una página de médicos ordenados por nombre
+        
+        Args:
+            cursor (str, opcional): Token devuelto en la página anterior
+            limite (int, opcional): Número de médicos por página
+            con_version (bool): Lee también la versión de fila de cada elemento
+            
+        Returns:
+            Pagina: Médicos de la página y token de la siguiente
+        """
+        limite = tamano_pagina(limite)
+        despues = decodificar_cursor(cursor)
+        if despues and len(despues) != 2:
+            despues = None
+        try:
+            medicos = Medico.obtener_pagina(limite + 1, despues, con_version)
+            return Pagina.desde_resultados(medicos, limite, lambda m: (m.nombre, m.id))
+        except Exception as e:
+            print(f"Error al listar médicos: {e}")
+            return Pagina([], limite=limite)
+    
+    @staticmethod
+    def buscar_medico_por_id(id, usar_cache=True):
         """
         Busca un médico por su ID
         
         Args:
             id (int): ID del médico a buscar
+            usar_cache (bool): Si es False se lee directamente de la base de datos
             
         Returns:
             Medico or None: El médico encontrado o None
         """
         try:
-            return Medico.obtener_por_id(id)
+            return Medico.obtener_por_id(id, usar_cache)
         except Exception as e:
             print(f"Error al buscar médico: {e}")
             return None
     
+    @staticmethod
+    def obtener_version_medico(id):
+        """
+        Obtiene la versión de fila de un médico sin leer sus datos
+        
+        Args:
+            id (int): ID del médico
+            
+        Returns:
+            int or None: Versión actual, o None si no existe
+        """
+        try:
+            return Medico.obtener_version(id)
+        except Exception as e:
+            print(f"Error al obtener versión del médico: {e}")
+            return None
+    
+    @staticmethod
+    async def buscar_medico_por_id_async(id):
+        """
+        Busca un médico por su ID con el acceso asíncrono a datos (modo ASGI)
+        
+        Returns:
+            Medico or None: El médico encontrado o None
+        """
+        try:
+            return await Medico.obtener_por_id_async(id)
+        except Exception as e:
+            print(f"Error al buscar médico: {e}")
+            return None
+    
+    @staticmethod
+    async def obtener_version_medico_async(id):
+        """Versión de obtener_version_medico para el modo ASGI"""
+        try:
+            return await Medico.obtener_version_async(id)
+        except Exception as e:
+            print(f"Error al obtener versión del médico: {e}")
+            return None
+    
     @staticmethod
     def buscar_medicos_por_especialidad(especialidad):
         """
@@ -79,6 +146,30 @@ class MedicoController:
             print(f"Error al buscar médicos por especialidad: {e}")
             return []
     
+    @staticmethod
+    def sugerir_especialidades(texto, limite=10):
+        """
+        Sugiere especialidades para autocompletar, sin distinguir mayúsculas ni acentos
+        
+        Args:
+            texto (str): Texto escrito hasta el momento
+            limite (int): Número máximo de sugerencias
+            
+        Returns:
+            list: Nombres de especialidad ordenados por relevancia
+        """
+        try:
+            # Variantes que solo difieren en mayúsculas o acentos se sugieren una vez
+            sugerencias = {}
+            for especialidad in Medico.buscar_especialidades(texto):
+                sugerencias.setdefault(normalizar(especialidad), especialidad)
+                if len(sugerencias) >= limite:
+                    break
+            return list(sugerencias.values())
+        except Exception as e:
+            print(f"Error al sugerir especialidades: {e}")
+            return []
+    
     @staticmethod
     def actualizar_medico(id, nombre, especialidad, email=None):
         """
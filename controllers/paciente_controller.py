@@ -1,5 +1,8 @@
 from datetime import datetime
 from models.paciente import Paciente
+from models import indice_pacientes
+from models.texto import terminos
+from controllers.paginacion import Pagina, tamano_pagina, codificar_cursor, decodificar_cursor
 
 class PacienteController:
     """Controlador para gestionar operaciones con pacientes"""
@@ -62,22 +65,160 @@ class PacienteController:
             return []
     
     @staticmethod
-    def buscar_paciente_por_id(id):
+    def listar_pacientes_paginados(cursor=None, limite=None, con_version=False):
+        """
+        Obtiene una página de pacientes ordenados por apellido y nombre
+        
+        Args:
+            cursor (str, opcional): Token devuelto en la página anterior
+            limite (int, opcional): Número de pacientes por página
+            con_version (bool): Lee también la versión de fila de cada elemento
+            
+        Returns:
+            Pagina: Pacientes de la página y token de la siguiente
+        """
+        limite = tamano_pagina(limite)
+        despues = decodificar_cursor(cursor)
+        if despues and len(despues) != 3:
+            despues = None
+        try:
+            pacientes = Paciente.obtener_pagina(limite + 1, despues, con_version)
+            return Pagina.desde_resultados(pacientes, limite, lambda p: (p.apellido, p.nombre, p.id))
+        except Exception as e:
+            print(f"Error al listar pacientes: {e}")
+            return Pagina([], limite=limite)
+    
+    @staticmethod
+    def buscar_pacientes(texto, cursor=None, limite=None):
+        """
+        Busca pacientes por nombre, apellido, email o cédula, sin distinguir acentos
+        
+        Cada palabra del texto debe coincidir con el inicio de alguna palabra del
+        paciente. Un texto solo con dígitos se busca como prefijo de la cédula.
+        
+        Args:
+            texto (str): Texto escrito por el usuario
+            cursor (str, opcional): Token devuelto en la página anterior
+            limite (int, opcional): Número de pacientes por página
+            
+        Returns:
+            Pagina: Pacientes ordenados por relevancia y token de la siguiente página
+        """
+        limite = tamano_pagina(limite)
+        posicion = decodificar_cursor(cursor)
+        desplazamiento = 0
+        if posicion and len(posicion) == 1 and isinstance(posicion[0], int) and posicion[0] > 0:
+            desplazamiento = posicion[0]
+        consulta = terminos(texto)
+        if not consulta:
+            return Pagina([], limite=limite)
+        try:
+            pacientes = PacienteController._buscar(texto.strip(), consulta, limite + 1, desplazamiento)
+        except Exception as e:
+            print(f"Error al buscar pacientes: {e}")
+            return Pagina([], limite=limite)
+        # Los resultados se ordenan por relevancia, así que el token guarda la posición
+        if len(pacientes) > limite:
+            return Pagina(pacientes[:limite], codificar_cursor([desplazamiento + limite]), limite)
+        return Pagina(pacientes, None, limite)
+    
+    @staticmethod
+    def sugerir_pacientes(texto, limite=10):
+        """
+        Sugiere pacientes para el buscador del formulario de citas
+        
+        Usa la misma búsqueda por prefijo que buscar_pacientes, así que nunca lee
+        más de limite pacientes aunque la tabla sea muy grande.
+        
+        Args:
+            texto (str): Texto escrito hasta el momento
+            limite (int): Número máximo de sugerencias
+            
+        Returns:
+            list: Pacientes ordenados por relevancia
+        """
+        return PacienteController.buscar_pacientes(texto, None, limite).elementos
+    
+    # Se desactiva si el motor no tiene índice de texto completo (modo 'auto')
+    _texto_completo = True
+    
+    @staticmethod
+    def _buscar(texto, consulta, limite, desplazamiento):
+        """Elige entre el prefijo de cédula, el índice del motor y el índice en memoria"""
+        if texto.isdigit():
+            return Paciente.buscar_por_prefijo_cedula(texto, limite, desplazamiento)
+        if indice_pacientes.MODO != 'memoria' and PacienteController._texto_completo:
+            try:
+                pacientes = Paciente.buscar_texto(consulta, limite, desplazamiento)
+                if pacientes is not None:
+                    return pacientes
+                # El motor no tiene índice de texto completo: no se vuelve a intentar
+                PacienteController._texto_completo = False
+            except Exception as e:
+                if indice_pacientes.MODO == 'bd':
+                    raise e
+                # Un fallo puntual (timeout, conexión perdida) solo afecta a esta búsqueda
+                print(f"Búsqueda de texto completo no disponible, se usa el índice en memoria: {e}")
+        return indice_pacientes.indice.buscar(texto, limite, desplazamiento)
+    
+    @staticmethod
+    def buscar_paciente_por_id(id, usar_cache=True):
         """
         Busca un paciente por su ID
         
         Args:
             id (int): ID del paciente a buscar
+            usar_cache (bool): Si es False se lee directamente de la base de datos
             
         Returns:
             Paciente or None: El paciente encontrado o None
         """
         try:
-            return Paciente.obtener_por_id(id)
+            return Paciente.obtener_por_id(id, usar_cache)
         except Exception as e:
             print(f"Error al buscar paciente: {e}")
             return None
     
+    @staticmethod
+    def obtener_version_paciente(id):
+        """
+        Obtiene la versión de fila de un paciente sin leer sus datos
+        
+        Args:
+            id (int): ID del paciente
+            
+        Returns:
+            int or None: Versión actual, o None si no existe
+        """
+        try:
+            return Paciente.obtener_version(id)
+        except Exception as e:
+            print(f"Error al obtener versión del paciente: {e}")
+            return None
+    
+    @staticmethod
+    async def buscar_paciente_por_id_async(id):
+        """
+        Busca un paciente por su ID con el acceso asíncrono a datos (modo ASGI)
+        
+        Returns:
+            Paciente or None: El paciente encontrado o None
+        """
+        try:
+            return await Paciente.obtener_por_id_async(id)
+        except Exception as e:
+            print(f"Error al buscar paciente: {e}")
+            return None
+    
+    @staticmethod
+    async def obtener_version_paciente_async(id):
+        """Versión de obtener_version_paciente para el modo ASGI"""
+        try:
+            return await Paciente.obtener_version_async(id)
+        except Exception as e:
+            print(f"Error al obtener versión del paciente: {e}")
+            return None
+    
     @staticmethod
     def buscar_paciente_por_cedula(cedula):
         """
@@ -0,0 +1,67 @@
+import base64
+import json
+
+# Tamaño de página por defecto y máximo permitido en los listados
+TAMANO_PAGINA = 50
+TAMANO_PAGINA_MAXIMO = 200
+
+
+class Pagina:
+    """Página de resultados de una consulta paginada por clave (keyset)"""
+
+    def __init__(self, elementos, siguiente=None, limite=TAMANO_PAGINA):
+        self.elementos = elementos
+        # Token para pedir la página siguiente, o None si es la última
+        self.siguiente = siguiente
+        self.limite = limite
+
+    @staticmethod
+    def desde_resultados(resultados, limite, clave):
+        """
+        Construye la página a partir de una consulta que pidió limite + 1 filas
+
+        Args:
+            resultados (list): Filas obtenidas (como máximo limite + 1)
+            limite (int): Tamaño de la página
+            clave (callable): Devuelve la tupla de orden de un elemento
+
+        Returns:
+            Pagina: Página con el token de la siguiente si hay más filas
+        """
+        if len(resultados) > limite:
+            elementos = resultados[:limite]
+            return Pagina(elementos, codificar_cursor(clave(elementos[-1])), limite)
+        return Pagina(resultados, None, limite)
+
+
+def tamano_pagina(limite=None):
+    """Normaliza el tamaño de página solicitado dentro de los límites permitidos"""
+    try:
+        limite = int(limite) if limite else TAMANO_PAGINA
+    except (TypeError, ValueError):
+        limite = TAMANO_PAGINA
+    return max(1, min(limite, TAMANO_PAGINA_MAXIMO))
+
+
+def codificar_cursor(valores):
+    """Convierte la clave del último elemento en un token opaco para la URL"""
+    valores = [v.isoformat() if hasattr(v, 'isoformat') else v for v in valores]
+    datos = json.dumps(valores, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(datos).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(token):
+    """
+    Recupera la clave codificada en un token
+
+    Returns:
+        list or None: Valores de la clave, o None si el token falta o no es válido
+    """
+    if not token:
+        return None
+    try:
+        relleno = '=' * (-len(token) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(token + relleno))
+    except (ValueError, TypeError):
+        return None
+    return valores if isinstance(valores, list) else None
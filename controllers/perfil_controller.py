@@ -0,0 +1,135 @@
+import io
+import json
+import os
+import pstats
+import re
+from datetime import datetime
+
+# Carpeta donde se guardan los perfiles capturados
+DIRECTORIO = os.getenv('PERFIL_DIRECTORIO', 'perfiles')
+# Perfiles que se conservan; al superarlo se borran los más antiguos
+MAXIMO_PERFILES = int(os.getenv('PERFIL_MAXIMO', '100'))
+# Funciones que se muestran en el resumen de un perfil de cProfile
+FUNCIONES_RESUMEN = 60
+# Criterios de orden aceptados para el resumen
+ORDENES = ('cumulative', 'tottime', 'ncalls')
+
+# Nombres válidos: los genera guardar_perfil y no permiten salir del directorio
+_NOMBRE_VALIDO = re.compile(r'^[0-9]{8}-[0-9]{6}-[0-9]{6}_[A-Z]+_[\w.-]*$')
+_EXTENSIONES = {'cprofile': '.prof', 'pyinstrument': '.html'}
+
+
+class PerfilController:
+    """Controlador para guardar y consultar los perfiles de peticiones capturados"""
+
+    @staticmethod
+    def guardar_perfil(metodo, ruta, estado, duracion_ms, motor, escribir):
+        """
+        Guarda un perfil con sus datos de la petición
+
+        Args:
+            metodo (str): Método HTTP
+            ruta (str): Ruta de la petición, sin parámetros
+            estado (str): Estado HTTP de la respuesta
+            duracion_ms (float): Duración de la petición con el perfilador activo
+            motor (str): 'cprofile' o 'pyinstrument'
+            escribir (callable): Recibe la ruta del archivo y escribe el perfil
+
+        Returns:
+            str or None: Nombre del perfil guardado, o None si falló
+        """
+        try:
+            os.makedirs(DIRECTORIO, exist_ok=True)
+            slug = re.sub(r'[^\w.-]+', '-', ruta.strip('/'))[:80] or 'inicio'
+            nombre = f"{datetime.now():%Y%m%d-%H%M%S-%f}_{metodo.upper()}_{slug}"
+            escribir(os.path.join(DIRECTORIO, nombre + _EXTENSIONES[motor]))
+            with open(os.path.join(DIRECTORIO, nombre + '.json'), 'w', encoding='utf-8') as archivo:
+                json.dump({
+                    'nombre': nombre,
+                    'fecha': datetime.now().isoformat(timespec='seconds'),
+                    'metodo': metodo,
+                    'ruta': ruta,
+                    'estado': estado,
+                    'duracion_ms': round(duracion_ms, 1),
+                    'motor': motor,
+                }, archivo, ensure_ascii=False)
+            PerfilController._recortar()
+            return nombre
+        except Exception as e:
+            print(f"Error al guardar el perfil: {e}")
+            return None
+
+    @staticmethod
+    def _recortar():
+        """Borra los perfiles más antiguos por encima de MAXIMO_PERFILES"""
+        nombres = sorted(archivo[:-5] for archivo in os.listdir(DIRECTORIO) if archivo.endswith('.json'))
+        for nombre in nombres[:max(0, len(nombres) - MAXIMO_PERFILES)]:
+            for extension in ('.json', *_EXTENSIONES.values()):
+                try:
+                    os.remove(os.path.join(DIRECTORIO, nombre + extension))
+                except FileNotFoundError:
+                    pass
+
+    @staticmethod
+    def listar_perfiles():
+        """
+        Obtiene los perfiles guardados, del más reciente al más antiguo
+
+        Returns:
+            list: Datos de cada perfil (nombre, fecha, método, ruta, estado, duración, motor)
+        """
+        if not os.path.isdir(DIRECTORIO):
+            return []
+        perfiles = []
+        for archivo in sorted(os.listdir(DIRECTORIO), reverse=True):
+            if not archivo.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(DIRECTORIO, archivo), encoding='utf-8') as datos:
+                    perfiles.append(json.load(datos))
+            except Exception as e:
+                print(f"Error al leer el perfil {archivo}: {e}")
+        return perfiles
+
+    @staticmethod
+    def obtener_perfil(nombre):
+        """
+        Busca un perfil guardado
+
+        Returns:
+            tuple: (datos del perfil, ruta del archivo) o None si no existe
+        """
+        if not _NOMBRE_VALIDO.match(nombre or ''):
+            return None
+        try:
+            with open(os.path.join(DIRECTORIO, nombre + '.json'), encoding='utf-8') as archivo:
+                datos = json.load(archivo)
+        except (FileNotFoundError, ValueError):
+            return None
+        ruta = os.path.join(DIRECTORIO, nombre + _EXTENSIONES.get(datos.get('motor'), '.prof'))
+        if not os.path.isfile(ruta):
+            return None
+        return datos, ruta
+
+    @staticmethod
+    def resumir_perfil(ruta, orden='cumulative', limite=FUNCIONES_RESUMEN):
+        """
+        Tabla de pstats de un perfil de cProfile
+
+        Args:
+            ruta (str): Archivo .prof
+            orden (str): Uno de ORDENES
+            limite (int): Funciones que se muestran
+
+        Returns:
+            tuple: (éxito, texto del resumen o mensaje de error)
+        """
+        if orden not in ORDENES:
+            return False, f"Orden no válido. Use {', '.join(ORDENES)}"
+        try:
+            salida = io.StringIO()
+            estadisticas = pstats.Stats(ruta, stream=salida)
+            estadisticas.strip_dirs().sort_stats(orden).print_stats(limite)
+            return True, salida.getvalue()
+        except Exception as e:
+            return False, f"Error al leer el perfil: {str(e)}"
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Herramientas de línea de comandos para importar y exportar datos de la clínica
+
+Uso:
+    python datos_cli.py importar pacientes pacientes.csv
+    python datos_cli.py importar citas citas.jsonl --lote 5000
+    python datos_cli.py exportar citas_2024.csv --desde 01-01-2024 --hasta 31-12-2024
+    python datos_cli.py exportar citas_medico.xlsx --medico 7
+"""
+
+import argparse
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+# Cargar variables de entorno antes de configurar la base de datos
+load_dotenv()
+
+from config.database import DatabaseConnection
+from controllers.importacion_controller import ImportacionController, TAMANO_LOTE
+from controllers.exportacion_controller import ExportacionController
+
+
+def importar(argumentos):
+    """Ejecuta una importación e imprime el informe de rendimiento"""
+    exito, resultado = ImportacionController.importar(
+        argumentos.entidad,
+        argumentos.archivo,
+        formato=argumentos.formato,
+        tamano_lote=argumentos.lote
+    )
+    if not exito:
+        print(f"Error: {resultado}")
+        return 1
+    print(resultado)
+    return 0
+
+
+def exportar(argumentos):
+    """Exporta las citas filtradas leyendo y escribiendo por lotes"""
+    formato = argumentos.formato or os.path.splitext(argumentos.archivo)[1].lstrip('.').lower()
+    if formato not in ExportacionController.FORMATOS:
+        print(f"Error: Formato no soportado: {formato}. Use csv o xlsx")
+        return 1
+    exito, citas = ExportacionController.preparar_citas(
+        argumentos.desde, argumentos.hasta, argumentos.medico, argumentos.paciente
+    )
+    if not exito:
+        print(f"Error: {citas}")
+        return 1
+
+    inicio = time.perf_counter()
+    try:
+        if formato == 'csv':
+            with open(argumentos.archivo, 'w', newline='', encoding='utf-8') as archivo:
+                total = ExportacionController.escribir_csv(citas, archivo)
+        else:
+            total = ExportacionController.escribir_xlsx(citas, argumentos.archivo)
+    except Exception as e:
+        print(f"Error al exportar citas: {e}")
+        return 1
+    segundos = time.perf_counter() - inicio
+    velocidad = total / segundos if segundos else 0.0
+    print(f"Exportadas {total} citas a {argumentos.archivo} en {segundos:.2f} s ({velocidad:,.0f} filas/s)")
+    return 0
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos"""
+    parser = argparse.ArgumentParser(description="Importación y exportación de datos de la clínica")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    parser_importar = subparsers.add_parser('importar', help="Importa un archivo CSV o JSONL")
+    parser_importar.add_argument('entidad', choices=ImportacionController.ENTIDADES)
+    parser_importar.add_argument('archivo', help="Archivo .csv o .jsonl")
+    parser_importar.add_argument('--formato', choices=ImportacionController.FORMATOS,
+                                 help="Formato del archivo (por defecto según la extensión)")
+    parser_importar.add_argument('--lote', type=int, default=TAMANO_LOTE,
+                                 help=f"Filas por inserción y confirmación (por defecto {TAMANO_LOTE})")
+    parser_importar.set_defaults(funcion=importar)
+
+    parser_exportar = subparsers.add_parser('exportar', help="Exporta citas a CSV o Excel")
+    parser_exportar.add_argument('archivo', help="Archivo .csv o .xlsx de destino")
+    parser_exportar.add_argument('--formato', choices=ExportacionController.FORMATOS,
+                                 help="Formato del archivo (por defecto según la extensión)")
+    parser_exportar.add_argument('--desde', help="Fecha de inicio DD-MM-YYYY")
+    parser_exportar.add_argument('--hasta', help="Fecha de fin DD-MM-YYYY (por defecto, la de inicio)")
+    parser_exportar.add_argument('--medico', type=int, help="ID del médico")
+    parser_exportar.add_argument('--paciente', type=int, help="ID del paciente")
+    parser_exportar.set_defaults(funcion=exportar)
+
+    argumentos = parser.parse_args(argv)
+
+    try:
+        db = DatabaseConnection()
+    except Exception as e:
+        print(f"Error al conectar con la base de datos: {e}")
+        print("Verifique su archivo .env con las credenciales de conexión")
+        return 1
+    try:
+        return argumentos.funcion(argumentos)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,22 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, SelectField, TextAreaField, SubmitField, DateField, DateTimeField, TimeField
-from wtforms.validators import DataRequired, Optional, Length
+from wtforms import StringField, SelectField, TextAreaField, SubmitField, DateField, DateTimeField, TimeField, IntegerField
+from wtforms.widgets import HiddenInput
+from wtforms.validators import DataRequired, Optional, Length, NumberRange
 from datetime import datetime
 
 class CitaForm(FlaskForm):
     """Formulario para crear/editar citas"""
-    id_paciente = SelectField('Paciente', coerce=int, validators=[
+    # El paciente se elige con el buscador (texto visible) y se envía su ID oculto;
+    # no hay lista de opciones, así que no hace falta cargar todos los pacientes
+    paciente = StringField('Paciente', validators=[Optional()])
+    
+    id_paciente = IntegerField('Paciente', widget=HiddenInput(), validators=[
         DataRequired(message="Debe seleccionar un paciente")
     ])
     
-    id_medico = SelectField('Médico', coerce=int, validators=[
+    # Las opciones solo se cargan para mostrar el formulario; al guardar, la
+    # existencia del médico (y del paciente) la comprueban las claves foráneas
+    id_medico = SelectField('Médico', coerce=int, validate_choice=False, validators=[
         DataRequired(message="Debe seleccionar un médico")
     ])
     
@@ -38,4 +45,26 @@ class BusquedaFechaForm(FlaskForm):
                          format='%Y-%m-%d',
                          validators=[Optional()])
     
-    submit = SubmitField('Buscar')
\ No newline at end of file
+    submit = SubmitField('Buscar')
+
+class BusquedaEspaciosForm(FlaskForm):
+    """Formulario para buscar huecos libres por especialidad"""
+    especialidad = StringField('Especialidad', validators=[
+        DataRequired(message="La especialidad es obligatoria"),
+        Length(max=100)
+    ])
+    
+    fecha_inicio = DateField('Desde', 
+                           format='%Y-%m-%d',
+                           validators=[DataRequired(message="La fecha de inicio es obligatoria")])
+    
+    fecha_fin = DateField('Hasta (opcional)', 
+                         format='%Y-%m-%d',
+                         validators=[Optional()])
+    
+    duracion = IntegerField('Duración (minutos)', validators=[
+        Optional(),
+        NumberRange(min=5, max=480, message="La duración debe estar entre 5 y 480 minutos")
+    ])
+    
+    submit = SubmitField('Buscar')
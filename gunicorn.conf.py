@@ -0,0 +1,102 @@
+"""
+Configuración de gunicorn para la aplicación web
+
+Cada worker es un proceso con su propio pool de conexiones, que se abre en su
+primera petición y se cierra al detenerlo. Dentro de cada worker las peticiones
+se atienden con hilos (gthread): mientras un hilo espera a la base de datos el
+GIL queda libre para los demás, así que unos pocos procesos con varios hilos
+rinden más que muchos procesos de un hilo y abren menos conexiones.
+
+Conexiones abiertas como máximo: GUNICORN_WORKERS x min(GUNICORN_THREADS, DB_POOL_SIZE).
+Conviene que DB_POOL_SIZE sea al menos GUNICORN_THREADS; si es menor, los hilos
+sobrantes esperan conexión hasta DB_POOL_TIMEOUT.
+
+Uso:
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+
+# (2 x núcleos) + 1 procesos, el valor recomendado por gunicorn para cargas con E/S
+workers = int(os.getenv('GUNICORN_WORKERS', str(multiprocessing.cpu_count() * 2 + 1)))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# La aplicación se importa una vez en el proceso maestro y los workers la heredan
+# (menos memoria y arranque más rápido); es seguro porque create_app no conecta
+preload_app = True
+
+# Los informes y exportaciones se envían por partes y pueden tardar
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = 30
+keepalive = 5
+
+# Reciclar cada worker tras un número de peticiones acota el crecimiento de
+# memoria de las cachés; el jitter evita que todos se reinicien a la vez
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.getenv('GUNICORN_ACCESSLOG', '-')
+
+# Cada worker vuelca aquí sus métricas y /metrics devuelve la suma de todos; la
+# carpeta es propia de este proceso maestro (se fija antes de importar la aplicación)
+os.environ.setdefault(
+    'METRICAS_DIRECTORIO', os.path.join(tempfile.gettempdir(), f'clinica_metricas_{os.getpid()}')
+)
+
+
+def on_starting(server):
+    """Empieza con la carpeta de métricas vacía: los totales se cuentan desde este arranque"""
+    directorio = os.environ['METRICAS_DIRECTORIO']
+    shutil.rmtree(directorio, ignore_errors=True)
+    os.makedirs(directorio, exist_ok=True)
+
+
+def when_ready(server):
+    """
+    Compila las plantillas en el proceso maestro, antes de crear los workers:
+    todos heredan las plantillas ya compiladas en memoria
+
+    Usa la aplicación que gunicorn ya cargó (preload_app) en lugar de crear otra.
+    """
+    from web_controllers import arranque
+    try:
+        cantidad, segundos = arranque.precompilar_plantillas(server.app.wsgi())
+        server.log.info("%d plantillas compiladas en %.0f ms", cantidad, segundos * 1000)
+    except Exception as e:
+        server.log.warning("No se pudieron compilar las plantillas: %s", e)
+
+
+def post_fork(server, worker):
+    """El worker empieza sin conexiones: no hereda ninguna del maestro"""
+    from config import metricas
+    metricas.iniciar_volcado()
+    server.log.info("Worker %s iniciado", worker.pid)
+
+
+def post_worker_init(worker):
+    """Abre la conexión y llena las cachés del worker antes de que acepte peticiones"""
+    from web_controllers import arranque
+    if not arranque.CALENTAR:
+        return
+    # worker.wsgi es la aplicación heredada del maestro
+    worker.log.info("Worker %s %s", worker.pid, arranque.resumen(arranque.calentar(worker.wsgi)))
+
+
+def worker_exit(server, worker):
+    """Cierra las conexiones del worker al detenerlo o reciclarlo"""
+    from config import metricas
+    from web_app import cerrar_conexiones
+    cerrar_conexiones()
+    # Último volcado: los totales conservan lo que contó este worker
+    metricas.volcar()
+
+
+def on_exit(server):
+    """Borra la carpeta de métricas al detener gunicorn"""
+    shutil.rmtree(os.environ['METRICAS_DIRECTORIO'], ignore_errors=True)
@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from models import eventos
+from models.cita import Cita, DURACION_CITA_MINUTOS
+
+# Agenda en memoria opcional; sin ella la disponibilidad se consulta siempre en la base de datos
+HABILITADA = os.getenv('AGENDA_EN_MEMORIA', '0') == '1'
+
+
+class _AgendaMedico:
+    """Horas de inicio ordenadas de un médico dentro del horizonte cargado"""
+
+    __slots__ = ('fechas', 'ids', 'desde', 'hasta', 'expira', 'version')
+
+    def __init__(self, horario, desde, hasta, expira, version):
+        self.fechas = [fecha for fecha, _ in horario]
+        self.ids = [id for _, id in horario]
+        self.desde = desde
+        self.hasta = hasta
+        self.expira = expira
+        # Versión de las citas (eventos.version) leída antes de la carga
+        self.version = version
+
+
+class AgendaMedicos:
+    """
+    Agenda por médico para el horizonte de programación, consultada con búsqueda binaria
+
+    Como todas las citas duran lo mismo, los intervalos de un médico quedan
+    ordenados por su hora de inicio y basta una lista ordenada: los únicos
+    candidatos a solaparse con una hora son sus vecinos inmediatos.
+    """
+
+    def __init__(self, horizonte_dias=90, ttl=60, duracion_minutos=DURACION_CITA_MINUTOS):
+        """
+        Inicializa la agenda
+
+        Args:
+            horizonte_dias (int): Días hacia adelante que se cargan por médico
+            ttl (float): Segundos tras los que se recarga un médico; acota el desfase
+                con los cambios hechos fuera de la aplicación (los de otros workers
+                los detecta la versión compartida de las citas)
+            duracion_minutos (int): Duración fija de cada cita
+        """
+        self.horizonte = timedelta(days=horizonte_dias)
+        self.ttl = ttl
+        self.duracion = timedelta(minutes=duracion_minutos)
+        self._agendas = {}
+        # Médico de cada cita cargada, para descartar su agenda cuando la cita cambia
+        self._medico_de_cita = {}
+        self._lock = threading.Lock()
+        self._generacion = 0
+
+    def buscar_conflicto(self, id_medico, fecha_hora, excluir_id=None):
+        """
+        Busca una cita del médico que se solape con la hora indicada
+
+        Fuera del horizonte cargado consulta directamente la base de datos.
+
+        Returns:
+            Cita or None: La primera cita en conflicto
+        """
+        agenda = self._obtener(id_medico)
+        inicio = fecha_hora - self.duracion
+        fin = fecha_hora + self.duracion
+        if inicio < agenda.desde or fin > agenda.hasta:
+            return Cita.buscar_conflicto(id_medico, fecha_hora, excluir_id)
+
+        fechas = agenda.fechas
+        posicion = bisect_right(fechas, inicio)
+        while posicion < len(fechas) and fechas[posicion] < fin:
+            if agenda.ids[posicion] != excluir_id:
+                return Cita(id=agenda.ids[posicion], id_medico=id_medico, fecha_hora=fechas[posicion])
+            posicion += 1
+        return None
+
+    def _obtener(self, id_medico):
+        """
+        Devuelve la agenda vigente del médico, cargándola si hace falta
+
+        Una agenda guardada deja de valer cuando cambia la versión de las citas,
+        que comparten todos los workers: así se ven también las citas creadas
+        por otros procesos sin esperar al TTL.
+        """
+        ahora = time.monotonic()
+        version = eventos.version('cita')
+        with self._lock:
+            agenda = self._agendas.get(id_medico)
+            if agenda is not None and agenda.expira > ahora and agenda.version == version:
+                return agenda
+            generacion = self._generacion
+
+        hoy = datetime.combine(datetime.now().date(), datetime.min.time())
+        desde = hoy - self.duracion
+        hasta = hoy + self.horizonte
+        horario = Cita.obtener_horarios([id_medico], desde, hasta)[id_medico]
+        agenda = _AgendaMedico(horario, desde, hasta, ahora + self.ttl, version)
+
+        with self._lock:
+            # Si hubo un cambio durante la carga, la agenda se usa una vez pero no se guarda
+            if generacion == self._generacion:
+                self._agendas[id_medico] = agenda
+                for id in agenda.ids:
+                    self._medico_de_cita[id] = id_medico
+        return agenda
+
+    def descartar(self, *ids_medicos):
+        """Descarta la agenda de los médicos indicados; se recarga en la próxima consulta"""
+        with self._lock:
+            self._generacion += 1
+            for id_medico in ids_medicos:
+                agenda = self._agendas.pop(id_medico, None)
+                if agenda is not None:
+                    for id in agenda.ids:
+                        self._medico_de_cita.pop(id, None)
+
+    def limpiar(self):
+        """Descarta todas las agendas"""
+        with self._lock:
+            self._generacion += 1
+            self._agendas.clear()
+            self._medico_de_cita.clear()
+
+    def al_cambiar(self, entidad, accion, id):
+        """
+        Mantiene la agenda al día con los cambios de citas confirmados en este proceso
+
+        Cada cambio de cita aumenta la generación aunque no haya agendas
+        guardadas: una carga en curso pudo leer los datos anteriores al cambio y
+        no debe guardarse.
+        """
+        if entidad != 'cita':
+            return
+        if id is None or not self._agendas:
+            # Cambios masivos: no se sabe qué médicos se vieron afectados
+            self.limpiar()
+            return
+        medicos = {self._medico_de_cita.get(id)}
+        if accion != 'eliminar':
+            medicos.add(Cita.obtener_id_medico(id))
+        medicos.discard(None)
+        self.descartar(*medicos)
+
+
+agenda = AgendaMedicos(
+    horizonte_dias=int(os.getenv('AGENDA_HORIZONTE_DIAS', '90')),
+    ttl=float(os.getenv('AGENDA_TTL', '60'))
+)
+eventos.suscribir(agenda.al_cambiar)
@@ -0,0 +1,55 @@
+import copy
+import os
+from config.cache import CacheLRU
+from models import eventos
+
+# Caché de lecturas de pacientes y médicos (por ID y listados completos)
+cache = CacheLRU(
+    max_entradas=int(os.getenv('CACHE_MAX_ENTRADAS', '1024')),
+    ttl=float(os.getenv('CACHE_TTL', '60'))
+)
+HABILITADA = os.getenv('CACHE_HABILITADA', '1') == '1'
+
+# Entradas derivadas que cambian con cualquier modificación de la entidad
+_LISTADOS = {
+    'paciente': (('paciente', 'todos'),),
+    'medico': (('medico', 'todos'), ('medico', 'especialidades')),
+}
+
+
+def _leer(clave, cargar):
+    """
+    Lee a través de la caché una entrada válida solo para la versión actual de su entidad
+
+    Cada entrada guarda la versión de la entidad (eventos.version) leída antes de
+    cargarla. Con gunicorn esa versión está en memoria compartida, así que un
+    cambio confirmado en otro worker descarta la entrada en este sin esperar al TTL.
+    """
+    version = eventos.version(clave[0])
+
+    def cargar_con_version():
+        valor = cargar()
+        return None if valor is None else (version, valor)
+
+    entrada = cache.obtener(clave, cargar_con_version, lambda guardada: guardada[0] == version)
+    return None if entrada is None else entrada[1]
+
+
+def obtener(clave, cargar):
+    """Lee una entidad a través de la caché; devuelve una copia para que el llamador pueda modificarla"""
+    if not HABILITADA:
+        return cargar()
+    return copy.copy(_leer(clave, cargar))
+
+
+def obtener_lista(clave, cargar):
+    """Lee un listado a través de la caché; los elementos son compartidos y de solo lectura"""
+    if not HABILITADA:
+        return cargar()
+    return list(_leer(clave, cargar))
+
+
+@eventos.suscribir
+def _invalidar(entidad, accion, id):
+    """Descarta ya en este proceso la entidad modificada y los listados que la contienen"""
+    cache.invalidar((entidad, id), *_LISTADOS.get(entidad, ()))
@@ -1,16 +1,69 @@
+import asyncio
+import contextlib
+import os
+from datetime import timedelta
 from config.database import DatabaseConnection
-from models.paciente import Paciente
-from models.medico import Medico
+from config.async_database import AsyncDatabaseConnection
+from models import eventos
+from models.mapeo import MapeadorCita
+
+# Consulta base de citas con los datos parciales de paciente y médico
+COLUMNAS_CITAS = """
+        c.Id, c.IdPaciente, c.IdMedico, c.FechaHora, c.Motivo,
+        p.Nombre AS PacienteNombre, p.Apellido AS PacienteApellido,
+        m.Nombre AS MedicoNombre, m.Especialidad AS MedicoEspecialidad"""
+TABLAS_CITAS = """
+    FROM Cita c
+    INNER JOIN Paciente p ON c.IdPaciente = p.Id
+    INNER JOIN Medico m ON c.IdMedico = m.Id
+"""
+CONSULTA_CITAS = f"""
+    SELECT {COLUMNAS_CITAS}{TABLAS_CITAS}"""
+
+# La misma consulta con la versión de fila de la cita y de los datos de paciente y médico que incluye
+CONSULTA_CITAS_VERSIONES = f"""
+    SELECT {COLUMNAS_CITAS},
+        CAST(c.Version AS BIGINT) AS Version,
+        CAST(p.Version AS BIGINT) AS PacienteVersion,
+        CAST(m.Version AS BIGINT) AS MedicoVersion{TABLAS_CITAS}"""
+
+# Solo las versiones de fila de una cita, su paciente y su médico
+CONSULTA_VERSION_CITA = f"""
+    SELECT CAST(c.Version AS BIGINT), CAST(p.Version AS BIGINT), CAST(m.Version AS BIGINT){TABLAS_CITAS}
+    WHERE c.Id = ?"""
+
+# Duración fija de cada cita; dos citas del mismo médico se solapan si sus horas
+# de inicio distan menos que esto
+DURACION_CITA_MINUTOS = int(os.getenv('CITA_DURACION_MINUTOS', '30'))
+
+class ReferenciaInvalida(Exception):
+    """La cita apunta a un paciente o médico que no existe"""
+
+class HorarioOcupado(Exception):
+    """El médico ya tiene una cita que se solapa con la hora pedida"""
+
+    def __init__(self, conflicto):
+        super().__init__(f"El médico ya tiene una cita a las {conflicto.fecha_hora.strftime('%d-%m-%Y %H:%M')} "
+                         f"(ID {conflicto.id})")
+        self.conflicto = conflicto
 
 class Cita:
     """Modelo para la tabla Cita"""
     
-    def __init__(self, id=None, id_paciente=None, id_medico=None, fecha_hora=None, motivo=None):
+    # Sin __dict__ por instancia: los listados grandes crean muchos objetos
+    __slots__ = ('id', 'id_paciente', 'id_medico', 'fecha_hora', 'motivo', 'paciente', 'medico', 'version')
+    
+    # Filas que se piden a la base de datos en cada lote al iterar resultados
+    TAMANO_LOTE = 500
+    
+    def __init__(self, id=None, id_paciente=None, id_medico=None, fecha_hora=None, motivo=None, version=None):
         self.id = id
         self.id_paciente = id_paciente
         self.id_medico = id_medico
         self.fecha_hora = fecha_hora
         self.motivo = motivo
+        # Versión de fila; solo se lee en las consultas que la piden
+        self.version = version
         # Propiedades para almacenar datos relacionados
         self.paciente = None
         self.medico = None
@@ -20,155 +73,303 @@ class Cita:
         """Crea una nueva cita en la base de datos"""
         db = DatabaseConnection()
         try:
+            # Comprobación y alta en la misma transacción bloqueada: dos altas
+            # simultáneas no pueden ver ambas el horario libre
+            Cita._verificar_horario(cita)
             cursor = db.get_cursor()
-            # Primero insertamos la cita
-            query = """
-                INSERT INTO Cita (IdPaciente, IdMedico, FechaHora, Motivo)
-                VALUES (?, ?, ?, ?)
-            """
+            # Una sola sentencia: las claves foráneas validan paciente y médico
+            # y el INSERT devuelve el ID generado
+            query = db.backend.sql_insertar('Cita', ['IdPaciente', 'IdMedico', 'FechaHora', 'Motivo'])
             cursor.execute(
                 query, 
                 (cita.id_paciente, cita.id_medico, cita.fecha_hora, cita.motivo)
             )
-            
-            # Luego obtenemos el ID generado
-            cursor.execute("SELECT SCOPE_IDENTITY() AS Id")
-            row = cursor.fetchone()
-            cita.id = row.Id
+            cita.id = int(cursor.fetchone()[0])
             
             db.commit()
+            eventos.notificar('cita', 'crear', cita.id)
             return cita
+        except HorarioOcupado:
+            db.rollback()
+            raise
+        except db.backend.errores_integridad as e:
+            db.rollback()
+            Cita._verificar_integridad(cita)
+            print(f"Error al crear cita: {e}")
+            raise e
         except Exception as e:
             db.rollback()
             print(f"Error al crear cita: {e}")
             raise e
     
     @staticmethod
-    def obtener_todas():
-        """Obtiene todas las citas con datos de pacientes y médicos"""
+    def crear_lote(citas):
+        """
+        Inserta varias citas con un solo executemany y una sola confirmación
+
+        Las referencias deben venir validadas; una clave foránea inválida o dos
+        citas del mismo médico a la misma hora (índice único) hacen fallar el
+        lote completo.
+
+        Returns:
+            int: Número de citas insertadas
+        """
         db = DatabaseConnection()
         try:
             cursor = db.get_cursor()
+            db.backend.preparar_lote(cursor)
             query = """
-                SELECT 
-                    c.Id, c.IdPaciente, c.IdMedico, c.FechaHora, c.Motivo,
-                    p.Nombre AS PacienteNombre, p.Apellido AS PacienteApellido,
-                    m.Nombre AS MedicoNombre, m.Especialidad AS MedicoEspecialidad
-                FROM Cita c
-                INNER JOIN Paciente p ON c.IdPaciente = p.Id
-                INNER JOIN Medico m ON c.IdMedico = m.Id
-                ORDER BY c.FechaHora
+                INSERT INTO Cita (IdPaciente, IdMedico, FechaHora, Motivo)
+                VALUES (?, ?, ?, ?)
+            """
+            cursor.executemany(query, [
+                (cita.id_paciente, cita.id_medico, cita.fecha_hora, cita.motivo)
+                for cita in citas
+            ])
+            db.commit()
+            eventos.notificar('cita', 'crear')
+            return len(citas)
+        except Exception as e:
+            db.rollback()
+            print(f"Error al crear lote de citas: {e}")
+            raise e
+    
+    @staticmethod
+    def _verificar_horario(cita):
+        """
+        Bloquea la agenda del médico en la transacción actual y comprueba que la hora esté libre
+
+        Raises:
+            HorarioOcupado: Si otra cita del médico se solapa con la de la cita
+        """
+        conflicto = Cita.buscar_conflicto(cita.id_medico, cita.fecha_hora, cita.id, bloquear=True)
+        if conflicto:
+            raise HorarioOcupado(conflicto)
+    
+    @staticmethod
+    def _verificar_integridad(cita):
+        """
+        Traduce una violación de integridad al alta o modificación de una cita
+
+        Raises:
+            ReferenciaInvalida: Si no existe el paciente o el médico de la cita
+            HorarioOcupado: Si el índice único rechazó otra cita del médico a la misma hora
+        """
+        Cita._verificar_referencias(cita)
+        conflicto = Cita.buscar_conflicto(cita.id_medico, cita.fecha_hora, cita.id)
+        if conflicto:
+            raise HorarioOcupado(conflicto)
+    
+    @staticmethod
+    def _verificar_referencias(cita):
+        """
+        Identifica qué clave foránea falló tras una violación de integridad
+
+        Solo se ejecuta en el camino de error, así que las altas correctas no pagan
+        consultas previas de existencia.
+
+        Raises:
+            ReferenciaInvalida: Si no existe el paciente o el médico de la cita
+        """
+        db = DatabaseConnection()
+        cursor = db.get_cursor()
+        cursor.execute(
             """
-            cursor.execute(query)
-            citas = []
-            for row in cursor.fetchall():
-                cita = Cita(
-                    id=row.Id,
-                    id_paciente=row.IdPaciente,
-                    id_medico=row.IdMedico,
-                    fecha_hora=row.FechaHora,
-                    motivo=row.Motivo
-                )
-                # Crear objetos relacionados con datos parciales
-                cita.paciente = Paciente(
-                    id=row.IdPaciente,
-                    nombre=row.PacienteNombre,
-                    apellido=row.PacienteApellido
-                )
-                cita.medico = Medico(
-                    id=row.IdMedico,
-                    nombre=row.MedicoNombre,
-                    especialidad=row.MedicoEspecialidad
-                )
-                citas.append(cita)
-            return citas
+            SELECT
+                (SELECT COUNT(*) FROM Paciente WHERE Id = ?) AS Pacientes,
+                (SELECT COUNT(*) FROM Medico WHERE Id = ?) AS Medicos
+            """,
+            (cita.id_paciente, cita.id_medico)
+        )
+        row = cursor.fetchone()
+        if not row.Pacientes:
+            raise ReferenciaInvalida(f"No existe un paciente con ID {cita.id_paciente}")
+        if not row.Medicos:
+            raise ReferenciaInvalida(f"No existe un médico con ID {cita.id_medico}")
+    
+    @staticmethod
+    def _consultar(query, parametros=()):
+        """Ejecuta una consulta de citas y convierte todas las filas con el mapeador compartido"""
+        db = DatabaseConnection()
+        cursor = db.get_cursor()
+        cursor.execute(query, parametros)
+        return MapeadorCita(cursor.description).citas(cursor.fetchall())
+    
+    @staticmethod
+    def obtener_todas():
+        """Obtiene todas las citas con datos de pacientes y médicos"""
+        try:
+            return Cita._consultar(CONSULTA_CITAS + " ORDER BY c.FechaHora")
         except Exception as e:
             print(f"Error al obtener citas: {e}")
             raise e
     
+    @staticmethod
+    def obtener_pagina(limite, despues=None, con_version=False):
+        """
+        Obtiene una página de citas ordenadas por (FechaHora, Id) usando paginación por clave
+
+        Args:
+            limite (int): Número máximo de filas a devolver
+            despues (tuple, opcional): (fecha_hora, id) de la última cita de la página anterior
+            con_version (bool): Lee también la versión de la cita, su paciente y su médico
+        """
+        db = DatabaseConnection()
+        try:
+            filtro = ""
+            parametros = []
+            if despues:
+                # La condición inicial sobre FechaHora permite buscar en el índice
+                filtro = "WHERE c.FechaHora >= ? AND (c.FechaHora > ? OR c.Id > ?)"
+                parametros = [despues[0], despues[0], despues[1]]
+            query = f"""{CONSULTA_CITAS_VERSIONES if con_version else CONSULTA_CITAS}
+                {filtro}
+                ORDER BY c.FechaHora, c.Id
+                {db.backend.sql_limite}
+            """
+            parametros.append(limite)
+            return Cita._consultar(query, parametros)
+        except Exception as e:
+            print(f"Error al obtener página de citas: {e}")
+            raise e
+    
+    @staticmethod
+    def buscar_conflicto(id_medico, fecha_hora, excluir_id=None, bloquear=False):
+        """
+        Busca una cita del médico que se solape con la hora indicada
+
+        La condición es un rango sobre (IdMedico, FechaHora), así que se resuelve
+        con una búsqueda en el índice sin importar cuántas citas tenga el médico.
+
+        Args:
+            id_medico (int): ID del médico
+            fecha_hora (datetime): Hora de inicio de la cita propuesta
+            excluir_id (int, opcional): Cita que se está modificando
+            bloquear (bool): Abre la transacción de escritura y mantiene bloqueado
+                el rango leído hasta el commit o el rollback del llamador
+
+        Returns:
+            Cita or None: La primera cita en conflicto (solo Id, IdMedico y FechaHora)
+        """
+        db = DatabaseConnection()
+        try:
+            duracion = timedelta(minutes=DURACION_CITA_MINUTOS)
+            bloqueo = ""
+            if bloquear:
+                db.backend.iniciar_escritura(db.get_connection())
+                bloqueo = db.backend.sql_bloqueo
+            cursor = db.get_cursor()
+            query = f"""
+                SELECT Id, FechaHora FROM Cita{bloqueo}
+                WHERE IdMedico = ? AND FechaHora > ? AND FechaHora < ? AND Id <> ?
+                ORDER BY FechaHora
+                {db.backend.sql_limite}
+            """
+            cursor.execute(
+                query,
+                (id_medico, fecha_hora - duracion, fecha_hora + duracion, excluir_id or 0, 1)
+            )
+            row = cursor.fetchone()
+            if row:
+                return Cita(id=row.Id, id_medico=id_medico, fecha_hora=row.FechaHora)
+            return None
+        except Exception as e:
+            print(f"Error al buscar conflicto de cita: {e}")
+            raise e
+    
+    @staticmethod
+    def obtener_horarios(ids_medicos, desde, hasta):
+        """
+        Obtiene en una sola consulta las horas ocupadas de varios médicos
+
+        Args:
+            ids_medicos (iterable): IDs de los médicos
+            desde (datetime): Inicio del rango (inclusive)
+            hasta (datetime): Fin del rango (exclusivo)
+
+        Returns:
+            dict: id_medico -> lista ordenada de (fecha_hora, id_cita); incluye
+                una lista vacía para los médicos sin citas
+        """
+        ids_medicos = list(dict.fromkeys(ids_medicos))
+        horarios = {id_medico: [] for id_medico in ids_medicos}
+        if not ids_medicos:
+            return horarios
+        db = DatabaseConnection()
+        try:
+            cursor = db.get_cursor()
+            marcadores = ", ".join("?" * len(ids_medicos))
+            query = f"""
+                SELECT IdMedico, FechaHora, Id FROM Cita
+                WHERE IdMedico IN ({marcadores}) AND FechaHora >= ? AND FechaHora < ?
+                ORDER BY IdMedico, FechaHora
+            """
+            cursor.execute(query, (*ids_medicos, desde, hasta))
+            while True:
+                filas = cursor.fetchmany(Cita.TAMANO_LOTE)
+                if not filas:
+                    break
+                for fila in filas:
+                    horarios[fila[0]].append((fila[1], fila[2]))
+            return horarios
+        except Exception as e:
+            print(f"Error al obtener horarios de médicos: {e}")
+            raise e
+    
+    @staticmethod
+    def obtener_id_medico(id):
+        """Obtiene el médico de una cita por su clave primaria, o None si no existe"""
+        db = DatabaseConnection()
+        try:
+            cursor = db.get_cursor()
+            cursor.execute("SELECT IdMedico FROM Cita WHERE Id = ?", (id,))
+            row = cursor.fetchone()
+            return row[0] if row else None
+        except Exception as e:
+            print(f"Error al obtener médico de la cita: {e}")
+            raise e
+    
     @staticmethod
     def obtener_por_id(id):
         """Obtiene una cita por su ID con datos completos"""
         db = DatabaseConnection()
         try:
             cursor = db.get_cursor()
-            query = """
-                SELECT 
-                    c.Id, c.IdPaciente, c.IdMedico, c.FechaHora, c.Motivo,
-                    p.Nombre AS PacienteNombre, p.Apellido AS PacienteApellido,
-                    m.Nombre AS MedicoNombre, m.Especialidad AS MedicoEspecialidad
-                FROM Cita c
-                INNER JOIN Paciente p ON c.IdPaciente = p.Id
-                INNER JOIN Medico m ON c.IdMedico = m.Id
-                WHERE c.Id = ?
-            """
-            cursor.execute(query, (id,))
+            cursor.execute(CONSULTA_CITAS + " WHERE c.Id = ?", (id,))
             row = cursor.fetchone()
             if row:
-                cita = Cita(
-                    id=row.Id,
-                    id_paciente=row.IdPaciente,
-                    id_medico=row.IdMedico,
-                    fecha_hora=row.FechaHora,
-                    motivo=row.Motivo
-                )
-                # Crear objetos relacionados con datos parciales
-                cita.paciente = Paciente(
-                    id=row.IdPaciente,
-                    nombre=row.PacienteNombre,
-                    apellido=row.PacienteApellido
-                )
-                cita.medico = Medico(
-                    id=row.IdMedico,
-                    nombre=row.MedicoNombre,
-                    especialidad=row.MedicoEspecialidad
-                )
-                return cita
+                return MapeadorCita(cursor.description).cita(row)
             return None
         except Exception as e:
             print(f"Error al obtener cita por ID: {e}")
             raise e
     
     @staticmethod
-    def obtener_por_paciente(id_paciente):
-        """Obtiene todas las citas de un paciente específico"""
+    def obtener_version(id):
+        """
+        Obtiene solo las versiones de fila de una cita, su paciente y su médico
+        
+        Returns:
+            tuple or None: (versión de la cita, del paciente, del médico), o None si no existe
+        """
         db = DatabaseConnection()
         try:
             cursor = db.get_cursor()
-            query = """
-                SELECT 
-                    c.Id, c.IdPaciente, c.IdMedico, c.FechaHora, c.Motivo,
-                    p.Nombre AS PacienteNombre, p.Apellido AS PacienteApellido,
-                    m.Nombre AS MedicoNombre, m.Especialidad AS MedicoEspecialidad
-                FROM Cita c
-                INNER JOIN Paciente p ON c.IdPaciente = p.Id
-                INNER JOIN Medico m ON c.IdMedico = m.Id
-                WHERE c.IdPaciente = ?
-                ORDER BY c.FechaHora
-            """
-            cursor.execute(query, (id_paciente,))
-            citas = []
-            for row in cursor.fetchall():
-                cita = Cita(
-                    id=row.Id,
-                    id_paciente=row.IdPaciente,
-                    id_medico=row.IdMedico,
-                    fecha_hora=row.FechaHora,
-                    motivo=row.Motivo
-                )
-                # Crear objetos relacionados con datos parciales
-                cita.paciente = Paciente(
-                    id=row.IdPaciente,
-                    nombre=row.PacienteNombre,
-                    apellido=row.PacienteApellido
-                )
-                cita.medico = Medico(
-                    id=row.IdMedico,
-                    nombre=row.MedicoNombre,
-                    especialidad=row.MedicoEspecialidad
-                )
-                citas.append(cita)
-            return citas
+            cursor.execute(CONSULTA_VERSION_CITA, (id,))
+            row = cursor.fetchone()
+            return tuple(row) if row else None
+        except Exception as e:
+            print(f"Error al obtener versión de la cita: {e}")
+            raise e
+    
+    @staticmethod
+    def obtener_por_paciente(id_paciente):
+        """Obtiene todas las citas de un paciente específico"""
+        try:
+            return Cita._consultar(
+                CONSULTA_CITAS + " WHERE c.IdPaciente = ? ORDER BY c.FechaHora",
+                (id_paciente,)
+            )
         except Exception as e:
             print(f"Error al obtener citas por paciente: {e}")
             raise e
@@ -176,43 +377,11 @@ class Cita:
     @staticmethod
     def obtener_por_medico(id_medico):
         """Obtiene todas las citas de un médico específico"""
-        db = DatabaseConnection()
         try:
-            cursor = db.get_cursor()
-            query = """
-                SELECT 
-                    c.Id, c.IdPaciente, c.IdMedico, c.FechaHora, c.Motivo,
-                    p.Nombre AS PacienteNombre, p.Apellido AS PacienteApellido,
-                    m.Nombre AS MedicoNombre, m.Especialidad AS MedicoEspecialidad
-                FROM Cita c
-                INNER JOIN Paciente p ON c.IdPaciente = p.Id
-                INNER JOIN Medico m ON c.IdMedico = m.Id
-                WHERE c.IdMedico = ?
-                ORDER BY c.FechaHora
-            """
-            cursor.execute(query, (id_medico,))
-            citas = []
-            for row in cursor.fetchall():
-                cita = Cita(
-                    id=row.Id,
-                    id_paciente=row.IdPaciente,
-                    id_medico=row.IdMedico,
-                    fecha_hora=row.FechaHora,
-                    motivo=row.Motivo
-                )
-                # Crear objetos relacionados con datos parciales
-                cita.paciente = Paciente(
-                    id=row.IdPaciente,
-                    nombre=row.PacienteNombre,
-                    apellido=row.PacienteApellido
-                )
-                cita.medico = Medico(
-                    id=row.IdMedico,
-                    nombre=row.MedicoNombre,
-                    especialidad=row.MedicoEspecialidad
-                )
-                citas.append(cita)
-            return citas
+            return Cita._consultar(
+                CONSULTA_CITAS + " WHERE c.IdMedico = ? ORDER BY c.FechaHora",
+                (id_medico,)
+            )
         except Exception as e:
             print(f"Error al obtener citas por médico: {e}")
             raise e
@@ -220,52 +389,151 @@ class Cita:
     @staticmethod
     def obtener_por_fecha(fecha_inicio, fecha_fin):
         """Obtiene citas en un rango de fechas"""
-        db = DatabaseConnection()
         try:
-            cursor = db.get_cursor()
-            query = """
-                SELECT 
-                    c.Id, c.IdPaciente, c.IdMedico, c.FechaHora, c.Motivo,
-                    p.Nombre AS PacienteNombre, p.Apellido AS PacienteApellido,
-                    m.Nombre AS MedicoNombre, m.Especialidad AS MedicoEspecialidad
-                FROM Cita c
-                INNER JOIN Paciente p ON c.IdPaciente = p.Id
-                INNER JOIN Medico m ON c.IdMedico = m.Id
-                WHERE c.FechaHora BETWEEN ? AND ?
-                ORDER BY c.FechaHora
-            """
-            cursor.execute(query, (fecha_inicio, fecha_fin))
-            citas = []
-            for row in cursor.fetchall():
-                cita = Cita(
-                    id=row.Id,
-                    id_paciente=row.IdPaciente,
-                    id_medico=row.IdMedico,
-                    fecha_hora=row.FechaHora,
-                    motivo=row.Motivo
-                )
-                # Crear objetos relacionados con datos parciales
-                cita.paciente = Paciente(
-                    id=row.IdPaciente,
-                    nombre=row.PacienteNombre,
-                    apellido=row.PacienteApellido
-                )
-                cita.medico = Medico(
-                    id=row.IdMedico,
-                    nombre=row.MedicoNombre,
-                    especialidad=row.MedicoEspecialidad
-                )
-                citas.append(cita)
-            return citas
+            return Cita._consultar(
+                CONSULTA_CITAS + " WHERE c.FechaHora BETWEEN ? AND ? ORDER BY c.FechaHora",
+                (fecha_inicio, fecha_fin)
+            )
         except Exception as e:
             print(f"Error al obtener citas por fecha: {e}")
             raise e
     
+    @staticmethod
+    def _iterar(query, parametros, tamano_lote=None):
+        """Genera las citas de una consulta leyendo las filas por lotes con fetchmany"""
+        db = DatabaseConnection()
+        cursor = db.get_cursor()
+        try:
+            cursor.execute(query, parametros)
+            mapeador = MapeadorCita(cursor.description)
+            tamano_lote = tamano_lote or Cita.TAMANO_LOTE
+            while True:
+                filas = cursor.fetchmany(tamano_lote)
+                if not filas:
+                    break
+                yield from mapeador.citas(filas)
+        except Exception as e:
+            print(f"Error al iterar citas: {e}")
+            raise e
+        finally:
+            cursor.close()
+    
+    @staticmethod
+    async def obtener_por_id_async(id):
+        """Obtiene una cita por su ID con el driver asíncrono (modo ASGI)"""
+        try:
+            descripcion, filas = await AsyncDatabaseConnection().consultar(CONSULTA_CITAS + " WHERE c.Id = ?", (id,))
+            if filas:
+                return MapeadorCita(descripcion).cita(filas[0])
+            return None
+        except Exception as e:
+            print(f"Error al obtener cita por ID: {e}")
+            raise e
+    
+    @staticmethod
+    async def obtener_version_async(id):
+        """Obtiene las versiones de fila de una cita, su paciente y su médico con el driver asíncrono"""
+        try:
+            _, filas = await AsyncDatabaseConnection().consultar(CONSULTA_VERSION_CITA, (id,))
+            return tuple(filas[0]) if filas else None
+        except Exception as e:
+            print(f"Error al obtener versión de la cita: {e}")
+            raise e
+    
+    @staticmethod
+    async def iterar_por_fecha_async(fecha_inicio, fecha_fin, tamano_lote=None):
+        """
+        Genera las citas de un rango de fechas por lotes con el driver asíncrono
+        
+        La conversión de cada lote a objetos se hace en un hilo aparte para no
+        detener el bucle de eventos mientras dura.
+        
+        Yields:
+            list: Citas de cada lote, ordenadas por fecha
+        """
+        mapeador = None
+        try:
+            # aclosing libera la conexión en cuanto se cierra este generador,
+            # sin esperar a que el recolector finalice el interno
+            async with contextlib.aclosing(AsyncDatabaseConnection().iterar(
+                CONSULTA_CITAS + " WHERE c.FechaHora BETWEEN ? AND ? ORDER BY c.FechaHora",
+                (fecha_inicio, fecha_fin),
+                tamano_lote or Cita.TAMANO_LOTE
+            )) as lotes:
+                async for descripcion, filas in lotes:
+                    if mapeador is None:
+                        mapeador = MapeadorCita(descripcion)
+                    yield await asyncio.to_thread(mapeador.citas, filas)
+        except Exception as e:
+            print(f"Error al iterar citas: {e}")
+            raise e
+    
+    @staticmethod
+    def iterar_todas(tamano_lote=None):
+        """Genera todas las citas sin cargarlas completas en memoria"""
+        return Cita._iterar(CONSULTA_CITAS + " ORDER BY c.FechaHora", (), tamano_lote)
+    
+    @staticmethod
+    def iterar_por_paciente(id_paciente, tamano_lote=None):
+        """Genera las citas de un paciente sin cargarlas completas en memoria"""
+        return Cita._iterar(
+            CONSULTA_CITAS + " WHERE c.IdPaciente = ? ORDER BY c.FechaHora",
+            (id_paciente,), tamano_lote
+        )
+    
+    @staticmethod
+    def iterar_por_medico(id_medico, tamano_lote=None):
+        """Genera las citas de un médico sin cargarlas completas en memoria"""
+        return Cita._iterar(
+            CONSULTA_CITAS + " WHERE c.IdMedico = ? ORDER BY c.FechaHora",
+            (id_medico,), tamano_lote
+        )
+    
+    @staticmethod
+    def iterar_por_fecha(fecha_inicio, fecha_fin, tamano_lote=None):
+        """Genera las citas de un rango de fechas sin cargarlas completas en memoria"""
+        return Cita._iterar(
+            CONSULTA_CITAS + " WHERE c.FechaHora BETWEEN ? AND ? ORDER BY c.FechaHora",
+            (fecha_inicio, fecha_fin), tamano_lote
+        )
+    
+    @staticmethod
+    def iterar_filtradas(fecha_inicio=None, fecha_fin=None, id_medico=None, id_paciente=None, tamano_lote=None):
+        """
+        Genera las citas que cumplen los filtros indicados sin cargarlas completas en memoria
+
+        Args:
+            fecha_inicio (datetime, opcional): Límite inferior de FechaHora (inclusive)
+            fecha_fin (datetime, opcional): Límite superior de FechaHora (inclusive)
+            id_medico (int, opcional): Solo las citas de este médico
+            id_paciente (int, opcional): Solo las citas de este paciente
+        """
+        condiciones = []
+        parametros = []
+        if fecha_inicio is not None:
+            condiciones.append("c.FechaHora >= ?")
+            parametros.append(fecha_inicio)
+        if fecha_fin is not None:
+            condiciones.append("c.FechaHora <= ?")
+            parametros.append(fecha_fin)
+        if id_medico is not None:
+            condiciones.append("c.IdMedico = ?")
+            parametros.append(id_medico)
+        if id_paciente is not None:
+            condiciones.append("c.IdPaciente = ?")
+            parametros.append(id_paciente)
+        query = CONSULTA_CITAS
+        if condiciones:
+            query += " WHERE " + " AND ".join(condiciones)
+        return Cita._iterar(query + " ORDER BY c.FechaHora, c.Id", tuple(parametros), tamano_lote)
+    
     @staticmethod
     def actualizar(cita):
         """Actualiza los datos de una cita existente"""
         db = DatabaseConnection()
         try:
+            # Misma transacción bloqueada que en crear(), sin contar la propia cita
+            Cita._verificar_horario(cita)
             cursor = db.get_cursor()
             query = """
                 UPDATE Cita 
@@ -276,8 +544,21 @@ class Cita:
                 query, 
                 (cita.id_paciente, cita.id_medico, cita.fecha_hora, cita.motivo, cita.id)
             )
+            # Ninguna fila afectada: la cita no existe
+            if cursor.rowcount == 0:
+                db.rollback()
+                return False
             db.commit()
+            eventos.notificar('cita', 'actualizar', cita.id)
             return True
+        except HorarioOcupado:
+            db.rollback()
+            raise
+        except db.backend.errores_integridad as e:
+            db.rollback()
+            Cita._verificar_integridad(cita)
+            print(f"Error al actualizar cita: {e}")
+            raise e
         except Exception as e:
             db.rollback()
             print(f"Error al actualizar cita: {e}")
@@ -292,6 +573,7 @@ class Cita:
             query = "DELETE FROM Cita WHERE Id = ?"
             cursor.execute(query, (id,))
             db.commit()
+            eventos.notificar('cita', 'eliminar', id)
             return True, "Cita eliminada correctamente."
         except Exception as e:
             db.rollback()
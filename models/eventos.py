@@ -0,0 +1,72 @@
+# Notificación de cambios en los datos para las cachés e índices en memoria
+import threading
+
+_suscriptores = []
+
+# Entidades con versión de datos
+ENTIDADES = ('paciente', 'medico', 'cita')
+_INDICES = {entidad: i for i, entidad in enumerate(ENTIDADES)}
+
+
+def _crear_versiones():
+    """
+    Contadores de versión de cada entidad
+
+    Se crean al importar el módulo en memoria compartida: con gunicorn
+    (preload_app) el proceso maestro los crea antes de arrancar los workers y
+    todos ven los cambios de los demás. Si el sistema no permite memoria
+    compartida, cada proceso lleva sus propios contadores.
+
+    Returns:
+        tuple: (valores indexables, lock para incrementarlos)
+    """
+    try:
+        import multiprocessing
+        compartidas = multiprocessing.Array('q', len(ENTIDADES))
+        # Las lecturas van al array sin lock; solo los incrementos lo toman
+        return compartidas.get_obj(), compartidas.get_lock()
+    except Exception as e:
+        print(f"Versiones de datos solo en este proceso: {e}")
+        return [0] * len(ENTIDADES), threading.Lock()
+
+
+_versiones, _lock_versiones = _crear_versiones()
+
+
+def suscribir(funcion):
+    """
+    Registra una función que se llamará tras cada cambio confirmado
+
+    Args:
+        funcion (callable): Recibe (entidad, accion, id); entidad es 'paciente',
+            'medico' o 'cita' y accion es 'crear', 'actualizar' o 'eliminar'
+    """
+    if funcion not in _suscriptores:
+        _suscriptores.append(funcion)
+    return funcion
+
+
+def version(*entidades):
+    """
+    Versión actual de los datos de cada entidad indicada
+
+    Aumenta con cada cambio confirmado (crear, actualizar o eliminar), así que
+    un valor guardado junto con la versión sigue vigente mientras esta no cambie.
+
+    Returns:
+        tuple: Un número por entidad, en el mismo orden
+    """
+    return tuple(_versiones[_INDICES[entidad]] for entidad in entidades)
+
+
+def notificar(entidad, accion, id=None):
+    """Avisa a los suscriptores de un cambio ya confirmado en la base de datos"""
+    indice = _INDICES.get(entidad)
+    if indice is not None:
+        with _lock_versiones:
+            _versiones[indice] += 1
+    for funcion in _suscriptores:
+        try:
+            funcion(entidad, accion, id)
+        except Exception as e:
+            print(f"Error al notificar cambio de {entidad}: {e}")
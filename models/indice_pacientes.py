@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+from models import eventos
+from models.paciente import Paciente
+from models.texto import terminos as dividir_terminos
+
+# Origen de la búsqueda de pacientes: 'auto' usa el índice de texto del motor y,
+# si no está disponible, este índice en memoria; 'bd' y 'memoria' fuerzan uno de los dos
+MODO = os.getenv('BUSQUEDA_PACIENTES', 'auto').lower()
+
+
+class IndicePacientes:
+    """
+    Índice invertido en memoria sobre nombre, apellido y email de los pacientes
+
+    Se usa cuando el motor no tiene búsqueda de texto completo (por ejemplo, SQL
+    Server sin el componente Full-Text Search). Cada palabra normalizada apunta al
+    conjunto de pacientes que la contienen; las palabras y las cédulas se guardan
+    además en listas ordenadas para resolver prefijos con búsqueda binaria.
+    """
+
+    def __init__(self, ttl=300):
+        """
+        Inicializa el índice vacío; se carga completo en la primera búsqueda
+
+        Args:
+            ttl (float): Segundos tras los que se recarga completo; acota el desfase
+                con los cambios hechos por otros procesos
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._pacientes = {}
+        self._terminos_de = {}
+        self._ids_por_termino = {}
+        self._terminos = []
+        self._cedulas = []
+        self._expira = 0.0
+
+    @property
+    def cargado(self):
+        """Indica si el índice está cargado y vigente"""
+        return self._expira > time.monotonic()
+
+    def buscar(self, texto, limite, desplazamiento=0):
+        """
+        Busca pacientes cuyas palabras empiezan por cada término del texto
+
+        Cada término suma 2 puntos si coincide con una palabra completa y 1 si solo
+        es prefijo; los términos numéricos también coinciden con el inicio de la
+        cédula. Los resultados se ordenan por puntuación, apellido, nombre e ID.
+
+        Returns:
+            list: Pacientes de la página pedida
+        """
+        consulta = dividir_terminos(texto)
+        if not consulta:
+            return []
+        with self._lock:
+            if not self.cargado:
+                self._cargar()
+            puntos = None
+            for termino in consulta:
+                coincidencias = self._coincidencias(termino)
+                if puntos is None:
+                    puntos = coincidencias
+                else:
+                    puntos = {id: puntos[id] + valor for id, valor in coincidencias.items() if id in puntos}
+                if not puntos:
+                    return []
+            encontrados = [self._pacientes[id] for id in puntos]
+        encontrados.sort(key=lambda p: (-puntos[p.id], p.apellido or '', p.nombre or '', p.id))
+        return encontrados[desplazamiento:desplazamiento + limite]
+
+    def _coincidencias(self, termino):
+        """Puntos de cada paciente para un término: 2 palabra completa, 1 prefijo"""
+        puntos = {}
+        posicion = bisect_left(self._terminos, termino)
+        while posicion < len(self._terminos) and self._terminos[posicion].startswith(termino):
+            palabra = self._terminos[posicion]
+            valor = 2 if palabra == termino else 1
+            for id in self._ids_por_termino[palabra]:
+                if puntos.get(id, 0) < valor:
+                    puntos[id] = valor
+            posicion += 1
+        if termino.isdigit():
+            posicion = bisect_left(self._cedulas, (termino,))
+            while posicion < len(self._cedulas) and self._cedulas[posicion][0].startswith(termino):
+                cedula, id = self._cedulas[posicion]
+                puntos[id] = max(puntos.get(id, 0), 2 if cedula == termino else 1)
+                posicion += 1
+        return puntos
+
+    def _cargar(self):
+        """Reconstruye el índice con todos los pacientes (se llama con el lock tomado)"""
+        self._pacientes.clear()
+        self._terminos_de.clear()
+        self._ids_por_termino.clear()
+        for paciente in Paciente._obtener_todos_bd():
+            self._pacientes[paciente.id] = paciente
+            palabras = self._palabras(paciente)
+            self._terminos_de[paciente.id] = palabras
+            for palabra in palabras:
+                self._ids_por_termino.setdefault(palabra, set()).add(paciente.id)
+        self._terminos = sorted(self._ids_por_termino)
+        self._cedulas = sorted((p.cedula, p.id) for p in self._pacientes.values() if p.cedula)
+        self._expira = time.monotonic() + self.ttl
+
+    @staticmethod
+    def _palabras(paciente):
+        return frozenset(dividir_terminos(f"{paciente.nombre} {paciente.apellido} {paciente.email or ''}"))
+
+    def _agregar(self, paciente):
+        """Indexa un paciente nuevo o reindexa uno modificado"""
+        self._quitar(paciente.id)
+        self._pacientes[paciente.id] = paciente
+        palabras = self._palabras(paciente)
+        self._terminos_de[paciente.id] = palabras
+        for palabra in palabras:
+            ids = self._ids_por_termino.get(palabra)
+            if ids is None:
+                ids = self._ids_por_termino[palabra] = set()
+                insort(self._terminos, palabra)
+            ids.add(paciente.id)
+        if paciente.cedula:
+            insort(self._cedulas, (paciente.cedula, paciente.id))
+
+    def _quitar(self, id):
+        """Elimina un paciente del índice, si estaba"""
+        paciente = self._pacientes.pop(id, None)
+        if paciente is None:
+            return
+        for palabra in self._terminos_de.pop(id, ()):
+            ids = self._ids_por_termino[palabra]
+            ids.discard(id)
+            if not ids:
+                del self._ids_por_termino[palabra]
+                del self._terminos[bisect_left(self._terminos, palabra)]
+        if paciente.cedula:
+            posicion = bisect_left(self._cedulas, (paciente.cedula, id))
+            if posicion < len(self._cedulas) and self._cedulas[posicion] == (paciente.cedula, id):
+                del self._cedulas[posicion]
+
+    def limpiar(self):
+        """Descarta el índice; se reconstruye en la próxima búsqueda"""
+        with self._lock:
+            self._expira = 0.0
+
+    def al_cambiar(self, entidad, accion, id):
+        """Actualiza solo el paciente afectado por los cambios confirmados en este proceso"""
+        if entidad != 'paciente' or not self.cargado:
+            return
+        if id is None:
+            # Cambios masivos: se reconstruye completo en la próxima búsqueda
+            self.limpiar()
+            return
+        paciente = Paciente._obtener_por_id_bd(id) if accion != 'eliminar' else None
+        with self._lock:
+            if paciente is None:
+                self._quitar(id)
+            else:
+                self._agregar(paciente)
+
+
+indice = IndicePacientes(ttl=float(os.getenv('BUSQUEDA_INDICE_TTL', '300')))
+eventos.suscribir(indice.al_cambiar)
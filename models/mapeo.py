@@ -0,0 +1,87 @@
+def indices_columnas(descripcion, columnas):
+    """
+    Resuelve la posición de cada columna a partir de cursor.description
+
+    Args:
+        descripcion (tuple): cursor.description de la consulta ejecutada
+        columnas (tuple): Nombres de columna en el orden deseado
+
+    Returns:
+        tuple: Índice de cada columna dentro de la fila
+    """
+    posiciones = {columna[0]: indice for indice, columna in enumerate(descripcion)}
+    try:
+        return tuple(posiciones[columna] for columna in columnas)
+    except KeyError as e:
+        raise Exception(f"La consulta no devuelve la columna {e}")
+
+
+class MapeadorCita:
+    """Construye objetos Cita, con Paciente y Medico parciales, a partir de filas de la consulta de citas"""
+
+    COLUMNAS = (
+        'Id', 'IdPaciente', 'IdMedico', 'FechaHora', 'Motivo',
+        'PacienteNombre', 'PacienteApellido', 'MedicoNombre', 'MedicoEspecialidad'
+    )
+
+    # Columnas opcionales de CONSULTA_CITAS_VERSIONES
+    COLUMNAS_VERSION = ('Version', 'PacienteVersion', 'MedicoVersion')
+
+    def __init__(self, descripcion):
+        """Calcula una sola vez por consulta la posición de cada columna"""
+        self.indices = indices_columnas(descripcion, self.COLUMNAS)
+        self.indices_version = None
+        if any(columna[0] == 'Version' for columna in descripcion):
+            self.indices_version = indices_columnas(descripcion, self.COLUMNAS_VERSION)
+
+    def cita(self, fila):
+        """Convierte una sola fila"""
+        return self.citas((fila,))[0]
+
+    def citas(self, filas):
+        """
+        Convierte un conjunto de filas accediendo a cada campo por posición
+
+        El mapa de identidad dura lo que la llamada, así que al iterar por lotes
+        la memoria sigue acotada por el tamaño del lote.
+
+        Returns:
+            list: Objetos Cita en el mismo orden que las filas
+        """
+        # Importación diferida: models.cita depende de este módulo
+        from models.cita import Cita
+        from models.paciente import Paciente
+        from models.medico import Medico
+
+        (i_id, i_paciente, i_medico, i_fecha, i_motivo,
+         i_paciente_nombre, i_paciente_apellido,
+         i_medico_nombre, i_medico_especialidad) = self.indices
+        # Mapa de identidad: un paciente o médico que aparece en varias citas del
+        # lote se representa con un único objeto compartido (de solo lectura)
+        pacientes = {}
+        medicos = {}
+        resultado = []
+        agregar = resultado.append
+        versiones = self.indices_version
+        for fila in filas:
+            id_paciente = fila[i_paciente]
+            id_medico = fila[i_medico]
+            cita = Cita(fila[i_id], id_paciente, id_medico, fila[i_fecha], fila[i_motivo])
+            paciente = pacientes.get(id_paciente)
+            if paciente is None:
+                paciente = pacientes[id_paciente] = Paciente(
+                    id_paciente, fila[i_paciente_nombre], fila[i_paciente_apellido]
+                )
+            medico = medicos.get(id_medico)
+            if medico is None:
+                medico = medicos[id_medico] = Medico(
+                    id_medico, fila[i_medico_nombre], fila[i_medico_especialidad]
+                )
+            if versiones is not None:
+                cita.version = fila[versiones[0]]
+                paciente.version = fila[versiones[1]]
+                medico.version = fila[versiones[2]]
+            cita.paciente = paciente
+            cita.medico = medico
+            agregar(cita)
+        return resultado
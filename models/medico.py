@@ -1,13 +1,21 @@
 from config.database import DatabaseConnection
+from config.async_database import AsyncDatabaseConnection
+from models import cache_entidades, eventos
+from models.texto import normalizar, clasificar
 
 class Medico:
     """Modelo para la tabla Medico"""
     
-    def __init__(self, id=None, nombre=None, especialidad=None, email=None):
+    # Sin __dict__ por instancia: los listados grandes crean muchos objetos
+    __slots__ = ('id', 'nombre', 'especialidad', 'email', 'version')
+    
+    def __init__(self, id=None, nombre=None, especialidad=None, email=None, version=None):
         self.id = id
         self.nombre = nombre
         self.especialidad = especialidad
         self.email = email
+        # Versión de fila; solo se lee en las consultas que la piden
+        self.version = version
     
     @staticmethod
     def crear(medico):
@@ -15,23 +23,61 @@ class Medico:
         db = DatabaseConnection()
         try:
             cursor = db.get_cursor()
-            query = """
-                INSERT INTO Medico (Nombre, Especialidad, Email)
-                VALUES (?, ?, ?);
-                SELECT SCOPE_IDENTITY() AS Id;
-            """
+            # El INSERT devuelve el ID generado en la misma sentencia
+            query = db.backend.sql_insertar('Medico', ['Nombre', 'Especialidad', 'Email'])
             cursor.execute(query, (medico.nombre, medico.especialidad, medico.email))
-            row = cursor.fetchone()
-            medico.id = row.Id
+            medico.id = int(cursor.fetchone()[0])
             db.commit()
+            eventos.notificar('medico', 'crear', medico.id)
             return medico
         except Exception as e:
             db.rollback()
             print(f"Error al crear médico: {e}")
             raise e
     
+    @staticmethod
+    def crear_lote(medicos):
+        """
+        Inserta varios médicos con un solo executemany y una sola confirmación
+
+        Returns:
+            int: Número de médicos insertados
+        """
+        db = DatabaseConnection()
+        try:
+            cursor = db.get_cursor()
+            db.backend.preparar_lote(cursor)
+            query = "INSERT INTO Medico (Nombre, Especialidad, Email) VALUES (?, ?, ?)"
+            cursor.executemany(query, [
+                (medico.nombre, medico.especialidad, medico.email) for medico in medicos
+            ])
+            db.commit()
+            eventos.notificar('medico', 'crear')
+            return len(medicos)
+        except Exception as e:
+            db.rollback()
+            print(f"Error al crear lote de médicos: {e}")
+            raise e
+    
+    @staticmethod
+    def obtener_ids():
+        """Obtiene en una sola consulta el conjunto de IDs de médicos"""
+        db = DatabaseConnection()
+        try:
+            cursor = db.get_cursor()
+            cursor.execute("SELECT Id FROM Medico")
+            return {row[0] for row in cursor.fetchall()}
+        except Exception as e:
+            print(f"Error al obtener IDs de médicos: {e}")
+            raise e
+    
     @staticmethod
     def obtener_todos():
+        """Obtiene todos los médicos de la base de datos (lectura a través de la caché)"""
+        return cache_entidades.obtener_lista(('medico', 'todos'), Medico._obtener_todos_bd)
+    
+    @staticmethod
+    def _obtener_todos_bd():
         """Obtiene todos los médicos de la base de datos"""
         db = DatabaseConnection()
         try:
@@ -53,8 +99,77 @@ class Medico:
             raise e
     
     @staticmethod
-    def obtener_por_id(id):
-        """Obtiene un médico por su ID"""
+    def obtener_pagina(limite, despues=None, con_version=False):
+        """
+        Obtiene una página de médicos ordenados por (Nombre, Id) usando paginación por clave
+
+        Args:
+            limite (int): Número máximo de filas a devolver
+            despues (tuple, opcional): (nombre, id) del último médico de la página anterior
+            con_version (bool): Lee también la versión de cada fila
+        """
+        db = DatabaseConnection()
+        try:
+            cursor = db.get_cursor()
+            filtro = ""
+            parametros = []
+            if despues:
+                # La condición inicial sobre Nombre permite buscar en el índice
+                filtro = "WHERE Nombre >= ? AND (Nombre > ? OR Id > ?)"
+                parametros = [despues[0], despues[0], despues[1]]
+            version = ", CAST(Version AS BIGINT) AS Version" if con_version else ""
+            query = f"""
+                SELECT Id, Nombre, Especialidad, Email{version}
+                FROM Medico
+                {filtro}
+                ORDER BY Nombre, Id
+                {db.backend.sql_limite}
+            """
+            parametros.append(limite)
+            cursor.execute(query, parametros)
+            medicos = []
+            for row in cursor.fetchall():
+                medico = Medico(
+                    id=row.Id,
+                    nombre=row.Nombre,
+                    especialidad=row.Especialidad,
+                    email=row.Email,
+                    version=row.Version if con_version else None
+                )
+                medicos.append(medico)
+            return medicos
+        except Exception as e:
+            print(f"Error al obtener página de médicos: {e}")
+            raise e
+    
+    @staticmethod
+    def obtener_por_id(id, usar_cache=True):
+        """Obtiene un médico por su ID (lectura a través de la caché salvo que se indique lo contrario)"""
+        if not usar_cache:
+            return Medico._obtener_por_id_bd(id)
+        return cache_entidades.obtener(('medico', id), lambda: Medico._obtener_por_id_bd(id))
+    
+    @staticmethod
+    def obtener_version(id):
+        """
+        Obtiene solo la versión de fila de un médico (búsqueda por clave primaria)
+        
+        Returns:
+            int or None: Versión actual, o None si el médico no existe
+        """
+        db = DatabaseConnection()
+        try:
+            cursor = db.get_cursor()
+            cursor.execute("SELECT CAST(Version AS BIGINT) FROM Medico WHERE Id = ?", (id,))
+            row = cursor.fetchone()
+            return row[0] if row else None
+        except Exception as e:
+            print(f"Error al obtener versión del médico: {e}")
+            raise e
+    
+    @staticmethod
+    def _obtener_por_id_bd(id):
+        """Obtiene un médico por su ID directamente de la base de datos"""
         db = DatabaseConnection()
         try:
             cursor = db.get_cursor()
@@ -73,14 +188,85 @@ class Medico:
             print(f"Error al obtener médico por ID: {e}")
             raise e
     
+    @staticmethod
+    async def obtener_por_id_async(id):
+        """Obtiene un médico por su ID con el driver asíncrono (modo ASGI, sin caché)"""
+        try:
+            _, filas = await AsyncDatabaseConnection().consultar(
+                "SELECT Id, Nombre, Especialidad, Email FROM Medico WHERE Id = ?", (id,)
+            )
+            if filas:
+                row = filas[0]
+                return Medico(
+                    id=row.Id,
+                    nombre=row.Nombre,
+                    especialidad=row.Especialidad,
+                    email=row.Email
+                )
+            return None
+        except Exception as e:
+            print(f"Error al obtener médico por ID: {e}")
+            raise e
+    
+    @staticmethod
+    async def obtener_version_async(id):
+        """Obtiene la versión de fila de un médico con el driver asíncrono"""
+        try:
+            _, filas = await AsyncDatabaseConnection().consultar(
+                "SELECT CAST(Version AS BIGINT) FROM Medico WHERE Id = ?", (id,)
+            )
+            return filas[0][0] if filas else None
+        except Exception as e:
+            print(f"Error al obtener versión del médico: {e}")
+            raise e
+    
+    @staticmethod
+    def obtener_especialidades():
+        """Catálogo de especialidades distintas como pares (nombre normalizado, nombre)"""
+        return cache_entidades.obtener_lista(('medico', 'especialidades'), Medico._obtener_especialidades_bd)
+    
+    @staticmethod
+    def _obtener_especialidades_bd():
+        """Lee las especialidades distintas recorriendo solo el índice de Especialidad"""
+        db = DatabaseConnection()
+        try:
+            cursor = db.get_cursor()
+            cursor.execute("SELECT DISTINCT Especialidad FROM Medico")
+            return [(normalizar(row[0]), row[0]) for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"Error al obtener especialidades: {e}")
+            raise e
+    
+    @staticmethod
+    def buscar_especialidades(texto, limite=None):
+        """
+        Especialidades que coinciden con el texto, sin distinguir mayúsculas ni acentos
+
+        Returns:
+            list: Nombres de especialidad ordenados por relevancia
+        """
+        especialidades = clasificar(texto, Medico.obtener_especialidades())
+        return especialidades[:limite] if limite else especialidades
+    
     @staticmethod
     def obtener_por_especialidad(especialidad):
-        """Obtiene médicos por especialidad"""
+        """
+        Obtiene médicos por especialidad
+
+        El texto se resuelve primero contra el catálogo en memoria ("cardiologia"
+        encuentra "Cardiología") y la consulta filtra con igualdad sobre el índice
+        de Especialidad en lugar de LIKE con comodín inicial. Los médicos de la
+        especialidad más relevante aparecen primero.
+        """
+        especialidades = Medico.buscar_especialidades(especialidad)
+        if not especialidades:
+            return []
         db = DatabaseConnection()
         try:
             cursor = db.get_cursor()
-            query = "SELECT Id, Nombre, Especialidad, Email FROM Medico WHERE Especialidad LIKE ?"
-            cursor.execute(query, (f"%{especialidad}%",))
+            marcadores = ", ".join("?" * len(especialidades))
+            query = f"SELECT Id, Nombre, Especialidad, Email FROM Medico WHERE Especialidad IN ({marcadores})"
+            cursor.execute(query, especialidades)
             medicos = []
             for row in cursor.fetchall():
                 medico = Medico(
@@ -90,6 +276,14 @@ class Medico:
                     email=row.Email
                 )
                 medicos.append(medico)
+            # Con una intercalación que no distingue mayúsculas ni acentos (SQL Server)
+            # el IN devuelve también variantes que no están en el catálogo leído
+            orden = {}
+            for posicion, nombre in enumerate(especialidades):
+                orden.setdefault(normalizar(nombre), posicion)
+            medicos.sort(key=lambda medico: (
+                orden.get(normalizar(medico.especialidad), len(orden)), medico.nombre
+            ))
             return medicos
         except Exception as e:
             print(f"Error al obtener médicos por especialidad: {e}")
@@ -108,6 +302,7 @@ class Medico:
             """
             cursor.execute(query, (medico.nombre, medico.especialidad, medico.email, medico.id))
             db.commit()
+            eventos.notificar('medico', 'actualizar', medico.id)
             return True
         except Exception as e:
             db.rollback()
@@ -131,6 +326,7 @@ class Medico:
             query = "DELETE FROM Medico WHERE Id = ?"
             cursor.execute(query, (id,))
             db.commit()
+            eventos.notificar('medico', 'eliminar', id)
             return True, "Médico eliminado correctamente."
         except Exception as e:
             db.rollback()
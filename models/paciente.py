@@ -1,15 +1,23 @@
 from config.database import DatabaseConnection
+from config.async_database import AsyncDatabaseConnection
+from models import cache_entidades, eventos
 
 class Paciente:
     """Modelo para la tabla Paciente"""
     
-    def __init__(self, id=None, nombre=None, apellido=None, cedula=None, fecha_nacimiento=None, email=None):
+    # Sin __dict__ por instancia: los listados grandes crean muchos objetos
+    __slots__ = ('id', 'nombre', 'apellido', 'cedula', 'fecha_nacimiento', 'email', 'version')
+    
+    def __init__(self, id=None, nombre=None, apellido=None, cedula=None, fecha_nacimiento=None, email=None,
+                 version=None):
         self.id = id
         self.nombre = nombre
         self.apellido = apellido
         self.cedula = cedula
         self.fecha_nacimiento = fecha_nacimiento
         self.email = email
+        # Versión de fila; solo se lee en las consultas que la piden
+        self.version = version
     
     @staticmethod
     def crear(paciente):
@@ -17,26 +25,21 @@ class Paciente:
         db = DatabaseConnection()
         try:
             cursor = db.get_cursor()
-            # Primero insertamos el paciente
-            query = """
-                INSERT INTO Paciente (Nombre, Apellido, Cedula, FechaNacimiento, Email)
-                VALUES (?, ?, ?, CONVERT(DATE, ?, 105), ?)
-            """
+            # El INSERT devuelve el ID generado en la misma sentencia
+            query = db.backend.sql_insertar(
+                'Paciente',
+                ['Nombre', 'Apellido', 'Cedula', 'FechaNacimiento', 'Email'],
+                ['?', '?', '?', db.backend.sql_fecha, '?']
+            )
             cursor.execute(
                 query, 
                 (paciente.nombre, paciente.apellido, paciente.cedula, 
-                 paciente.fecha_nacimiento.strftime('%d-%m-%Y'), paciente.email)
+                 db.backend.valor_fecha(paciente.fecha_nacimiento), paciente.email)
             )
-            
-            # Luego obtenemos el ID generado usando @@IDENTITY
-            cursor.execute("SELECT @@IDENTITY AS Id")
-            row = cursor.fetchone()
-            if row and row.Id:
-                paciente.id = int(row.Id)
-            else:
-                raise Exception("No se pudo obtener el ID del paciente creado")
+            paciente.id = int(cursor.fetchone()[0])
                 
             db.commit()
+            eventos.notificar('paciente', 'crear', paciente.id)
             return paciente
         except Exception as e:
             db.rollback()
@@ -45,6 +48,11 @@ class Paciente:
     
     @staticmethod
     def obtener_todos():
+        """Obtiene todos los pacientes de la base de datos (lectura a través de la caché)"""
+        return cache_entidades.obtener_lista(('paciente', 'todos'), Paciente._obtener_todos_bd)
+    
+    @staticmethod
+    def _obtener_todos_bd():
         """Obtiene todos los pacientes de la base de datos"""
         db = DatabaseConnection()
         try:
@@ -82,8 +90,168 @@ class Paciente:
             raise e
     
     @staticmethod
-    def obtener_por_id(id):
-        """Obtiene un paciente por su ID"""
+    def obtener_pagina(limite, despues=None, con_version=False):
+        """
+        Obtiene una página de pacientes ordenados por (Apellido, Nombre, Id) usando paginación por clave
+
+        Args:
+            limite (int): Número máximo de filas a devolver
+            despues (tuple, opcional): (apellido, nombre, id) del último paciente de la página anterior
+            con_version (bool): Lee también la versión de cada fila
+        """
+        db = DatabaseConnection()
+        try:
+            cursor = db.get_cursor()
+            filtro = ""
+            parametros = []
+            if despues:
+                apellido, nombre, id = despues
+                # La condición inicial sobre Apellido permite buscar en el índice
+                filtro = "WHERE Apellido >= ? AND (Apellido > ? OR Nombre > ? OR (Nombre = ? AND Id > ?))"
+                parametros = [apellido, apellido, nombre, nombre, id]
+            version = ", CAST(Version AS BIGINT) AS Version" if con_version else ""
+            query = f"""
+                SELECT Id, Nombre, Apellido, Cedula, FechaNacimiento, Email{version}
+                FROM Paciente
+                {filtro}
+                ORDER BY Apellido, Nombre, Id
+                {db.backend.sql_limite}
+            """
+            parametros.append(limite)
+            cursor.execute(query, parametros)
+            pacientes = []
+            for row in cursor.fetchall():
+                paciente = Paciente(
+                    id=row.Id,
+                    nombre=row.Nombre,
+                    apellido=row.Apellido,
+                    cedula=row.Cedula,
+                    fecha_nacimiento=row.FechaNacimiento,
+                    email=row.Email,
+                    version=row.Version if con_version else None
+                )
+                pacientes.append(paciente)
+            return pacientes
+        except Exception as e:
+            print(f"Error al obtener página de pacientes: {e}")
+            raise e
+    
+    @staticmethod
+    def buscar_texto(terminos, limite, desplazamiento=0):
+        """
+        Busca pacientes con el índice de texto completo del motor, ordenados por relevancia
+
+        Args:
+            terminos (list): Palabras normalizadas; todas deben aparecer como prefijo de
+                alguna palabra del nombre, apellido, cédula o email
+            limite (int): Número máximo de filas a devolver
+            desplazamiento (int): Filas a saltar (las de las páginas anteriores)
+
+        Returns:
+            list or None: Pacientes encontrados, o None si el motor no tiene índice de texto
+        """
+        db = DatabaseConnection()
+        consulta = db.backend.sql_busqueda_pacientes(terminos)
+        if consulta is None:
+            return None
+        try:
+            cursor = db.get_cursor()
+            union, parametros, relevancia = consulta
+            pagina, parametros_pagina = db.backend.sql_pagina(limite, desplazamiento)
+            query = f"""
+                SELECT p.Id, p.Nombre, p.Apellido, p.Cedula, p.FechaNacimiento, p.Email
+                FROM Paciente p
+                {union}
+                ORDER BY {relevancia}, p.Apellido, p.Nombre, p.Id
+                {pagina}
+            """
+            cursor.execute(query, [*parametros, *parametros_pagina])
+            pacientes = []
+            for row in cursor.fetchall():
+                paciente = Paciente(
+                    id=row.Id,
+                    nombre=row.Nombre,
+                    apellido=row.Apellido,
+                    cedula=row.Cedula,
+                    fecha_nacimiento=row.FechaNacimiento,
+                    email=row.Email
+                )
+                pacientes.append(paciente)
+            return pacientes
+        except Exception as e:
+            print(f"Error al buscar pacientes: {e}")
+            raise e
+    
+    @staticmethod
+    def buscar_por_prefijo_cedula(prefijo, limite, desplazamiento=0):
+        """
+        Busca pacientes cuya cédula empieza por el prefijo, ordenados por cédula
+
+        La condición es un rango (Cedula >= prefijo AND Cedula < siguiente prefijo)
+        para que se resuelva con el índice único de Cedula y no con LIKE.
+
+        Args:
+            prefijo (str): Primeros dígitos de la cédula
+            limite (int): Número máximo de filas a devolver
+            desplazamiento (int): Filas a saltar (las de las páginas anteriores)
+        """
+        db = DatabaseConnection()
+        try:
+            cursor = db.get_cursor()
+            siguiente = prefijo[:-1] + chr(ord(prefijo[-1]) + 1)
+            pagina, parametros_pagina = db.backend.sql_pagina(limite, desplazamiento)
+            query = f"""
+                SELECT Id, Nombre, Apellido, Cedula, FechaNacimiento, Email
+                FROM Paciente
+                WHERE Cedula >= ? AND Cedula < ?
+                ORDER BY Cedula, Id
+                {pagina}
+            """
+            cursor.execute(query, [prefijo, siguiente, *parametros_pagina])
+            pacientes = []
+            for row in cursor.fetchall():
+                paciente = Paciente(
+                    id=row.Id,
+                    nombre=row.Nombre,
+                    apellido=row.Apellido,
+                    cedula=row.Cedula,
+                    fecha_nacimiento=row.FechaNacimiento,
+                    email=row.Email
+                )
+                pacientes.append(paciente)
+            return pacientes
+        except Exception as e:
+            print(f"Error al buscar pacientes por cédula: {e}")
+            raise e
+    
+    @staticmethod
+    def obtener_por_id(id, usar_cache=True):
+        """Obtiene un paciente por su ID (lectura a través de la caché salvo que se indique lo contrario)"""
+        if not usar_cache:
+            return Paciente._obtener_por_id_bd(id)
+        return cache_entidades.obtener(('paciente', id), lambda: Paciente._obtener_por_id_bd(id))
+    
+    @staticmethod
+    def obtener_version(id):
+        """
+        Obtiene solo la versión de fila de un paciente (búsqueda por clave primaria)
+        
+        Returns:
+            int or None: Versión actual, o None si el paciente no existe
+        """
+        db = DatabaseConnection()
+        try:
+            cursor = db.get_cursor()
+            cursor.execute("SELECT CAST(Version AS BIGINT) FROM Paciente WHERE Id = ?", (id,))
+            row = cursor.fetchone()
+            return row[0] if row else None
+        except Exception as e:
+            print(f"Error al obtener versión del paciente: {e}")
+            raise e
+    
+    @staticmethod
+    def _obtener_por_id_bd(id):
+        """Obtiene un paciente por su ID directamente de la base de datos"""
         db = DatabaseConnection()
         try:
             cursor = db.get_cursor()
@@ -104,6 +272,95 @@ class Paciente:
             print(f"Error al obtener paciente por ID: {e}")
             raise e
     
+    @staticmethod
+    async def obtener_por_id_async(id):
+        """Obtiene un paciente por su ID con el driver asíncrono (modo ASGI, sin caché)"""
+        try:
+            _, filas = await AsyncDatabaseConnection().consultar(
+                "SELECT Id, Nombre, Apellido, Cedula, FechaNacimiento, Email FROM Paciente WHERE Id = ?", (id,)
+            )
+            if filas:
+                row = filas[0]
+                return Paciente(
+                    id=row.Id,
+                    nombre=row.Nombre,
+                    apellido=row.Apellido,
+                    cedula=row.Cedula,
+                    fecha_nacimiento=row.FechaNacimiento,
+                    email=row.Email
+                )
+            return None
+        except Exception as e:
+            print(f"Error al obtener paciente por ID: {e}")
+            raise e
+    
+    @staticmethod
+    async def obtener_version_async(id):
+        """Obtiene la versión de fila de un paciente con el driver asíncrono"""
+        try:
+            _, filas = await AsyncDatabaseConnection().consultar(
+                "SELECT CAST(Version AS BIGINT) FROM Paciente WHERE Id = ?", (id,)
+            )
+            return filas[0][0] if filas else None
+        except Exception as e:
+            print(f"Error al obtener versión del paciente: {e}")
+            raise e
+    
+    @staticmethod
+    def crear_lote(pacientes):
+        """
+        Inserta varios pacientes con un solo executemany y una sola confirmación
+
+        Los pacientes deben venir validados (cédulas únicas); no se obtienen los IDs generados.
+
+        Returns:
+            int: Número de pacientes insertados
+        """
+        db = DatabaseConnection()
+        try:
+            cursor = db.get_cursor()
+            db.backend.preparar_lote(cursor)
+            query = f"""
+                INSERT INTO Paciente (Nombre, Apellido, Cedula, FechaNacimiento, Email)
+                VALUES (?, ?, ?, {db.backend.sql_fecha}, ?)
+            """
+            cursor.executemany(query, [
+                (paciente.nombre, paciente.apellido, paciente.cedula,
+                 db.backend.valor_fecha(paciente.fecha_nacimiento), paciente.email)
+                for paciente in pacientes
+            ])
+            db.commit()
+            eventos.notificar('paciente', 'crear')
+            return len(pacientes)
+        except Exception as e:
+            db.rollback()
+            print(f"Error al crear lote de pacientes: {e}")
+            raise e
+    
+    @staticmethod
+    def obtener_cedulas():
+        """Obtiene en una sola consulta el conjunto de cédulas registradas"""
+        db = DatabaseConnection()
+        try:
+            cursor = db.get_cursor()
+            cursor.execute("SELECT Cedula FROM Paciente")
+            return {row[0] for row in cursor.fetchall()}
+        except Exception as e:
+            print(f"Error al obtener cédulas: {e}")
+            raise e
+    
+    @staticmethod
+    def obtener_ids():
+        """Obtiene en una sola consulta el conjunto de IDs de pacientes"""
+        db = DatabaseConnection()
+        try:
+            cursor = db.get_cursor()
+            cursor.execute("SELECT Id FROM Paciente")
+            return {row[0] for row in cursor.fetchall()}
+        except Exception as e:
+            print(f"Error al obtener IDs de pacientes: {e}")
+            raise e
+    
     @staticmethod
     def obtener_por_cedula(cedula):
         """Obtiene un paciente por su número de cédula"""
@@ -133,18 +390,19 @@ class Paciente:
         db = DatabaseConnection()
         try:
             cursor = db.get_cursor()
-            query = """
+            query = f"""
                 UPDATE Paciente 
                 SET Nombre = ?, Apellido = ?, Cedula = ?, 
-                    FechaNacimiento = CONVERT(DATE, ?, 105), Email = ?
+                    FechaNacimiento = {db.backend.sql_fecha}, Email = ?
                 WHERE Id = ?
             """
             cursor.execute(
                 query, 
                 (paciente.nombre, paciente.apellido, paciente.cedula, 
-                 paciente.fecha_nacimiento.strftime('%d-%m-%Y'), paciente.email, paciente.id)
+                 db.backend.valor_fecha(paciente.fecha_nacimiento), paciente.email, paciente.id)
             )
             db.commit()
+            eventos.notificar('paciente', 'actualizar', paciente.id)
             return True
         except Exception as e:
             db.rollback()
@@ -168,6 +426,7 @@ class Paciente:
             query = "DELETE FROM Paciente WHERE Id = ?"
             cursor.execute(query, (id,))
             db.commit()
+            eventos.notificar('paciente', 'eliminar', id)
             return True, "Paciente eliminado correctamente."
         except Exception as e:
             db.rollback()
@@ -0,0 +1,74 @@
+import re
+import unicodedata
+
+
+def normalizar(texto):
+    """
+    Pliega mayúsculas, acentos y espacios para comparar texto escrito por usuarios
+
+    "  Cardiología " y "cardiologia" quedan iguales.
+
+    Args:
+        texto (str): Texto a normalizar (None se trata como vacío)
+
+    Returns:
+        str: Texto en minúsculas, sin marcas diacríticas y con espacios simples
+    """
+    if not texto:
+        return ""
+    descompuesto = unicodedata.normalize('NFKD', texto)
+    sin_acentos = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return " ".join(sin_acentos.casefold().split())
+
+
+def terminos(texto):
+    """
+    Divide un texto normalizado en palabras (letras y dígitos)
+
+    "José Pérez <jperez@correo.com>" da ['jose', 'perez', 'jperez', 'correo', 'com'],
+    igual que el tokenizador de los índices de texto completo.
+
+    Returns:
+        list: Palabras en el orden en que aparecen
+    """
+    return re.findall(r'[^\W_]+', normalizar(texto))
+
+
+def puntuar(consulta, candidato):
+    """
+    Relevancia de un candidato ya normalizado frente a una consulta normalizada
+
+    Returns:
+        int or None: 0 coincidencia exacta, 1 prefijo del texto, 2 prefijo de una
+            palabra, 3 contenido en cualquier posición; None si no coincide
+    """
+    if candidato == consulta:
+        return 0
+    if candidato.startswith(consulta):
+        return 1
+    if any(palabra.startswith(consulta) for palabra in candidato.split()[1:]):
+        return 2
+    if consulta in candidato:
+        return 3
+    return None
+
+
+def clasificar(consulta, candidatos):
+    """
+    Ordena por relevancia los candidatos que coinciden con la consulta
+
+    Args:
+        consulta (str): Texto buscado (se normaliza aquí)
+        candidatos (iterable): Pares (texto normalizado, valor)
+
+    Returns:
+        list: Valores que coinciden, del más al menos relevante y luego alfabéticamente
+    """
+    consulta = normalizar(consulta)
+    puntuados = []
+    for normalizado, valor in candidatos:
+        puntuacion = puntuar(consulta, normalizado)
+        if puntuacion is not None:
+            puntuados.append((puntuacion, normalizado, valor))
+    puntuados.sort(key=lambda puntuado: puntuado[:2])
+    return [valor for _, _, valor in puntuados]
@@ -37,6 +37,44 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
     
+    // Autocompletar: campos con data-sugerencias cargan su datalist mientras se escribe.
+    // Las sugerencias pueden ser textos o objetos {id, texto}; con data-destino, el ID
+    // de la opción elegida se copia en ese campo (oculto) y se borra si el texto cambia
+    document.querySelectorAll('input[data-sugerencias]').forEach(input => {
+        const lista = document.getElementById(input.getAttribute('list'));
+        const destino = input.dataset.destino ? document.getElementById(input.dataset.destino) : null;
+        let espera = null;
+        input.addEventListener('input', function() {
+            if (destino) {
+                const elegida = Array.from(lista.options).find(opcion => opcion.value === input.value);
+                destino.value = elegida ? elegida.dataset.id : '';
+                if (elegida) {
+                    return;
+                }
+            }
+            clearTimeout(espera);
+            espera = setTimeout(() => {
+                const url = `${input.dataset.sugerencias}?q=${encodeURIComponent(input.value)}`;
+                fetch(url)
+                    .then(respuesta => respuesta.json())
+                    .then(sugerencias => {
+                        lista.innerHTML = '';
+                        sugerencias.forEach(sugerencia => {
+                            const opcion = document.createElement('option');
+                            if (typeof sugerencia === 'object') {
+                                opcion.value = sugerencia.texto;
+                                opcion.dataset.id = sugerencia.id;
+                            } else {
+                                opcion.value = sugerencia;
+                            }
+                            lista.appendChild(opcion);
+                        });
+                    })
+                    .catch(() => {});
+            }, 150);
+        });
+    });
+    
     // Mejora para tablas responsivas
     const tables = document.querySelectorAll('.table-responsive');
     if (window.innerWidth < 768) {
@@ -0,0 +1,39 @@
+import os
+import pytest
+
+# Las pruebas usan siempre una base SQLite propia, nunca la configurada en .env
+os.environ['DB_BACKEND'] = 'sqlite'
+os.environ['SQLITE_PATH'] = ':memory:'
+# Sin caché de plantillas compiladas en el árbol del proyecto
+os.environ['PLANTILLAS_CACHE_DIR'] = ''
+os.environ.setdefault('DB_UMBRAL_LENTA_MS', 'inf')
+os.environ.setdefault('DB_UMBRAL_PETICION_MS', 'inf')
+
+
+@pytest.fixture
+def base_datos(tmp_path, monkeypatch):
+    """Base SQLite vacía en un archivo temporal, con las cachés en memoria vacías"""
+    from config.database import DatabaseConnection
+    from models import cache_entidades
+    from models.agenda import agenda
+
+    monkeypatch.setenv('SQLITE_PATH', str(tmp_path / 'clinica.db'))
+    if DatabaseConnection.actual() is not None:
+        DatabaseConnection.actual().close()
+    cache_entidades.cache.limpiar()
+    agenda.limpiar()
+    db = DatabaseConnection()
+    yield db
+    db.close()
+    cache_entidades.cache.limpiar()
+    agenda.limpiar()
+
+
+@pytest.fixture
+def cliente(base_datos):
+    """Cliente de pruebas de la aplicación web, sin CSRF, sobre la base de la prueba"""
+    from web_app import create_app
+    from web_controllers import fragmentos
+    fragmentos.cache.limpiar()
+    app = create_app({'TESTING': True, 'WTF_CSRF_ENABLED': False})
+    return app.test_client()
@@ -0,0 +1,57 @@
+import pytest
+from controllers import perfil_controller
+from web_controllers import perfilado
+
+
+@pytest.fixture
+def crear_cliente(base_datos, tmp_path, monkeypatch):
+    """Crea el cliente con el token y el muestreo indicados"""
+    monkeypatch.setattr(perfil_controller, 'DIRECTORIO', str(tmp_path / 'perfiles'))
+
+    def crear(token='', muestreo=0.0):
+        from web_app import create_app
+        monkeypatch.setattr(perfilado, 'TOKEN', token)
+        monkeypatch.setattr(perfilado, 'MUESTREO', muestreo)
+        monkeypatch.setattr(perfilado, 'HABILITADO', muestreo > 0 or bool(token))
+        return create_app({'TESTING': True}).test_client()
+    return crear
+
+
+def test_solo_con_muestreo_no_monta_la_administracion(crear_cliente):
+    cliente = crear_cliente(muestreo=0.5)
+    assert cliente.get('/admin/perfiles').status_code == 404
+    assert cliente.get('/admin/perfiles', headers={'X-Perfilar': ''}).status_code == 404
+
+
+def test_exige_el_token_en_la_cabecera(crear_cliente):
+    cliente = crear_cliente(token='secreto')
+    assert cliente.get('/admin/perfiles').status_code == 403
+    assert cliente.get('/admin/perfiles', headers={'X-Perfilar': 'otro'}).status_code == 403
+    assert cliente.get('/admin/perfiles?token=secreto').status_code == 403
+    assert cliente.get('/admin/perfiles', headers={'X-Perfilar': 'secreto'}).status_code == 200
+
+
+def test_los_enlaces_no_llevan_el_token(crear_cliente):
+    cliente = crear_cliente(token='secreto')
+    respuesta = cliente.get('/pacientes/', headers={'X-Perfilar': 'secreto'})
+    # El perfil se guarda al cerrar la respuesta
+    respuesta.close()
+    perfiles = perfil_controller.PerfilController.listar_perfiles()
+    assert len(perfiles) == 1
+
+    pagina = cliente.get('/admin/perfiles', headers={'X-Perfilar': 'secreto'}).get_data(as_text=True)
+    assert f"/admin/perfiles/{perfiles[0]['nombre']}/descargar" in pagina
+    assert 'secreto' not in pagina
+    # Consultar los perfiles no genera perfiles nuevos
+    assert len(perfil_controller.PerfilController.listar_perfiles()) == 1
+
+
+def test_el_estado_de_las_caches_exige_el_token(crear_cliente):
+    assert crear_cliente().get('/estado/cache').status_code == 404
+    assert crear_cliente().get('/admin/estado/cache').status_code == 404
+    cliente = crear_cliente(token='secreto')
+    for ruta in ('/admin/estado/cache', '/admin/estado/fragmentos'):
+        assert cliente.get(ruta).status_code == 403
+        respuesta = cliente.get(ruta, headers={'X-Perfilar': 'secreto'})
+        assert respuesta.status_code == 200
+        assert 'aciertos' in respuesta.get_json()
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+import pytest
+from models import eventos
+from models.agenda import AgendaMedicos
+from models.cita import Cita
+from models.medico import Medico
+from models.paciente import Paciente
+
+
+def manana(hora):
+    dia = datetime.combine(datetime.now().date() + timedelta(days=1), datetime.min.time())
+    return dia + timedelta(hours=hora)
+
+
+@pytest.fixture
+def agenda():
+    agenda = AgendaMedicos(ttl=3600)
+    eventos.suscribir(agenda.al_cambiar)
+    yield agenda
+    eventos._suscriptores.remove(agenda.al_cambiar)
+
+
+@pytest.fixture
+def medico(base_datos):
+    return Medico.crear(Medico(nombre='Ana Ruiz', especialidad='Cardiología'))
+
+
+@pytest.fixture
+def paciente(base_datos):
+    return Paciente.crear(Paciente(nombre='Luis', apellido='Pérez', cedula='001-0000001-1'))
+
+
+def crear_cita(paciente, medico, fecha_hora):
+    return Cita.crear(Cita(id_paciente=paciente.id, id_medico=medico.id, fecha_hora=fecha_hora))
+
+
+def test_detecta_solapamientos_con_la_agenda_cargada(agenda, paciente, medico):
+    cita = crear_cita(paciente, medico, manana(9))
+    assert agenda.buscar_conflicto(medico.id, manana(9) + timedelta(minutes=15)).id == cita.id
+    assert agenda.buscar_conflicto(medico.id, manana(9) + timedelta(minutes=30)) is None
+    assert agenda.buscar_conflicto(medico.id, manana(9), excluir_id=cita.id) is None
+
+
+def test_cita_creada_descarta_la_agenda_guardada(agenda, paciente, medico):
+    assert agenda.buscar_conflicto(medico.id, manana(10)) is None
+    cita = crear_cita(paciente, medico, manana(10))
+    assert agenda.buscar_conflicto(medico.id, manana(10)).id == cita.id
+
+
+def test_cita_eliminada_descarta_la_agenda_guardada(agenda, paciente, medico):
+    cita = crear_cita(paciente, medico, manana(11))
+    assert agenda.buscar_conflicto(medico.id, manana(11)) is not None
+    Cita.eliminar(cita.id)
+    assert agenda.buscar_conflicto(medico.id, manana(11)) is None
+
+
+def test_no_guarda_una_carga_anterior_a_un_cambio_con_la_cache_vacia(agenda, paciente, medico, monkeypatch):
+    # Una cita se confirma mientras se lee la agenda y todavía no hay ninguna guardada
+    leer = Cita.obtener_horarios
+
+    def leer_y_confirmar(ids_medicos, desde, hasta):
+        horarios = leer(ids_medicos, desde, hasta)
+        monkeypatch.setattr(Cita, 'obtener_horarios', leer)
+        crear_cita(paciente, medico, manana(12))
+        return horarios
+
+    monkeypatch.setattr(Cita, 'obtener_horarios', staticmethod(leer_y_confirmar))
+    # La consulta en curso ve la agenda anterior al cambio...
+    assert agenda.buscar_conflicto(medico.id, manana(12)) is None
+    # ...pero no la guarda: la siguiente ve la cita nueva
+    assert agenda.buscar_conflicto(medico.id, manana(12)) is not None
+
+
+def test_cambio_de_cita_desconocida_aumenta_la_generacion(agenda, paciente, medico):
+    agenda.buscar_conflicto(medico.id, manana(9))
+    generacion = agenda._generacion
+    agenda.al_cambiar('cita', 'eliminar', 999)
+    assert agenda._generacion > generacion
+    agenda.al_cambiar('paciente', 'crear', 1)
+    assert agenda._generacion == generacion + 1
+
+
+def test_cita_creada_en_otro_worker_descarta_la_agenda_guardada(agenda, base_datos, paciente, medico):
+    assert agenda.buscar_conflicto(medico.id, manana(13)) is None
+    # Otro worker confirma una cita: escribe en la base y aumenta la versión
+    # compartida, pero los suscriptores de este proceso no se enteran
+    cursor = base_datos.get_cursor()
+    cursor.execute(
+        "INSERT INTO Cita (IdPaciente, IdMedico, FechaHora) VALUES (?, ?, ?)",
+        (paciente.id, medico.id, manana(13))
+    )
+    base_datos.commit()
+    with eventos._lock_versiones:
+        eventos._versiones[eventos._INDICES['cita']] += 1
+    assert agenda.buscar_conflicto(medico.id, manana(13)) is not None
@@ -0,0 +1,53 @@
+from models.medico import Medico
+from models.paciente import Paciente
+
+
+def crear_paciente(cedula='001-0000001-1', nombre='Luis'):
+    return Paciente.crear(Paciente(nombre=nombre, apellido='Pérez', cedula=cedula))
+
+
+def test_revalidacion_con_la_misma_version_responde_304(cliente):
+    paciente = crear_paciente()
+    respuesta = cliente.get(f'/api/v1/pacientes/{paciente.id}')
+    assert respuesta.status_code == 200
+    etag = respuesta.headers['ETag']
+
+    revalidada = cliente.get(f'/api/v1/pacientes/{paciente.id}', headers={'If-None-Match': etag})
+    assert revalidada.status_code == 304
+    assert revalidada.get_data() == b''
+
+
+def test_actualizar_cambia_la_etag(cliente):
+    paciente = crear_paciente()
+    etag = cliente.get(f'/api/v1/pacientes/{paciente.id}').headers['ETag']
+    paciente.nombre = 'Luisa'
+    Paciente.actualizar(paciente)
+
+    respuesta = cliente.get(f'/api/v1/pacientes/{paciente.id}', headers={'If-None-Match': etag})
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['nombre'] == 'Luisa'
+
+
+def test_fila_recreada_con_el_mismo_id_no_responde_304(cliente):
+    crear_paciente('001-0000001-1')
+    eliminado = crear_paciente('001-0000002-2', 'Ana')
+    etag = cliente.get(f'/api/v1/pacientes/{eliminado.id}').headers['ETag']
+    Paciente.eliminar(eliminado.id)
+
+    # SQLite reutiliza el Id más alto tras eliminarlo
+    recreado = crear_paciente('001-0000003-3', 'Marta')
+    assert recreado.id == eliminado.id
+    respuesta = cliente.get(f'/api/v1/pacientes/{recreado.id}', headers={'If-None-Match': etag})
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['nombre'] == 'Marta'
+
+
+def test_listado_cambia_la_etag_al_recrear_una_fila(cliente):
+    Medico.crear(Medico(nombre='Ana Ruiz', especialidad='Cardiología'))
+    eliminado = Medico.crear(Medico(nombre='Beatriz Gil', especialidad='Pediatría'))
+    etag = cliente.get('/api/v1/medicos').headers['ETag']
+    Medico.eliminar(eliminado.id)
+    Medico.crear(Medico(nombre='Beatriz Gil', especialidad='Pediatría'))
+
+    assert cliente.get('/api/v1/medicos', headers={'If-None-Match': etag}).status_code == 200
+
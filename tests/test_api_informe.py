@@ -0,0 +1,68 @@
+import json
+from datetime import datetime, timedelta
+import pytest
+from controllers.paciente_controller import PacienteController
+from models.cita import Cita
+from models.medico import Medico
+from models.paciente import Paciente
+
+INICIO = datetime(2030, 1, 7, 8, 0)
+
+
+@pytest.fixture
+def citas(base_datos):
+    paciente = Paciente.crear(Paciente(nombre='Luis', apellido='Pérez', cedula='001-0000001-1'))
+    medico = Medico.crear(Medico(nombre='Ana Ruiz', especialidad='Cardiología'))
+    return [
+        Cita.crear(Cita(id_paciente=paciente.id, id_medico=medico.id, fecha_hora=INICIO + timedelta(hours=i)))
+        for i in range(3)
+    ]
+
+
+def informe(cliente):
+    return cliente.get('/api/v1/citas/fecha', query_string={'fecha_inicio': INICIO.strftime('%d-%m-%Y')})
+
+
+def test_informe_completo(cliente, citas):
+    respuesta = informe(cliente)
+    assert respuesta.status_code == 200
+    assert json.loads(respuesta.get_data(as_text=True)) == {
+        'datos': [cliente.get(f'/api/v1/citas/{cita.id}').get_json() for cita in citas]
+    }
+
+
+def test_error_a_mitad_cierra_el_documento_con_un_error(cliente, citas, monkeypatch):
+    leer = Cita.iterar_por_fecha
+
+    def falla_tras_la_primera(*args, **kwargs):
+        yield next(iter(leer(*args, **kwargs)))
+        raise Exception("conexión perdida")
+
+    monkeypatch.setattr(Cita, 'iterar_por_fecha', staticmethod(falla_tras_la_primera))
+    respuesta = informe(cliente)
+    assert respuesta.status_code == 200
+    documento = json.loads(respuesta.get_data(as_text=True))
+    assert [cita['id'] for cita in documento['datos']] == [citas[0].id]
+    assert documento['error']
+    assert 'conexión perdida' not in documento['error']
+
+
+def test_error_antes_de_la_primera_fila_es_un_500_en_json(cliente, citas, monkeypatch):
+    def falla(*args, **kwargs):
+        raise Exception("base de datos no disponible")
+        yield
+
+    monkeypatch.setattr(Cita, 'iterar_por_fecha', staticmethod(falla))
+    respuesta = informe(cliente)
+    assert respuesta.status_code == 500
+    assert respuesta.get_json() == {'error': 'Error interno del servidor'}
+
+
+def test_los_errores_internos_no_muestran_el_detalle(cliente, monkeypatch):
+    def falla(id):
+        raise Exception("Login failed for user 'sa'")
+
+    monkeypatch.setattr(PacienteController, 'obtener_version_paciente', staticmethod(falla))
+    respuesta = cliente.get('/api/v1/pacientes/1')
+    assert respuesta.status_code == 500
+    assert respuesta.get_json() == {'error': 'Error interno del servidor'}
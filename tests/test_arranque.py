@@ -0,0 +1,22 @@
+from config import instrumentacion, metricas
+from web_controllers import arranque
+
+
+def test_el_calentamiento_no_cuenta_en_metricas_ni_en_consultas_lentas(base_datos, monkeypatch):
+    from web_app import create_app
+    app = create_app({'TESTING': True})
+    monkeypatch.setattr(instrumentacion, 'UMBRAL_CONSULTA_MS', 0)
+    eventos = []
+    monkeypatch.setattr(instrumentacion.logger, 'info', eventos.append)
+    peticiones = metricas.peticiones.estado()
+    consultas = metricas.consultas.estado()
+
+    tiempos = arranque.calentar(app)
+
+    assert tiempos['paginas'] > 0
+    assert metricas.peticiones.estado() == peticiones
+    assert metricas.consultas.estado() == consultas
+    assert eventos == []
+    # Fuera del calentamiento se vuelve a registrar
+    app.test_client().get('/').close()
+    assert metricas.peticiones.estado() != peticiones
@@ -0,0 +1,119 @@
+import asyncio
+import contextlib
+import json
+from datetime import datetime, timedelta
+import pytest
+from config.async_database import AsyncDatabaseConnection
+from models.cita import Cita
+from models.medico import Medico
+from models.paciente import Paciente
+
+pytest.importorskip('aiosqlite')
+
+INICIO = datetime(2030, 1, 7, 8, 0)
+
+
+@pytest.fixture
+def citas(base_datos, monkeypatch):
+    monkeypatch.setenv('DB_POOL_ASYNC_SIZE', '2')
+    monkeypatch.setenv('DB_POOL_TIMEOUT', '1')
+    paciente = Paciente.crear(Paciente(nombre='Luis', apellido='Pérez', cedula='001-0000001-1'))
+    medico = Medico.crear(Medico(nombre='Ana Ruiz', especialidad='Cardiología'))
+    for i in range(5):
+        Cita.crear(Cita(id_paciente=paciente.id, id_medico=medico.id, fecha_hora=INICIO + timedelta(hours=i)))
+
+
+def ejecutar(prueba):
+    """Ejecuta la corrutina en un bucle nuevo y cierra después el pool asíncrono"""
+    async def con_cierre():
+        try:
+            return await prueba(AsyncDatabaseConnection())
+        finally:
+            await AsyncDatabaseConnection().close()
+    return asyncio.run(con_cierre())
+
+
+async def primer_lote():
+    lotes = Cita.iterar_por_fecha_async(INICIO, INICIO + timedelta(days=1), tamano_lote=1)
+    return lotes, await anext(lotes)
+
+
+def test_cancelar_a_mitad_de_recorrido_libera_la_conexion(citas):
+    async def prueba(db):
+        recibido = asyncio.Event()
+
+        async def consumir():
+            # Como la ruta de streaming: el generador se cierra al salir del bloque
+            lotes = Cita.iterar_por_fecha_async(INICIO, INICIO + timedelta(days=1), tamano_lote=1)
+            async with contextlib.aclosing(lotes):
+                async for _ in lotes:
+                    recibido.set()
+                    await asyncio.sleep(60)
+
+        # Más cancelaciones que conexiones tiene el pool
+        for _ in range(3):
+            recibido.clear()
+            tarea = asyncio.create_task(consumir())
+            await recibido.wait()
+            tarea.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await tarea
+        assert db.pool.estadisticas()['en_uso'] == 0
+        _, filas = await db.consultar("SELECT COUNT(*) FROM Cita")
+        assert filas[0][0] == 5
+    ejecutar(prueba)
+
+
+def test_aclose_a_mitad_de_recorrido_libera_la_conexion(citas):
+    async def prueba(db):
+        for _ in range(3):
+            lotes, lote = await primer_lote()
+            assert len(lote) == 1
+            await lotes.aclose()
+        assert db.pool.estadisticas()['en_uso'] == 0
+    ejecutar(prueba)
+
+
+def test_error_en_el_bloque_descarta_la_conexion(citas):
+    async def prueba(db):
+        with pytest.raises(ValueError):
+            async with db.conexion():
+                raise ValueError("fallo")
+        estadisticas = db.pool.estadisticas()
+        assert estadisticas['en_uso'] == 0
+        assert estadisticas['abiertas'] == 0
+    ejecutar(prueba)
+
+
+def test_recorrido_completo_devuelve_la_conexion_al_pool(citas):
+    async def prueba(db):
+        lotes = [lote async for lote in Cita.iterar_por_fecha_async(INICIO, INICIO + timedelta(days=1))]
+        assert [cita.fecha_hora for lote in lotes for cita in lote] == [
+            INICIO + timedelta(hours=i) for i in range(5)
+        ]
+        assert db.pool.estadisticas() == {'abiertas': 1, 'en_uso': 0, 'libres': 1, 'maximo': 2}
+    ejecutar(prueba)
+
+
+def test_informe_asincrono_con_error_a_mitad_sigue_siendo_json(citas, monkeypatch):
+    from starlette.requests import Request
+    from controllers.cita_controller import CitaController
+    from web_controllers import api_async_routes
+
+    async def falla_tras_el_primer_lote(fecha_inicio, fecha_fin=None):
+        yield [Cita(id=1, fecha_hora=INICIO)]
+        raise Exception("conexión perdida")
+
+    monkeypatch.setattr(CitaController, 'iterar_citas_por_fecha_async', staticmethod(falla_tras_el_primer_lote))
+
+    async def prueba(db):
+        peticion = Request({
+            'type': 'http', 'method': 'GET', 'path': '/api/v1/citas/fecha', 'headers': [],
+            'query_string': f"fecha_inicio={INICIO.strftime('%d-%m-%Y')}&campos=id".encode(),
+        })
+        respuesta = await api_async_routes.citas_por_fecha(peticion)
+        return ''.join([fragmento async for fragmento in respuesta.body_iterator])
+
+    documento = json.loads(ejecutar(prueba))
+    assert documento['datos'] == [{'id': 1}]
+    assert 'conexión perdida' not in documento['error']
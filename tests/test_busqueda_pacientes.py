@@ -0,0 +1,54 @@
+import pytest
+from controllers.paciente_controller import PacienteController
+from models import indice_pacientes
+from models.paciente import Paciente
+
+
+@pytest.fixture
+def busqueda(base_datos, monkeypatch):
+    monkeypatch.setattr(indice_pacientes, 'MODO', 'auto')
+    monkeypatch.setattr(PacienteController, '_texto_completo', True)
+    indice_pacientes.indice.limpiar()
+    Paciente.crear(Paciente(nombre='José', apellido='Pérez', cedula='001-0000001-1'))
+    yield
+    indice_pacientes.indice.limpiar()
+
+
+def nombres(pagina):
+    return [paciente.apellido for paciente in pagina.elementos]
+
+
+def test_encuentra_con_el_indice_de_texto_del_motor(busqueda):
+    assert nombres(PacienteController.buscar_pacientes('jose')) == ['Pérez']
+    assert PacienteController._texto_completo
+
+
+def test_un_fallo_puntual_no_desactiva_el_indice_del_motor(busqueda, monkeypatch):
+    buscar_texto = Paciente.buscar_texto
+    llamadas = []
+
+    def falla_una_vez(consulta, limite, desplazamiento=0):
+        llamadas.append(consulta)
+        if len(llamadas) == 1:
+            raise Exception("tiempo de espera agotado")
+        return buscar_texto(consulta, limite, desplazamiento)
+
+    monkeypatch.setattr(Paciente, 'buscar_texto', staticmethod(falla_una_vez))
+    # La búsqueda que falla se resuelve con el índice en memoria...
+    assert nombres(PacienteController.buscar_pacientes('perez')) == ['Pérez']
+    # ...y la siguiente vuelve a usar el del motor
+    assert nombres(PacienteController.buscar_pacientes('perez')) == ['Pérez']
+    assert len(llamadas) == 2
+    assert PacienteController._texto_completo
+
+
+def test_sin_indice_en_el_motor_usa_siempre_el_de_memoria(busqueda, monkeypatch):
+    llamadas = []
+    monkeypatch.setattr(
+        Paciente, 'buscar_texto',
+        staticmethod(lambda consulta, limite, desplazamiento=0: llamadas.append(consulta))
+    )
+    assert nombres(PacienteController.buscar_pacientes('perez')) == ['Pérez']
+    assert nombres(PacienteController.buscar_pacientes('jose')) == ['Pérez']
+    assert len(llamadas) == 1
+    assert not PacienteController._texto_completo
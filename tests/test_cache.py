@@ -0,0 +1,124 @@
+import threading
+from config.cache import CacheLRU
+from models import cache_entidades, eventos
+from models.medico import Medico
+from models.paciente import Paciente
+
+
+def test_carga_una_vez_y_despues_acierta():
+    cache = CacheLRU()
+    cargas = []
+    assert cache.obtener('a', lambda: cargas.append(1) or 'valor') == 'valor'
+    assert cache.obtener('a', lambda: cargas.append(1) or 'otro') == 'valor'
+    assert len(cargas) == 1
+    estadisticas = cache.estadisticas()
+    assert (estadisticas['aciertos'], estadisticas['fallos']) == (1, 1)
+
+
+def test_no_guarda_resultados_none():
+    cache = CacheLRU()
+    cache.obtener('a', lambda: None)
+    assert cache.obtener('a', lambda: 'valor') == 'valor'
+
+
+def test_desaloja_la_menos_usada():
+    cache = CacheLRU(max_entradas=2)
+    cache.obtener('a', lambda: 1)
+    cache.obtener('b', lambda: 2)
+    cache.obtener('a', lambda: None)
+    cache.obtener('c', lambda: 3)
+    assert cache.obtener('a', lambda: 'recargada') == 1
+    assert cache.obtener('b', lambda: 'recargada') == 'recargada'
+    assert cache.estadisticas()['desalojos'] == 2
+
+
+def test_expira_por_ttl(monkeypatch):
+    reloj = [1000.0]
+    monkeypatch.setattr('config.cache.time.monotonic', lambda: reloj[0])
+    cache = CacheLRU(ttl=10)
+    cache.obtener('a', lambda: 'vieja')
+    reloj[0] += 11
+    assert cache.obtener('a', lambda: 'nueva') == 'nueva'
+
+
+def test_limite_de_bytes():
+    cache = CacheLRU(max_bytes=10, tamano=len)
+    cache.obtener('a', lambda: 'x' * 6)
+    cache.obtener('b', lambda: 'y' * 6)
+    # No cabe junto a la anterior: se desaloja 'a'
+    assert cache.estadisticas()['bytes'] == 6
+    assert cache.obtener('a', lambda: 'recargada') == 'recargada'
+    # Un valor mayor que el límite no se guarda
+    cache.obtener('grande', lambda: 'z' * 11)
+    assert cache.obtener('grande', lambda: None) is None
+
+
+def test_invalidar_durante_la_carga_no_guarda_el_valor():
+    cache = CacheLRU()
+
+    def cargar():
+        cache.invalidar('a')
+        return 'leida antes del cambio'
+
+    assert cache.obtener('a', cargar) == 'leida antes del cambio'
+    assert cache.obtener('a', lambda: 'actual') == 'actual'
+
+
+def test_cargas_concurrentes_no_rompen_los_contadores():
+    cache = CacheLRU(max_entradas=8)
+
+    def trabajar(inicio):
+        for i in range(200):
+            cache.obtener((inicio + i) % 16, lambda: i)
+
+    hilos = [threading.Thread(target=trabajar, args=(n,)) for n in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    estadisticas = cache.estadisticas()
+    assert estadisticas['aciertos'] + estadisticas['fallos'] == 800
+    assert estadisticas['entradas'] <= 8
+
+
+def test_actualizar_un_paciente_invalida_su_entrada(base_datos):
+    paciente = Paciente.crear(Paciente(nombre='Luis', apellido='Pérez', cedula='001-0000001-1'))
+    assert Paciente.obtener_por_id(paciente.id).nombre == 'Luis'
+    paciente.nombre = 'Luisa'
+    Paciente.actualizar(paciente)
+    assert Paciente.obtener_por_id(paciente.id).nombre == 'Luisa'
+
+
+def test_crear_un_medico_invalida_el_listado(base_datos):
+    Medico.crear(Medico(nombre='Ana Ruiz', especialidad='Cardiología'))
+    assert len(Medico.obtener_todos()) == 1
+    Medico.crear(Medico(nombre='Beatriz Gil', especialidad='Pediatría'))
+    assert len(Medico.obtener_todos()) == 2
+    assert cache_entidades.cache.estadisticas()['invalidaciones'] >= 1
+
+
+def test_las_copias_no_modifican_la_cache(base_datos):
+    paciente = Paciente.crear(Paciente(nombre='Luis', apellido='Pérez', cedula='001-0000001-1'))
+    leido = Paciente.obtener_por_id(paciente.id)
+    leido.nombre = 'Modificado'
+    assert Paciente.obtener_por_id(paciente.id).nombre == 'Luis'
+
+
+def test_descarta_la_entrada_de_una_version_anterior():
+    cache = CacheLRU()
+    cache.obtener('a', lambda: (1, 'vieja'))
+    assert cache.obtener('a', lambda: (2, 'nueva'), lambda guardada: guardada[0] == 2) == (2, 'nueva')
+    assert cache.estadisticas()['invalidaciones'] == 1
+
+
+def test_cambio_en_otro_worker_invalida_la_entrada(base_datos):
+    paciente = Paciente.crear(Paciente(nombre='Luis', apellido='Pérez', cedula='001-0000001-1'))
+    assert Paciente.obtener_por_id(paciente.id).nombre == 'Luis'
+    # Otro worker actualiza el paciente: aumenta la versión compartida sin
+    # avisar a los suscriptores de este proceso
+    cursor = base_datos.get_cursor()
+    cursor.execute("UPDATE Paciente SET Nombre = 'Luisa' WHERE Id = ?", (paciente.id,))
+    base_datos.commit()
+    with eventos._lock_versiones:
+        eventos._versiones[eventos._INDICES['paciente']] += 1
+    assert Paciente.obtener_por_id(paciente.id).nombre == 'Luisa'
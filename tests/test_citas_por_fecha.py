@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+import pytest
+from models.cita import Cita
+from models.medico import Medico
+from models.paciente import Paciente
+
+INICIO = datetime(2030, 1, 7, 8, 0)
+
+
+@pytest.fixture
+def citas(base_datos):
+    paciente = Paciente.crear(Paciente(nombre='Luis', apellido='Pérez', cedula='001-0000001-1'))
+    medico = Medico.crear(Medico(nombre='Ana Ruiz', especialidad='Cardiología'))
+    return [
+        Cita.crear(Cita(id_paciente=paciente.id, id_medico=medico.id, fecha_hora=INICIO + timedelta(hours=i)))
+        for i in range(3)
+    ]
+
+
+def buscar(cliente):
+    return cliente.post('/citas/fecha', data={'fecha_inicio': INICIO.strftime('%Y-%m-%d')})
+
+
+def test_envia_todas_las_citas_del_dia(cliente, citas):
+    respuesta = buscar(cliente)
+    html = respuesta.get_data(as_text=True)
+    assert respuesta.status_code == 200
+    assert html.count('/citas/ver/') == 3
+    assert '</table>' in html
+    assert 'table-danger' not in html
+
+
+def test_error_a_mitad_cierra_la_tabla_y_lo_muestra(cliente, citas, monkeypatch):
+    leer = Cita.iterar_por_fecha
+
+    def falla_tras_la_primera(*args, **kwargs):
+        yield next(iter(leer(*args, **kwargs)))
+        raise Exception("conexión perdida")
+
+    monkeypatch.setattr(Cita, 'iterar_por_fecha', staticmethod(falla_tras_la_primera))
+    respuesta = buscar(cliente)
+    html = respuesta.get_data(as_text=True)
+    assert respuesta.status_code == 200
+    assert html.count('/citas/ver/') == 1
+    assert 'conexión perdida' in html
+    assert html.index('table-danger') < html.index('</table>')
+
+
+def test_error_antes_de_la_primera_fila_llega_al_manejador(cliente, citas, monkeypatch):
+    def falla(*args, **kwargs):
+        raise Exception("base de datos no disponible")
+        yield
+
+    monkeypatch.setattr(Cita, 'iterar_por_fecha', staticmethod(falla))
+    respuesta = buscar(cliente)
+    assert respuesta.status_code == 500
+    assert 'base de datos no disponible' in respuesta.get_data(as_text=True)
@@ -0,0 +1,64 @@
+import csv
+import io
+from datetime import datetime, timedelta
+import pytest
+from controllers.exportacion_controller import COLUMNAS, MARCA_ERROR
+from models.cita import Cita
+from models.medico import Medico
+from models.paciente import Paciente
+
+INICIO = datetime(2030, 1, 7, 8, 0)
+
+
+@pytest.fixture
+def citas(base_datos):
+    paciente = Paciente.crear(Paciente(nombre='Luis', apellido='Pérez', cedula='001-0000001-1'))
+    medico = Medico.crear(Medico(nombre='Ana Ruiz', especialidad='Cardiología'))
+    return [
+        Cita.crear(Cita(id_paciente=paciente.id, id_medico=medico.id, fecha_hora=INICIO + timedelta(hours=i)))
+        for i in range(3)
+    ]
+
+
+def exportar(cliente):
+    return cliente.get('/citas/exportar', query_string={'fecha_inicio': INICIO.strftime('%d-%m-%Y')})
+
+
+def filas(respuesta):
+    return list(csv.reader(io.StringIO(respuesta.get_data(as_text=True).lstrip('\ufeff'))))
+
+
+def test_exporta_todas_las_citas(cliente, citas):
+    respuesta = exportar(cliente)
+    assert respuesta.status_code == 200
+    contenido = filas(respuesta)
+    assert contenido[0] == COLUMNAS
+    assert [int(fila[0]) for fila in contenido[1:]] == [cita.id for cita in citas]
+
+
+def test_error_a_mitad_termina_con_una_fila_de_error(cliente, citas, monkeypatch):
+    leer = Cita.iterar_filtradas
+
+    def falla_tras_la_primera(*args, **kwargs):
+        yield next(iter(leer(*args, **kwargs)))
+        raise Exception("conexión perdida")
+
+    monkeypatch.setattr(Cita, 'iterar_filtradas', staticmethod(falla_tras_la_primera))
+    respuesta = exportar(cliente)
+    assert respuesta.status_code == 200
+    contenido = filas(respuesta)
+    assert int(contenido[1][0]) == citas[0].id
+    assert contenido[-1][0] == MARCA_ERROR
+    assert 'conexión perdida' not in contenido[-1][1]
+    assert len(contenido) == 3
+
+
+def test_error_antes_de_la_primera_fila_no_descarga_un_csv(cliente, citas, monkeypatch):
+    def falla(*args, **kwargs):
+        raise Exception("base de datos no disponible")
+        yield
+
+    monkeypatch.setattr(Cita, 'iterar_filtradas', staticmethod(falla))
+    respuesta = exportar(cliente)
+    assert respuesta.status_code == 302
+    assert respuesta.mimetype != 'text/csv'
@@ -0,0 +1,33 @@
+from datetime import datetime
+import pytest
+from controllers.paciente_controller import PacienteController
+from models.cita import Cita
+from models.medico import Medico
+from models.paciente import Paciente
+
+
+@pytest.fixture
+def cita(base_datos):
+    paciente = Paciente.crear(Paciente(nombre='Luis', apellido='Pérez', cedula='001-0000001-1'))
+    medico = Medico.crear(Medico(nombre='Ana Ruiz', especialidad='Cardiología'))
+    return Cita.crear(Cita(id_paciente=paciente.id, id_medico=medico.id, fecha_hora=datetime(2030, 1, 7, 9, 0)))
+
+
+def test_editar_muestra_el_paciente_sin_volver_a_buscarlo(cliente, cita, monkeypatch):
+    def no_usar(*args, **kwargs):
+        raise AssertionError("El paciente ya viene con la cita")
+
+    monkeypatch.setattr(PacienteController, 'buscar_paciente_por_id', staticmethod(no_usar))
+    respuesta = cliente.get(f'/citas/editar/{cita.id}')
+    html = respuesta.get_data(as_text=True)
+    assert respuesta.status_code == 200
+    assert 'value="Luis Pérez"' in html
+    assert f'value="{cita.id_paciente}"' in html
+
+
+def test_crear_sin_texto_de_paciente_lo_busca_por_id(cliente, cita):
+    respuesta = cliente.get(f'/citas/crear?id_medico={cita.id_medico}')
+    assert respuesta.status_code == 200
+    # Un POST con errores y solo el ID del paciente recupera su nombre
+    respuesta = cliente.post('/citas/crear', data={'id_paciente': cita.id_paciente, 'id_medico': cita.id_medico})
+    assert 'Luis Pérez (Cédula: 001-0000001-1)' in respuesta.get_data(as_text=True)
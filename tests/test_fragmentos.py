@@ -0,0 +1,28 @@
+from datetime import datetime
+from models.cita import Cita
+from models.medico import Medico
+from models.paciente import Paciente
+from web_controllers import fragmentos
+
+
+def test_listado_se_sirve_de_la_cache_hasta_un_cambio(cliente):
+    paciente = Paciente.crear(Paciente(nombre='Luis', apellido='Pérez', cedula='001-0000001-1'))
+    medico = Medico.crear(Medico(nombre='Ana Ruiz', especialidad='Cardiología'))
+    Cita.crear(Cita(id_paciente=paciente.id, id_medico=medico.id, fecha_hora=datetime(2030, 1, 7, 9, 0)))
+
+    primera = cliente.get('/citas/').get_data(as_text=True)
+    assert cliente.get('/citas/').get_data(as_text=True) == primera
+    assert fragmentos.cache.estadisticas()['aciertos'] == 1
+
+    # Un cambio en cualquiera de las entidades de la tabla cambia la versión
+    paciente.apellido = 'Gómez'
+    Paciente.actualizar(paciente)
+    assert 'Luis Gómez' in cliente.get('/citas/').get_data(as_text=True)
+
+    Cita.crear(Cita(id_paciente=paciente.id, id_medico=medico.id, fecha_hora=datetime(2030, 1, 7, 10, 0)))
+    assert cliente.get('/citas/').get_data(as_text=True).count('/citas/ver/') == 2
+
+
+def test_listado_vacio_no_se_guarda(cliente):
+    assert cliente.get('/pacientes/').status_code == 200
+    assert fragmentos.cache.estadisticas()['entradas'] == 0
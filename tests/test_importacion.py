@@ -0,0 +1,62 @@
+import csv
+from controllers.importacion_controller import ImportacionController
+from models.paciente import Paciente
+
+
+def escribir_pacientes(ruta, cedulas):
+    with open(ruta, 'w', newline='', encoding='utf-8') as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(['nombre', 'apellido', 'cedula', 'fecha_nacimiento', 'email'])
+        for i, cedula in enumerate(cedulas):
+            escritor.writerow([f'Nombre{i}', 'Pérez', cedula, '01-02-1980', ''])
+    return str(ruta)
+
+
+def cedulas_registradas():
+    return Paciente.obtener_cedulas()
+
+
+def test_importa_por_lotes_y_rechaza_duplicados_del_archivo(base_datos, tmp_path):
+    ruta = escribir_pacientes(tmp_path / 'pacientes.csv', ['A', 'B', 'A', 'C'])
+    exito, resumen = ImportacionController.importar('pacientes', ruta, tamano_lote=2)
+    assert exito
+    assert (resumen.leidos, resumen.insertados, resumen.rechazados, resumen.lotes) == (4, 3, 1, 2)
+    assert resumen.errores == [(4, "Ya existe un paciente con la cédula A")]
+    assert cedulas_registradas() == {'A', 'B', 'C'}
+
+
+def test_rechaza_cedulas_ya_registradas(base_datos, tmp_path):
+    Paciente.crear(Paciente(nombre='Luis', apellido='Pérez', cedula='A'))
+    ruta = escribir_pacientes(tmp_path / 'pacientes.csv', ['A', 'B'])
+    exito, resumen = ImportacionController.importar('pacientes', ruta)
+    assert exito
+    assert (resumen.insertados, resumen.rechazados) == (1, 1)
+
+
+def test_lote_descartado_no_reserva_sus_cedulas(base_datos, tmp_path, monkeypatch):
+    # La cédula X se registra después de leer las existentes: el primer lote
+    # falla en la base de datos y se revierte completo
+    Paciente.crear(Paciente(nombre='Luis', apellido='Pérez', cedula='X'))
+    monkeypatch.setattr(Paciente, 'obtener_cedulas', staticmethod(lambda: set()))
+    ruta = escribir_pacientes(tmp_path / 'pacientes.csv', ['A', 'X', 'A', 'B'])
+
+    exito, resumen = ImportacionController.importar('pacientes', ruta, tamano_lote=2)
+    assert exito
+    assert (resumen.insertados, resumen.rechazados, resumen.lotes) == (2, 2, 1)
+    assert resumen.errores[0][0] == '2-3'
+    monkeypatch.undo()
+    assert cedulas_registradas() == {'X', 'A', 'B'}
+
+
+def test_citas_con_referencias_inexistentes_se_rechazan(base_datos, tmp_path):
+    paciente = Paciente.crear(Paciente(nombre='Luis', apellido='Pérez', cedula='A'))
+    ruta = tmp_path / 'citas.jsonl'
+    ruta.write_text(
+        f'{{"id_paciente": {paciente.id}, "id_medico": 99, "fecha_hora": "07-01-2030 09:00"}}\n'
+        'no es json\n',
+        encoding='utf-8'
+    )
+    exito, resumen = ImportacionController.importar('citas', str(ruta))
+    assert exito
+    assert resumen.insertados == 0
+    assert [motivo for _, motivo in resumen.errores] == ["No existe un médico con ID 99", "JSON inválido"]
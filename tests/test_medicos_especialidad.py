@@ -0,0 +1,37 @@
+from config.database import DatabaseConnection
+from models.medico import Medico
+from models.texto import normalizar
+
+
+def test_ordena_por_relevancia_de_especialidad(base_datos):
+    Medico.crear(Medico(nombre='Beatriz Gil', especialidad='Cirugía Cardiovascular'))
+    Medico.crear(Medico(nombre='Ana Ruiz', especialidad='Cardiología'))
+    medicos = Medico.obtener_por_especialidad('cardio')
+    assert [medico.especialidad for medico in medicos] == ['Cardiología', 'Cirugía Cardiovascular']
+
+
+def test_variantes_de_la_especialidad_no_rompen_el_orden(base_datos, monkeypatch):
+    Medico.crear(Medico(nombre='Ana Ruiz', especialidad='Cardiología'))
+    Medico.crear(Medico(nombre='Carlos Díaz', especialidad='CARDIOLOGIA'))
+    # El catálogo leído solo tiene una de las variantes (p. ej. cargado antes del alta)
+    monkeypatch.setattr(Medico, 'buscar_especialidades', staticmethod(lambda texto, limite=None: ['Cardiología']))
+    # Como en SQL Server, la comparación del IN no distingue mayúsculas ni acentos
+    base_datos.get_connection().create_collation(
+        'SIN_ACENTOS', lambda a, b: (normalizar(a) > normalizar(b)) - (normalizar(a) < normalizar(b))
+    )
+    get_cursor = DatabaseConnection.get_cursor
+
+    class Cursor:
+        def __init__(self, cursor):
+            self._cursor = cursor
+
+        def execute(self, query, parametros=()):
+            query = query.replace("WHERE Especialidad IN", "WHERE Especialidad COLLATE SIN_ACENTOS IN")
+            return self._cursor.execute(query, parametros)
+
+        def __getattr__(self, nombre):
+            return getattr(self._cursor, nombre)
+
+    monkeypatch.setattr(DatabaseConnection, 'get_cursor', lambda self: Cursor(get_cursor(self)))
+    medicos = Medico.obtener_por_especialidad('cardiologia')
+    assert [medico.nombre for medico in medicos] == ['Ana Ruiz', 'Carlos Díaz']
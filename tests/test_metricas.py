@@ -0,0 +1,68 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+from config import metricas
+
+
+@pytest.fixture
+def registro(tmp_path, monkeypatch):
+    monkeypatch.setattr(metricas, 'DIRECTORIO', str(tmp_path))
+    monkeypatch.setattr(metricas, '_archivo', None)
+    contador = metricas.Contador('prueba_total', "Prueba", ('codigo',))
+    histograma = metricas.Histograma('prueba_segundos', "Prueba", (), (0.1, 1.0))
+    lectura = metricas.Lectura('prueba_en_uso', "Prueba", (), lambda: [((), 2)])
+    monkeypatch.setattr(metricas, '_registradas', [contador, histograma, lectura])
+    return contador, histograma
+
+
+def pid_terminado():
+    proceso = subprocess.Popen([sys.executable, '-c', 'pass'])
+    proceso.wait()
+    return proceso.pid
+
+
+def volcado_de(directorio, pid, nombre, metricas_worker):
+    with open(os.path.join(directorio, nombre), 'w', encoding='utf-8') as archivo:
+        json.dump({'pid': pid, 'metricas': metricas_worker}, archivo)
+
+
+def test_suma_los_contadores_de_todos_los_workers(registro, tmp_path):
+    contador, histograma = registro
+    contador.incrementar(200)
+    histograma.observar(0.05)
+    otro = {
+        'prueba_total': [[[200], [3]], [[500], [1]]],
+        'prueba_segundos': [[[], [1, 0, 1, 2.5, 2]]],
+        'prueba_en_uso': [[[], 5]],
+    }
+    # Un worker vivo y otro ya reciclado: los dos cuentan en los totales
+    volcado_de(tmp_path, os.getppid(), f'{os.getppid()}-1.json', otro)
+    volcado_de(tmp_path, pid_terminado(), '1-1.json', otro)
+
+    texto = metricas.exponer()
+    assert 'prueba_total{codigo="200"} 7' in texto
+    assert 'prueba_total{codigo="500"} 2' in texto
+    assert 'prueba_segundos_bucket{le="0.1"} 3' in texto
+    assert 'prueba_segundos_count 5' in texto
+    # El estado de cada proceso no se suma: una serie por worker vivo
+    assert f'prueba_en_uso{{worker="{os.getpid()}"}} 2' in texto
+    assert f'prueba_en_uso{{worker="{os.getppid()}"}} 5' in texto
+    assert texto.count('prueba_en_uso{') == 2
+
+
+def test_el_volcado_propio_no_se_cuenta_dos_veces(registro):
+    contador, _ = registro
+    contador.incrementar(200, cantidad=4)
+    metricas.volcar()
+    assert 'prueba_total{codigo="200"} 4' in metricas.exponer()
+
+
+def test_sin_directorio_solo_el_proceso_actual(registro, monkeypatch):
+    contador, _ = registro
+    monkeypatch.setattr(metricas, 'DIRECTORIO', '')
+    contador.incrementar(200)
+    texto = metricas.exponer()
+    assert 'prueba_total{codigo="200"} 1' in texto
+    assert 'prueba_en_uso 2' in texto
@@ -0,0 +1,83 @@
+import base64
+from datetime import datetime, timedelta
+from controllers.cita_controller import CitaController
+from controllers.medico_controller import MedicoController
+from controllers.paciente_controller import PacienteController
+from controllers.paginacion import TAMANO_PAGINA_MAXIMO, codificar_cursor, decodificar_cursor, tamano_pagina
+from models.cita import Cita
+from models.medico import Medico
+from models.paciente import Paciente
+
+
+def recorrer(listar, limite):
+    """Pide páginas hasta la última y devuelve las páginas obtenidas"""
+    paginas = []
+    cursor = None
+    while True:
+        pagina = listar(cursor, limite)
+        paginas.append(pagina)
+        cursor = pagina.siguiente
+        if not cursor:
+            return paginas
+
+
+def test_cursor_ida_y_vuelta():
+    valores = [datetime(2030, 1, 7, 9, 30), 42]
+    assert decodificar_cursor(codificar_cursor(valores)) == ['2030-01-07T09:30:00', 42]
+
+
+def test_cursor_invalido_se_ignora():
+    assert decodificar_cursor(None) is None
+    assert decodificar_cursor('no es un cursor') is None
+    # JSON válido que no es una lista
+    assert decodificar_cursor(base64.urlsafe_b64encode(b'{"id":1}').decode()) is None
+
+
+def test_tamano_de_pagina_acotado():
+    assert tamano_pagina('0') == 1
+    assert tamano_pagina('abc') == tamano_pagina(None)
+    assert tamano_pagina(str(TAMANO_PAGINA_MAXIMO + 1)) == TAMANO_PAGINA_MAXIMO
+
+
+def test_pacientes_con_el_mismo_apellido_no_se_repiten_ni_se_pierden(base_datos):
+    # Apellido y nombre repetidos: el Id desempata en el cursor
+    for i in range(7):
+        Paciente.crear(Paciente(nombre='Luis', apellido='Pérez', cedula=f'C{i}'))
+    Paciente.crear(Paciente(nombre='Ana', apellido='Abad', cedula='C7'))
+
+    paginas = recorrer(PacienteController.listar_pacientes_paginados, 3)
+    ids = [paciente.id for pagina in paginas for paciente in pagina.elementos]
+    assert [len(pagina.elementos) for pagina in paginas] == [3, 3, 2]
+    assert len(set(ids)) == 8
+    assert paginas[0].elementos[0].apellido == 'Abad'
+
+
+def test_medicos_por_nombre(base_datos):
+    for nombre in ('Carla', 'Ana', 'Beatriz', 'Ana'):
+        Medico.crear(Medico(nombre=nombre, especialidad='Pediatría'))
+    paginas = recorrer(MedicoController.listar_medicos_paginados, 2)
+    assert [medico.nombre for pagina in paginas for medico in pagina.elementos] == ['Ana', 'Ana', 'Beatriz', 'Carla']
+
+
+def test_citas_a_la_misma_hora_se_ordenan_por_id(base_datos):
+    paciente = Paciente.crear(Paciente(nombre='Luis', apellido='Pérez', cedula='C1'))
+    medicos = [Medico.crear(Medico(nombre=f'M{i}', especialidad='Pediatría')) for i in range(3)]
+    inicio = datetime(2030, 1, 7, 9, 0)
+    esperadas = []
+    for hora in range(2):
+        for medico in medicos:
+            cita = Cita.crear(Cita(id_paciente=paciente.id, id_medico=medico.id,
+                                   fecha_hora=inicio + timedelta(hours=hora)))
+            esperadas.append(cita.id)
+
+    paginas = recorrer(CitaController.listar_citas_paginadas, 4)
+    assert [cita.id for pagina in paginas for cita in pagina.elementos] == esperadas
+    assert paginas[-1].siguiente is None
+
+
+def test_pagina_exacta_no_tiene_siguiente(base_datos):
+    for i in range(3):
+        Paciente.crear(Paciente(nombre='Luis', apellido='Pérez', cedula=f'C{i}'))
+    pagina = PacienteController.listar_pacientes_paginados(None, 3)
+    assert len(pagina.elementos) == 3
+    assert pagina.siguiente is None
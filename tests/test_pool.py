@@ -0,0 +1,87 @@
+import threading
+import pytest
+from config.pool import ConnectionPool, PoolTimeoutError
+
+
+class ConexionFalsa:
+    """Conexión mínima con los métodos que usa el pool"""
+
+    def __init__(self):
+        self.cerrada = False
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.cerrada = True
+
+
+def crear_pool(**kwargs):
+    return ConnectionPool(ConexionFalsa, health_check=lambda conexion: None, **kwargs)
+
+
+def test_reutiliza_la_conexion_liberada():
+    pool = crear_pool(max_size=2)
+    conexion = pool.acquire()
+    pool.release(conexion)
+    assert pool.acquire() is conexion
+    assert conexion.rollbacks == 1
+
+
+def test_agotado_con_timeout_cero_lanza_pool_timeout():
+    pool = crear_pool(max_size=1, timeout=0)
+    pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    estadisticas = pool.estadisticas()
+    assert estadisticas['agotadas'] == 1
+    assert estadisticas['esperas'] == 0
+    assert estadisticas['tiempo_espera'] == 0.0
+
+
+def test_agotado_tras_esperar_cuenta_la_espera():
+    pool = crear_pool(max_size=1, timeout=0.05)
+    pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    estadisticas = pool.estadisticas()
+    assert estadisticas['agotadas'] == 1
+    assert estadisticas['esperas'] == 1
+    assert estadisticas['tiempo_espera'] > 0
+
+
+def test_agotado_tras_descartar_una_conexion_fallida():
+    # La conexión libre no pasa la verificación: se descarta, se reintenta y
+    # la nueva espera termina sin conexión
+    fallos = []
+
+    def verificar(conexion):
+        if not fallos:
+            fallos.append(conexion)
+            raise Exception("conexión caída")
+
+    pool = ConnectionPool(ConexionFalsa, max_size=1, timeout=0, ping_after=0, health_check=verificar)
+    pool.release(pool.acquire())
+    ocupada = pool.acquire()
+    assert fallos[0].cerrada
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    pool.release(ocupada)
+
+
+def test_espera_hasta_que_se_libera_una_conexion():
+    pool = crear_pool(max_size=1, timeout=5)
+    conexion = pool.acquire()
+    threading.Timer(0.05, pool.release, (conexion,)).start()
+    assert pool.acquire() is conexion
+    assert pool.estadisticas()['esperas'] == 1
+
+
+def test_descartar_libera_el_espacio():
+    pool = crear_pool(max_size=1, timeout=0)
+    conexion = pool.acquire()
+    pool.release(conexion, discard=True)
+    assert conexion.cerrada
+    assert pool.acquire() is not conexion
+    assert pool.estadisticas()['abiertas'] == 1
@@ -0,0 +1,96 @@
+import threading
+from datetime import datetime, timedelta
+import pytest
+from config.database import DatabaseConnection
+from controllers.cita_controller import CitaController
+from models.cita import Cita, HorarioOcupado
+from models.medico import Medico
+from models.paciente import Paciente
+
+
+def manana(hora):
+    dia = datetime.combine(datetime.now().date() + timedelta(days=1), datetime.min.time())
+    return dia + timedelta(hours=hora)
+
+
+@pytest.fixture
+def medico(base_datos):
+    return Medico.crear(Medico(nombre='Ana Ruiz', especialidad='Cardiología'))
+
+
+@pytest.fixture
+def paciente(base_datos):
+    return Paciente.crear(Paciente(nombre='Luis', apellido='Pérez', cedula='001-0000001-1'))
+
+
+def nueva_cita(paciente, medico, fecha_hora):
+    return Cita(id_paciente=paciente.id, id_medico=medico.id, fecha_hora=fecha_hora)
+
+
+def test_rechaza_una_cita_que_se_solapa(paciente, medico):
+    cita = Cita.crear(nueva_cita(paciente, medico, manana(9)))
+    exito, mensaje = CitaController.crear_cita(
+        paciente.id, medico.id, (manana(9) + timedelta(minutes=15)).strftime('%d-%m-%Y %H:%M')
+    )
+    assert not exito
+    assert mensaje == f"El médico ya tiene una cita a las {manana(9).strftime('%d-%m-%Y %H:%M')} (ID {cita.id})"
+
+
+def test_modificar_hacia_un_horario_ocupado_se_rechaza(paciente, medico):
+    ocupada = Cita.crear(nueva_cita(paciente, medico, manana(9)))
+    cita = Cita.crear(nueva_cita(paciente, medico, manana(11)))
+    exito, mensaje = CitaController.actualizar_cita(
+        cita.id, paciente.id, medico.id, manana(9).strftime('%d-%m-%Y %H:%M')
+    )
+    assert not exito
+    assert f"(ID {ocupada.id})" in mensaje
+    assert CitaController.actualizar_cita(
+        cita.id, paciente.id, medico.id, manana(11).strftime('%d-%m-%Y %H:%M'), 'Control'
+    )[0]
+
+
+def test_reservas_simultaneas_del_mismo_horario(paciente, medico):
+    hilos = 6
+    barrera = threading.Barrier(hilos)
+    resultados = []
+
+    def reservar():
+        barrera.wait()
+        try:
+            resultados.append(CitaController.crear_cita(
+                paciente.id, medico.id, manana(9).strftime('%d-%m-%Y %H:%M')
+            )[0])
+        finally:
+            # La conexión del hilo vuelve al pool al terminar
+            DatabaseConnection().release()
+
+    trabajadores = [threading.Thread(target=reservar) for _ in range(hilos)]
+    for trabajador in trabajadores:
+        trabajador.start()
+    for trabajador in trabajadores:
+        trabajador.join()
+
+    assert sorted(resultados) == [False] * (hilos - 1) + [True]
+    assert len(Cita.obtener_por_medico(medico.id)) == 1
+
+
+def test_el_indice_unico_se_traduce_a_horario_ocupado(paciente, medico, monkeypatch):
+    cita = Cita.crear(nueva_cita(paciente, medico, manana(9)))
+    # Simula una comprobación que no vio la otra cita: decide el índice único
+    monkeypatch.setattr(Cita, '_verificar_horario', staticmethod(lambda cita: None))
+    with pytest.raises(HorarioOcupado) as error:
+        Cita.crear(nueva_cita(paciente, medico, manana(9)))
+    assert error.value.conflicto.id == cita.id
+
+
+def test_el_lote_no_admite_dos_citas_a_la_misma_hora(base_datos, paciente, medico):
+    with pytest.raises(base_datos.backend.errores_integridad):
+        Cita.crear_lote([nueva_cita(paciente, medico, manana(9)), nueva_cita(paciente, medico, manana(9))])
+    assert Cita.obtener_por_medico(medico.id) == []
+
+
+def test_la_cita_creada_lleva_su_paciente_y_su_medico(paciente, medico):
+    exito, cita = CitaController.crear_cita(paciente.id, medico.id, manana(9).strftime('%d-%m-%Y %H:%M'))
+    assert exito
+    assert (cita.paciente.nombre, cita.medico.nombre) == ('Luis', 'Ana Ruiz')
+    assert 'Luis Pérez con Dr(a). Ana Ruiz' in str(cita)
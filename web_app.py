@@ -1,71 +1,228 @@
-from flask import Flask, render_template, redirect, url_for
+from flask import Flask, Response, render_template, redirect, url_for, g, request
 import os
+import time
 from dotenv import load_dotenv
+from config import instrumentacion, metricas
+from config.async_database import AsyncDatabaseConnection
 from config.database import DatabaseConnection
+from models import cache_entidades
 
 # Importar controladores web
 from web_controllers.paciente_routes import paciente_bp
 from web_controllers.medico_routes import medico_bp
 from web_controllers.cita_routes import cita_bp
+from web_controllers.api_routes import api_bp
+from web_controllers.admin_routes import admin_bp
+from web_controllers import arranque, fragmentos, perfilado
 
 # Cargar variables de entorno
 load_dotenv()
 
-app = Flask(__name__)
-app.secret_key = os.getenv('SECRET_KEY', 'clave_secreta_para_clinica_mvc')
-
-# Inicializar conexión a la base de datos
-try:
-    db = DatabaseConnection()
-    print("Conexión a la base de datos establecida para la aplicación web.")
-except Exception as e:
-    print(f"Error al conectar con la base de datos: {e}")
-    print("Verifique su archivo .env con las credenciales de conexión")
-    exit(1)
-
-# Registrar blueprints
-app.register_blueprint(paciente_bp, url_prefix='/pacientes')
-app.register_blueprint(medico_bp, url_prefix='/medicos')
-app.register_blueprint(cita_bp, url_prefix='/citas')
-
-@app.route('/')
-def index():
-    """Página principal"""
-    return render_template('index.html')
-
-@app.errorhandler(404)
-def page_not_found(e):
-    """Manejo de errores 404"""
-    return render_template('404.html'), 404
-
-@app.context_processor
-def utility_processor():
-    """Funciones de utilidad para las plantillas"""
-    def format_date(date):
-        """Formatea fecha para mostrar"""
-        if date:
-            return date.strftime('%d-%m-%Y')
-        return ""
-        
-    def format_datetime(datetime):
-        """Formatea fecha y hora para mostrar"""
-        if datetime:
-            return datetime.strftime('%d-%m-%Y %H:%M')
-        return ""
-    
-    return dict(
-        format_date=format_date,
-        format_datetime=format_datetime
-    )
-
-# Manejo de errores de base de datos
-@app.errorhandler(Exception)
-def handle_exception(e):
-    """Manejo general de excepciones"""
-    print(f"Error: {e}")
-    return render_template('error.html', error=str(e)), 500
+
+def _estado_pools():
+    """Estado de los pools abiertos en este proceso, síncrono y asíncrono"""
+    for nombre, db in (('sync', DatabaseConnection.actual()), ('async', AsyncDatabaseConnection._instance)):
+        if db is not None:
+            yield nombre, db.pool.estadisticas()
+
+
+metricas.registrar(metricas.Lectura(
+    'clinica_bd_pool_conexiones', "Conexiones del pool por estado", ('pool', 'estado'),
+    lambda: [((nombre, estado), estadisticas[estado])
+             for nombre, estadisticas in _estado_pools()
+             for estado in ('abiertas', 'en_uso', 'libres', 'maximo')]
+))
+metricas.registrar(metricas.Lectura(
+    'clinica_bd_pool_esperas_total', "Veces que una petición tuvo que esperar una conexión libre", ('pool',),
+    lambda: [((nombre,), estadisticas.get('esperas', 0)) for nombre, estadisticas in _estado_pools()],
+    tipo='counter'
+))
+metricas.registrar(metricas.Lectura(
+    'clinica_bd_pool_agotado_total', "Esperas por una conexión que terminaron sin conseguirla", ('pool',),
+    lambda: [((nombre,), estadisticas.get('agotadas', 0)) for nombre, estadisticas in _estado_pools()],
+    tipo='counter'
+))
+metricas.registrar(metricas.Lectura(
+    'clinica_cache_operaciones_total', "Lecturas y cambios de la caché de pacientes y médicos", ('resultado',),
+    lambda: [((clave,), valor) for clave, valor in cache_entidades.cache.estadisticas().items()
+             if clave in ('aciertos', 'fallos', 'desalojos', 'invalidaciones')],
+    tipo='counter'
+))
+metricas.registrar(metricas.Lectura(
+    'clinica_cache_entradas', "Entradas en la caché de pacientes y médicos", (),
+    lambda: [((), cache_entidades.cache.estadisticas()['entradas'])]
+))
+metricas.registrar(metricas.Lectura(
+    'clinica_fragmentos_operaciones_total', "Lecturas de la caché de tablas de los listados", ('resultado',),
+    lambda: [((clave,), valor) for clave, valor in fragmentos.cache.estadisticas().items()
+             if clave in ('aciertos', 'fallos', 'desalojos')],
+    tipo='counter'
+))
+metricas.registrar(metricas.Lectura(
+    'clinica_fragmentos_bytes', "Memoria ocupada por la caché de tablas de los listados", (),
+    lambda: [((), fragmentos.cache.estadisticas()['bytes'])]
+))
+metricas.registrar(metricas.Lectura(
+    'clinica_fragmentos_ahorro_segundos_total', "Tiempo de renderizado evitado por los aciertos de la caché de tablas", (),
+    lambda: [((), fragmentos.estadisticas()['segundos_ahorrados'])],
+    tipo='counter'
+))
+
+
+def create_app(config=None):
+    """
+    Crea y configura la aplicación web
+
+    No abre conexiones a la base de datos: el pool se crea en la primera petición
+    de cada proceso, de modo que los servidores pre-fork (gunicorn con
+    preload_app) no comparten conexiones entre workers.
+
+    Args:
+        config (dict, opcional): Valores que sobrescriben la configuración
+
+    Returns:
+        Flask: La aplicación
+    """
+    app = Flask(__name__)
+    # Plantillas compiladas en disco, compartidas entre procesos y reinicios
+    arranque.configurar_bytecode(app)
+    app.secret_key = os.getenv('SECRET_KEY', 'clave_secreta_para_clinica_mvc')
+    if config:
+        app.config.update(config)
+
+    # Registrar blueprints
+    app.register_blueprint(paciente_bp, url_prefix='/pacientes')
+    app.register_blueprint(medico_bp, url_prefix='/medicos')
+    app.register_blueprint(cita_bp, url_prefix='/citas')
+    app.register_blueprint(api_bp, url_prefix='/api/v1')
+
+    # Perfilado bajo demanda (PERFIL_TOKEN o PERFIL_MUESTREO); desactivado no se instala
+    if perfilado.HABILITADO:
+        app.wsgi_app = perfilado.MiddlewarePerfilado(app.wsgi_app)
+    # Los perfiles y el estado de las cachés solo se pueden consultar con un token configurado
+    if perfilado.TOKEN:
+        app.register_blueprint(admin_bp, url_prefix=perfilado.RUTA_ADMIN)
+
+    @app.route('/')
+    def index():
+        """Página principal"""
+        return render_template('index.html')
+
+    @app.route('/metrics')
+    def exponer_metricas():
+        """Métricas de este proceso en el formato de exposición de Prometheus"""
+        return Response(metricas.exponer(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+    @app.before_request
+    def iniciar_cronometro():
+        """Marca el inicio de la petición para el histograma de latencias"""
+        g.inicio_peticion = time.perf_counter()
+
+    @app.after_request
+    def medir_peticion(respuesta):
+        """Registra la duración y el código de la respuesta por ruta"""
+        inicio = g.pop('inicio_peticion', None)
+        if inicio is not None:
+            ruta = request.endpoint or 'desconocida'
+            metricas.peticiones.observar(time.perf_counter() - inicio, ruta, request.method)
+            metricas.respuestas.incrementar(ruta, respuesta.status_code)
+        return respuesta
+
+    @app.errorhandler(404)
+    def page_not_found(e):
+        """Manejo de errores 404"""
+        return render_template('404.html'), 404
+
+    if instrumentacion.HABILITADA:
+        @app.before_request
+        def iniciar_medicion():
+            """Empieza a contar las consultas de la petición"""
+            g.consultas, g.token_consultas = instrumentacion.iniciar(f"{request.method} {request.path}")
+
+        @app.after_request
+        def cabecera_server_timing(respuesta):
+            """Publica el tiempo en base de datos de la petición en Server-Timing"""
+            registro = g.get('consultas')
+            if registro is not None:
+                respuesta.headers.add('Server-Timing', registro.server_timing())
+                # La medición se cierra al terminar de enviar la respuesta, así que
+                # incluye las consultas de las respuestas enviadas por partes
+                token = g.pop('token_consultas')
+                respuesta.call_on_close(lambda: instrumentacion.finalizar(token))
+            return respuesta
+
+        @app.teardown_request
+        def terminar_medicion(exception=None):
+            """Cierra la medición si la petición terminó sin pasar por after_request"""
+            token = g.pop('token_consultas', None)
+            if token is not None:
+                instrumentacion.finalizar(token)
+
+    @app.teardown_appcontext
+    def liberar_conexion(exception=None):
+        """Devuelve al pool la conexión usada durante la petición"""
+        db = DatabaseConnection.actual()
+        if db is not None:
+            db.release()
+
+    @app.context_processor
+    def utility_processor():
+        """Funciones de utilidad para las plantillas"""
+        def format_date(date):
+            """Formatea fecha para mostrar"""
+            if date:
+                return date.strftime('%d-%m-%Y')
+            return ""
+
+        def format_datetime(datetime):
+            """Formatea fecha y hora para mostrar"""
+            if datetime:
+                return datetime.strftime('%d-%m-%Y %H:%M')
+            return ""
+
+        return dict(
+            format_date=format_date,
+            format_datetime=format_datetime
+        )
+
+    # Manejo de errores de base de datos
+    @app.errorhandler(Exception)
+    def handle_exception(e):
+        """Manejo general de excepciones"""
+        print(f"Error: {e}")
+        metricas.errores.incrementar(request.endpoint or 'desconocida', type(e).__name__)
+        return render_template('error.html', error=str(e)), 500
+
+    @app.cli.command('compilar-plantillas')
+    def compilar_plantillas():
+        """Compila todas las plantillas en la caché de disco (paso de despliegue)"""
+        cantidad, segundos = arranque.precompilar_plantillas(app)
+        destino = app.jinja_env.bytecode_cache.directory if app.jinja_env.bytecode_cache else 'memoria'
+        print(f"{cantidad} plantillas compiladas en {segundos * 1000:.0f} ms ({destino})")
+
+    return app
+
+
+def cerrar_conexiones():
+    """Cierra el pool del proceso actual, si llegó a abrirse (p. ej. al detener un worker)"""
+    db = DatabaseConnection.actual()
+    if db is not None:
+        db.close()
+
+
+# Aplicación por defecto, para 'flask run' y para quien importe web_app.app
+app = create_app()
 
 if __name__ == '__main__':
+    # En desarrollo se conecta de inmediato para detectar errores de configuración
+    try:
+        DatabaseConnection()
+        print("Conexión a la base de datos establecida para la aplicación web.")
+    except Exception as e:
+        print(f"Error al conectar con la base de datos: {e}")
+        print("Verifique su archivo .env con las credenciales de conexión")
+        exit(1)
+
     try:
         print("Iniciando aplicación web MVC para Clínica...")
         app.run(debug=True)
@@ -74,6 +231,5 @@ if __name__ == '__main__':
     except Exception as e:
         print(f"\nError inesperado: {e}")
     finally:
-        if 'db' in locals():
-            db.close()
-            print("Conexión a la base de datos cerrada correctamente.")
\ No newline at end of file
+        cerrar_conexiones()
+        print("Conexión a la base de datos cerrada correctamente.")
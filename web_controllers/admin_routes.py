@@ -0,0 +1,65 @@
+from flask import Blueprint, jsonify, render_template, request, send_file
+from controllers.perfil_controller import PerfilController, ORDENES
+from models import cache_entidades
+from web_controllers import fragmentos
+from web_controllers.perfilado import token_valido
+
+admin_bp = Blueprint('admin', __name__)
+
+
+@admin_bp.before_request
+def verificar_token():
+    """
+    Las páginas de administración exigen PERFIL_TOKEN en la cabecera X-Perfilar
+
+    Sin token configurado se deniega siempre. No se acepta en la URL, donde
+    quedaría en los registros de acceso y en la cabecera Referer.
+    """
+    if not token_valido(request.headers.get('X-Perfilar')):
+        return render_template('error.html', error="Acceso no autorizado"), 403
+
+
+@admin_bp.route('/perfiles')
+def listar_perfiles():
+    """Vista para listar los perfiles capturados"""
+    perfiles = PerfilController.listar_perfiles()
+    return render_template('admin/perfiles.html', perfiles=perfiles)
+
+
+@admin_bp.route('/perfiles/<nombre>')
+def ver_perfil(nombre):
+    """Vista con el resumen de un perfil (?orden=cumulative|tottime|ncalls)"""
+    perfil = PerfilController.obtener_perfil(nombre)
+    if perfil is None:
+        return render_template('404.html'), 404
+    datos, ruta = perfil
+    if datos.get('motor') == 'pyinstrument':
+        # pyinstrument genera su propia página interactiva
+        return send_file(ruta, mimetype='text/html')
+    orden = request.args.get('orden', 'cumulative')
+    exito, resumen = PerfilController.resumir_perfil(ruta, orden)
+    return render_template(
+        'admin/perfil.html', perfil=datos, exito=exito, resumen=resumen,
+        orden=orden, ordenes=ORDENES
+    )
+
+
+@admin_bp.route('/perfiles/<nombre>/descargar')
+def descargar_perfil(nombre):
+    """Descarga el archivo del perfil (.prof para snakeviz o pstats)"""
+    perfil = PerfilController.obtener_perfil(nombre)
+    if perfil is None:
+        return render_template('404.html'), 404
+    return send_file(perfil[1], as_attachment=True)
+
+
+@admin_bp.route('/estado/cache')
+def estado_cache():
+    """Contadores de la caché de pacientes y médicos"""
+    return jsonify(cache_entidades.cache.estadisticas())
+
+
+@admin_bp.route('/estado/fragmentos')
+def estado_fragmentos():
+    """Contadores de la caché de tablas de los listados y tiempo de renderizado ahorrado"""
+    return jsonify(fragmentos.estadisticas())
@@ -0,0 +1,129 @@
+import asyncio
+import contextlib
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+from werkzeug.http import parse_etags
+from config.async_database import AsyncDatabaseConnection
+from controllers.paciente_controller import PacienteController
+from controllers.medico_controller import MedicoController
+from controllers.cita_controller import CitaController
+from web_controllers.api_routes import (
+    CAMPOS_PACIENTE, CAMPOS_MEDICO, CAMPOS_CITA, CACHE_CONTROL, ERROR_INFORME_INCOMPLETO,
+    seleccionar_campos, calcular_etag, json_compacto
+)
+
+# Manejadores asíncronos de la API para el modo ASGI (asgi.py). Responden igual que
+# los de api_routes, con las mismas ETag, de modo que un cliente puede revalidar
+# contra cualquiera de los dos modos.
+
+
+def _json(datos, estado=200):
+    """Respuesta JSON compacta"""
+    return Response(json_compacto(datos), status_code=estado, media_type='application/json')
+
+
+def _error(mensaje, estado):
+    """Respuesta de error con el mensaje en JSON"""
+    return _json({'error': mensaje}, estado)
+
+
+async def _elemento(request, endpoint, version, cargar, disponibles, no_encontrado):
+    """Igual que api_routes._elemento: se lee primero la versión y solo después los datos"""
+    id = request.path_params['id']
+    campos, error = seleccionar_campos(request.query_params.get('campos'), disponibles)
+    if error:
+        return _error(error, 400)
+    actual = await version(id)
+    if actual is None:
+        return _error(no_encontrado.format(id=id), 404)
+
+    etag = calcular_etag(endpoint, id, campos, actual)
+    if etag in parse_etags(request.headers.get('if-none-match')):
+        respuesta = Response(status_code=304)
+    else:
+        elemento = await cargar(id)
+        if elemento is None:
+            return _error(no_encontrado.format(id=id), 404)
+        respuesta = _json({campo: disponibles[campo](elemento) for campo in campos})
+    respuesta.headers['ETag'] = f'"{etag}"'
+    respuesta.headers['Cache-Control'] = CACHE_CONTROL
+    return respuesta
+
+
+async def ver_paciente(request):
+    """Un paciente (?campos)"""
+    return await _elemento(
+        request, 'api_v1.ver_paciente',
+        PacienteController.obtener_version_paciente_async, PacienteController.buscar_paciente_por_id_async,
+        CAMPOS_PACIENTE, "No se encontró el paciente con ID {id}"
+    )
+
+
+async def ver_medico(request):
+    """Un médico (?campos)"""
+    return await _elemento(
+        request, 'api_v1.ver_medico',
+        MedicoController.obtener_version_medico_async, MedicoController.buscar_medico_por_id_async,
+        CAMPOS_MEDICO, "No se encontró el médico con ID {id}"
+    )
+
+
+async def ver_cita(request):
+    """Una cita con el nombre de su paciente y de su médico (?campos)"""
+    return await _elemento(
+        request, 'api_v1.ver_cita',
+        CitaController.obtener_version_cita_async, CitaController.buscar_cita_por_id_async,
+        CAMPOS_CITA, "No se encontró la cita con ID {id}"
+    )
+
+
+async def citas_por_fecha(request):
+    """
+    Informe de citas de un rango de fechas, enviado por partes
+
+    Cada lote se lee sin ocupar un hilo y entre lotes se atienden otras peticiones.
+    Los informes simultáneos están limitados para que las consultas rápidas
+    siempre encuentren conexiones libres en el pool.
+    """
+    fecha_inicio = request.query_params.get('fecha_inicio', '')
+    fecha_fin = request.query_params.get('fecha_fin')
+    if CitaController._rango_fechas(fecha_inicio, fecha_fin) is None:
+        return _error("Formato de fecha incorrecto. Use DD-MM-YYYY", 400)
+    campos, error = seleccionar_campos(request.query_params.get('campos'), CAMPOS_CITA)
+    if error:
+        return _error(error, 400)
+    getters = [(campo, CAMPOS_CITA[campo]) for campo in campos]
+
+    def serializar(lote):
+        return ','.join(json_compacto({campo: obtener(cita) for campo, obtener in getters}) for cita in lote)
+
+    async def fragmentos():
+        separador = ''
+        error = None
+        yield '{"datos":['
+        try:
+            async with AsyncDatabaseConnection().informes:
+                lotes = CitaController.iterar_citas_por_fecha_async(fecha_inicio, fecha_fin)
+                async with contextlib.aclosing(lotes):
+                    async for lote in lotes:
+                        # Igual que la conversión de filas, la serialización no ocupa el bucle de eventos
+                        yield separador + await asyncio.to_thread(serializar, lote)
+                        separador = ','
+        except Exception as e:
+            # Las cabeceras ya se enviaron: se cierra el documento indicando que está incompleto
+            print(f"Error al enviar el informe de citas: {e}")
+            error = ERROR_INFORME_INCOMPLETO
+        if error:
+            yield '],"error":' + json_compacto(error) + '}'
+        else:
+            yield ']}'
+
+    return StreamingResponse(fragmentos(), media_type='application/json')
+
+
+rutas = [
+    Route('/api/v1/pacientes/{id:int}', ver_paciente),
+    Route('/api/v1/medicos/{id:int}', ver_medico),
+    Route('/api/v1/citas/fecha', citas_por_fecha),
+    Route('/api/v1/citas/{id:int}', ver_cita),
+]
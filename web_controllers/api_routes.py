@@ -0,0 +1,312 @@
+import hashlib
+import json
+from flask import Blueprint, Response, request, stream_with_context, url_for
+from werkzeug.exceptions import HTTPException
+from config import metricas
+from controllers.paciente_controller import PacienteController
+from controllers.medico_controller import MedicoController
+from controllers.cita_controller import CitaController
+from web_controllers.streaming import LecturaPorPartes
+
+api_bp = Blueprint('api_v1', __name__)
+
+# Los clientes revalidan siempre; con la ETag la revalidación cuesta una respuesta 304 vacía
+CACHE_CONTROL = 'private, no-cache'
+# Elementos que se serializan juntos en cada fragmento de un informe
+ELEMENTOS_POR_FRAGMENTO = 500
+# Mensajes de error para el cliente; el detalle solo va al registro del servidor
+ERROR_INTERNO = "Error interno del servidor"
+ERROR_INFORME_INCOMPLETO = "Error al leer los datos; el informe está incompleto"
+
+
+def _fecha(valor):
+    """Fechas en ISO 8601; el resto de valores sin cambios"""
+    return valor.isoformat() if hasattr(valor, 'isoformat') else valor
+
+
+# Campos publicados de cada recurso y cómo se obtienen del modelo
+CAMPOS_PACIENTE = {
+    'id': lambda p: p.id,
+    'nombre': lambda p: p.nombre,
+    'apellido': lambda p: p.apellido,
+    'cedula': lambda p: p.cedula,
+    'fecha_nacimiento': lambda p: _fecha(p.fecha_nacimiento),
+    'email': lambda p: p.email,
+}
+
+CAMPOS_MEDICO = {
+    'id': lambda m: m.id,
+    'nombre': lambda m: m.nombre,
+    'especialidad': lambda m: m.especialidad,
+    'email': lambda m: m.email,
+}
+
+# Los nombres coinciden con las columnas de la exportación e importación de citas
+CAMPOS_CITA = {
+    'id': lambda c: c.id,
+    'fecha_hora': lambda c: _fecha(c.fecha_hora),
+    'id_paciente': lambda c: c.id_paciente,
+    'paciente': lambda c: f"{c.paciente.nombre} {c.paciente.apellido}" if c.paciente else None,
+    'id_medico': lambda c: c.id_medico,
+    'medico': lambda c: c.medico.nombre if c.medico else None,
+    'especialidad': lambda c: c.medico.especialidad if c.medico else None,
+    'motivo': lambda c: c.motivo,
+}
+
+
+def version_cita(cita):
+    """La cita incluye datos de su paciente y su médico, así que su ETag depende de las tres filas"""
+    return (
+        cita.version,
+        cita.paciente.version if cita.paciente else None,
+        cita.medico.version if cita.medico else None,
+    )
+
+
+def _error(mensaje, estado):
+    """Respuesta de error con el mensaje en JSON"""
+    return _json({'error': mensaje}, estado)
+
+
+def json_compacto(datos):
+    """Serialización compacta: sin espacios y sin escapar los caracteres no ASCII"""
+    return json.dumps(datos, ensure_ascii=False, separators=(',', ':'))
+
+
+def _json(datos, estado=200):
+    """Respuesta JSON compacta"""
+    return Response(json_compacto(datos), status=estado, mimetype='application/json')
+
+
+def _campos(disponibles):
+    """Lee la selección de campos de la petición (?campos=id,nombre)"""
+    return seleccionar_campos(request.args.get('campos', ''), disponibles)
+
+
+def seleccionar_campos(texto, disponibles):
+    """
+    Valida una selección de campos separados por comas
+
+    Returns:
+        tuple: (campos pedidos en orden, mensaje de error o None)
+    """
+    texto = (texto or '').strip()
+    if not texto:
+        return tuple(disponibles), None
+    campos = tuple(dict.fromkeys(campo.strip() for campo in texto.split(',') if campo.strip()))
+    desconocidos = [campo for campo in campos if campo not in disponibles]
+    if desconocidos:
+        return None, f"Campo desconocido: {', '.join(desconocidos)}. Use {', '.join(disponibles)}"
+    return campos, None
+
+
+def calcular_etag(*partes):
+    """ETag fuerte a partir de las versiones de fila y de todo lo que cambia la representación"""
+    return hashlib.blake2b(repr(('v1',) + partes).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _condicional(etag, generar):
+    """
+    Responde 304 si el cliente ya tiene esta representación; si no, serializa
+
+    Args:
+        etag (str): ETag de la representación actual
+        generar (callable): Devuelve la respuesta completa; no se llama en el caso 304
+    """
+    if etag in request.if_none_match:
+        respuesta = Response(status=304)
+    else:
+        respuesta = generar()
+    respuesta.set_etag(etag)
+    respuesta.headers['Cache-Control'] = CACHE_CONTROL
+    return respuesta
+
+
+def fragmentos_json(lotes, campos, disponibles, error=None):
+    """
+    Serializa un listado largo por fragmentos: {"datos":[...]}
+
+    Args:
+        lotes (iterable): Listas de elementos, en orden
+        campos (tuple): Campos seleccionados
+        disponibles (dict): Campos del recurso y cómo se obtienen
+        error (callable, opcional): Se llama al terminar los lotes; si devuelve un
+            mensaje, el documento se cierra con {"datos":[...],"error":"..."}
+
+    Yields:
+        str: Fragmentos del documento JSON (siempre un documento válido)
+    """
+    getters = [(campo, disponibles[campo]) for campo in campos]
+    separador = ''
+    yield '{"datos":['
+    for lote in lotes:
+        if lote:
+            yield separador + ','.join(
+                json_compacto({campo: obtener(elemento) for campo, obtener in getters}) for elemento in lote
+            )
+            separador = ','
+    mensaje = error() if error else None
+    if mensaje:
+        yield '],"error":' + json_compacto(mensaje) + '}'
+    else:
+        yield ']}'
+
+
+def _por_lotes(elementos, tamano=ELEMENTOS_POR_FRAGMENTO):
+    """Agrupa un iterador en listas de como máximo 'tamano' elementos"""
+    lote = []
+    for elemento in elementos:
+        lote.append(elemento)
+        if len(lote) >= tamano:
+            yield lote
+            lote = []
+    yield lote
+
+
+def _listado(pagina, disponibles, version):
+    """Respuesta de una página de resultados con selección de campos, ETag y enlace a la siguiente"""
+    campos, error = _campos(disponibles)
+    if error:
+        return _error(error, 400)
+    etag = calcular_etag(
+        request.endpoint, campos, pagina.siguiente,
+        [(elemento.id, version(elemento)) for elemento in pagina.elementos]
+    )
+    getters = [(campo, disponibles[campo]) for campo in campos]
+
+    def generar():
+        respuesta = _json({
+            'datos': [{campo: obtener(elemento) for campo, obtener in getters} for elemento in pagina.elementos],
+            'siguiente': pagina.siguiente,
+        })
+        if pagina.siguiente:
+            siguiente = url_for(
+                request.endpoint, cursor=pagina.siguiente, limite=request.args.get('limite'),
+                campos=request.args.get('campos'), _external=True
+            )
+            respuesta.headers['Link'] = f'<{siguiente}>; rel="next"'
+        return respuesta
+
+    return _condicional(etag, generar)
+
+
+def _elemento(id, version, cargar, disponibles, no_encontrado):
+    """
+    Respuesta de un elemento: primero se lee solo su versión y, si el cliente
+    no la tiene, se cargan y serializan los datos
+
+    La versión se lee antes que los datos, así que la ETag nunca es más nueva que
+    el cuerpo; en el peor caso el cliente recibe un 200 de más.
+    """
+    campos, error = _campos(disponibles)
+    if error:
+        return _error(error, 400)
+    actual = version(id)
+    if actual is None:
+        return _error(no_encontrado, 404)
+
+    def generar():
+        elemento = cargar(id)
+        if elemento is None:
+            return _error(no_encontrado, 404)
+        return _json({campo: disponibles[campo](elemento) for campo in campos})
+
+    return _condicional(calcular_etag(request.endpoint, id, campos, actual), generar)
+
+
+@api_bp.route('/pacientes')
+def listar_pacientes():
+    """Página de pacientes ordenados por apellido y nombre (?cursor, ?limite, ?campos)"""
+    pagina = PacienteController.listar_pacientes_paginados(
+        request.args.get('cursor'), request.args.get('limite'), con_version=True
+    )
+    return _listado(pagina, CAMPOS_PACIENTE, lambda paciente: paciente.version)
+
+
+@api_bp.route('/pacientes/<int:id>')
+def ver_paciente(id):
+    """Un paciente (?campos)"""
+    return _elemento(
+        id, PacienteController.obtener_version_paciente,
+        lambda id: PacienteController.buscar_paciente_por_id(id, usar_cache=False),
+        CAMPOS_PACIENTE, f"No se encontró el paciente con ID {id}"
+    )
+
+
+@api_bp.route('/medicos')
+def listar_medicos():
+    """Página de médicos ordenados por nombre (?cursor, ?limite, ?campos)"""
+    pagina = MedicoController.listar_medicos_paginados(
+        request.args.get('cursor'), request.args.get('limite'), con_version=True
+    )
+    return _listado(pagina, CAMPOS_MEDICO, lambda medico: medico.version)
+
+
+@api_bp.route('/medicos/<int:id>')
+def ver_medico(id):
+    """Un médico (?campos)"""
+    return _elemento(
+        id, MedicoController.obtener_version_medico,
+        lambda id: MedicoController.buscar_medico_por_id(id, usar_cache=False),
+        CAMPOS_MEDICO, f"No se encontró el médico con ID {id}"
+    )
+
+
+@api_bp.route('/citas')
+def listar_citas():
+    """Página de citas ordenadas por fecha (?cursor, ?limite, ?campos)"""
+    pagina = CitaController.listar_citas_paginadas(
+        request.args.get('cursor'), request.args.get('limite'), con_version=True
+    )
+    return _listado(pagina, CAMPOS_CITA, version_cita)
+
+
+@api_bp.route('/citas/fecha')
+def citas_por_fecha():
+    """
+    Informe de citas de un rango de fechas (?fecha_inicio, ?fecha_fin en DD-MM-YYYY, ?campos)
+
+    Se envía por partes a medida que se leen las filas y no lleva ETag. La
+    primera fila se lee antes de responder, así que un error inicial de la
+    consulta es un 500 en JSON; uno a mitad del envío cierra el documento con
+    un miembro "error".
+    """
+    fecha_inicio = request.args.get('fecha_inicio', '')
+    fecha_fin = request.args.get('fecha_fin')
+    if CitaController._rango_fechas(fecha_inicio, fecha_fin) is None:
+        return _error("Formato de fecha incorrecto. Use DD-MM-YYYY", 400)
+    campos, error = _campos(CAMPOS_CITA)
+    if error:
+        return _error(error, 400)
+    citas = LecturaPorPartes(CitaController.iterar_citas_por_fecha(fecha_inicio, fecha_fin))
+    return Response(
+        stream_with_context(fragmentos_json(
+            _por_lotes(citas), campos, CAMPOS_CITA,
+            lambda: ERROR_INFORME_INCOMPLETO if citas.error else None
+        )),
+        mimetype='application/json'
+    )
+
+
+@api_bp.route('/citas/<int:id>')
+def ver_cita(id):
+    """Una cita con el nombre de su paciente y de su médico (?campos)"""
+    return _elemento(
+        id, CitaController.obtener_version_cita, CitaController.buscar_cita_por_id,
+        CAMPOS_CITA, f"No se encontró la cita con ID {id}"
+    )
+
+
+@api_bp.errorhandler(Exception)
+def error_api(e):
+    """
+    Los errores de la API se devuelven como JSON, no como la página de error HTML
+
+    El detalle de un error interno se registra en el servidor; el cliente solo
+    recibe un mensaje genérico.
+    """
+    if isinstance(e, HTTPException):
+        return _error(e.description, e.code)
+    print(f"Error en la API: {e}")
+    metricas.errores.incrementar(request.endpoint or 'desconocida', type(e).__name__)
+    return _error(ERROR_INTERNO, 500)
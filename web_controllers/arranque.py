@@ -0,0 +1,116 @@
+import os
+import time
+from jinja2 import FileSystemBytecodeCache
+from config import metricas
+
+# Carpeta de las plantillas compiladas, relativa a la aplicación ('' la desactiva)
+DIRECTORIO_BYTECODE = os.getenv('PLANTILLAS_CACHE_DIR', 'cache_plantillas')
+# Calentar cada proceso antes de que reciba tráfico (gunicorn y modo ASGI)
+CALENTAR = os.getenv('CALENTAR_WORKERS', '1') == '1'
+# Páginas que se piden al calentar: llenan las cachés de médicos y de tablas
+PAGINAS_CALENTAMIENTO = ('/', '/pacientes/', '/medicos/', '/citas/', '/citas/crear')
+
+
+def configurar_bytecode(app):
+    """
+    Guarda en disco las plantillas compiladas
+
+    Todos los procesos comparten la carpeta: una plantilla compilada por uno no
+    se vuelve a compilar en los demás ni al reiniciar. Cada archivo va asociado
+    a la suma de verificación del código fuente, así que editar una plantilla
+    la recompila. Debe llamarse antes del primer uso de app.jinja_env.
+
+    Returns:
+        str or None: Carpeta de la caché, o None si está desactivada o no se puede escribir
+    """
+    if not DIRECTORIO_BYTECODE:
+        return None
+    directorio = os.path.join(app.root_path, DIRECTORIO_BYTECODE)
+    try:
+        os.makedirs(directorio, exist_ok=True)
+        if not os.access(directorio, os.W_OK):
+            raise PermissionError(f"Sin permiso de escritura en {directorio}")
+    except OSError as e:
+        print(f"Caché de plantillas compiladas desactivada: {e}")
+        return None
+    app.jinja_options = {**app.jinja_options, 'bytecode_cache': FileSystemBytecodeCache(directorio)}
+    return directorio
+
+
+def precompilar_plantillas(app):
+    """
+    Compila todas las plantillas de la aplicación
+
+    Quedan en la caché en memoria del entorno de Jinja y, si está configurada,
+    en la caché de bytecode en disco.
+
+    Returns:
+        tuple: (plantillas compiladas, segundos)
+
+    Raises:
+        TemplateSyntaxError: Si alguna plantilla tiene errores
+    """
+    inicio = time.perf_counter()
+    nombres = app.jinja_env.list_templates(filter_func=lambda nombre: nombre.endswith('.html'))
+    for nombre in nombres:
+        app.jinja_env.get_template(nombre)
+    return len(nombres), time.perf_counter() - inicio
+
+
+def _abrir_conexion():
+    """Crea el pool de este proceso y comprueba una conexión"""
+    from config.database import DatabaseConnection
+    db = DatabaseConnection()
+    try:
+        cursor = db.get_cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+    finally:
+        db.release()
+
+
+def _pedir_paginas(app):
+    """Recorre las páginas principales y la búsqueda de pacientes"""
+    from controllers.paciente_controller import PacienteController
+    cliente = app.test_client()
+    for ruta in PAGINAS_CALENTAMIENTO:
+        cliente.get(ruta).close()
+    # Construye el índice de búsqueda si se usa el índice en memoria
+    PacienteController.sugerir_pacientes('a')
+
+
+def calentar(app):
+    """
+    Prepara un proceso antes de que reciba tráfico: plantillas, conexión a la
+    base de datos y cachés
+
+    Un paso que falla se informa y no impide arrancar; la primera petición que
+    lo necesite hará ese trabajo. Las peticiones y consultas del calentamiento
+    no cuentan en las métricas ni en el registro de consultas lentas.
+
+    Returns:
+        dict: Segundos de cada paso y en total
+    """
+    tiempos = {}
+    inicio = time.perf_counter()
+    pasos = (
+        ('plantillas', lambda: precompilar_plantillas(app)),
+        ('conexion', _abrir_conexion),
+        ('paginas', lambda: _pedir_paginas(app)),
+    )
+    with metricas.sin_registrar():
+        for nombre, paso in pasos:
+            comienzo = time.perf_counter()
+            try:
+                paso()
+            except Exception as e:
+                print(f"Error al calentar ({nombre}): {e}")
+            tiempos[nombre] = time.perf_counter() - comienzo
+    tiempos['total'] = time.perf_counter() - inicio
+    return tiempos
+
+
+def resumen(tiempos):
+    """Texto de una línea con los tiempos del calentamiento"""
+    pasos = ', '.join(f"{nombre} {segundos * 1000:.0f} ms" for nombre, segundos in tiempos.items() if nombre != 'total')
+    return f"listo en {tiempos['total'] * 1000:.0f} ms ({pasos})"
@@ -1,8 +1,12 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, Response, render_template, request, redirect, url_for, flash, stream_with_context, jsonify
 from controllers.cita_controller import CitaController
 from controllers.paciente_controller import PacienteController
 from controllers.medico_controller import MedicoController
-from forms.cita_forms import CitaForm, BusquedaFechaForm
+from controllers.exportacion_controller import ExportacionController, ERROR_INCOMPLETA
+from controllers.disponibilidad_controller import DisponibilidadController
+from forms.cita_forms import CitaForm, BusquedaFechaForm, BusquedaEspaciosForm
+from web_controllers.streaming import LecturaPorPartes, responder_por_partes
+from web_controllers import fragmentos
 from datetime import datetime
 
 cita_bp = Blueprint('citas', __name__)
@@ -10,28 +14,53 @@ cita_bp = Blueprint('citas', __name__)
 @cita_bp.route('/')
 def listar_citas():
     """Vista para listar citas"""
-    citas = CitaController.listar_citas()
-    return render_template('citas/listar.html', citas=citas)
+    cursor = request.args.get('cursor')
+    limite = request.args.get('limite')
+    # La tabla muestra nombres de pacientes y médicos: depende de las tres entidades
+    tabla = fragmentos.listado(
+        'citas/_tabla.html', 'citas',
+        lambda: CitaController.listar_citas_paginadas(cursor, limite),
+        (cursor, limite), ('cita', 'paciente', 'medico')
+    )
+    return render_template('citas/listar.html', tabla=tabla)
+
+def _opciones_formulario(form):
+    """
+    Completa lo que el formulario de cita necesita para mostrarse
+    
+    Solo se llama al renderizar (GET o POST con errores): guardar una cita no
+    carga ninguna lista. Los médicos se leen de la caché; si el buscador de
+    paciente no trae texto, se busca el paciente elegido para mostrar su nombre.
+    """
+    medicos = MedicoController.listar_medicos()
+    form.id_medico.choices = [(m.id, f"{m.nombre} - {m.especialidad}") for m in medicos]
+    if form.id_paciente.data and not form.paciente.data:
+        paciente = PacienteController.buscar_paciente_por_id(form.id_paciente.data)
+        if paciente:
+            form.paciente.data = str(paciente)
+    return medicos
 
 @cita_bp.route('/crear', methods=['GET', 'POST'])
 def crear_cita():
     """Vista para crear cita"""
-    # Obtener listas de pacientes y médicos para los selectores
-    pacientes = PacienteController.listar_pacientes()
-    medicos = MedicoController.listar_medicos()
+    form = CitaForm()
     
-    if not pacientes:
-        flash('No hay pacientes registrados. Registre un paciente primero.', 'warning')
-        return redirect(url_for('pacientes.crear_paciente'))
+    if request.method == 'GET':
+        # Basta con una fila para saber si hay pacientes registrados
+        if not PacienteController.listar_pacientes_paginados(None, 1).elementos:
+            flash('No hay pacientes registrados. Registre un paciente primero.', 'warning')
+            return redirect(url_for('pacientes.crear_paciente'))
         
-    if not medicos:
-        flash('No hay médicos registrados. Registre un médico primero.', 'warning')
-        return redirect(url_for('medicos.crear_medico'))
-    
-    form = CitaForm()
-    # Configurar opciones para los selectores
-    form.id_paciente.choices = [(p.id, f"{p.nombre} {p.apellido} (Cédula: {p.cedula})") for p in pacientes]
-    form.id_medico.choices = [(m.id, f"{m.nombre} - {m.especialidad}") for m in medicos]
+        # Datos sugeridos desde la búsqueda de huecos libres
+        form.id_medico.data = request.args.get('id_medico', type=int)
+        fecha_hora = request.args.get('fecha_hora')
+        if fecha_hora:
+            try:
+                fecha_obj = datetime.strptime(fecha_hora, '%d-%m-%Y %H:%M')
+                form.fecha.data = fecha_obj.date()
+                form.hora.data = fecha_obj.time()
+            except ValueError:
+                pass
     
     if form.validate_on_submit():
         # Combinar fecha y hora en un solo string
@@ -50,6 +79,10 @@ def crear_cita():
         else:
             flash(f'Error: {resultado}', 'danger')
     
+    if not _opciones_formulario(form):
+        flash('No hay médicos registrados. Registre un médico primero.', 'warning')
+        return redirect(url_for('medicos.crear_medico'))
+    
     return render_template('citas/crear.html', form=form)
 
 @cita_bp.route('/editar/<int:id>', methods=['GET', 'POST'])
@@ -60,18 +93,14 @@ def editar_cita(id):
         flash('Cita no encontrada', 'danger')
         return redirect(url_for('citas.listar_citas'))
     
-    # Obtener listas de pacientes y médicos para los selectores
-    pacientes = PacienteController.listar_pacientes()
-    medicos = MedicoController.listar_medicos()
-    
     form = CitaForm()
-    # Configurar opciones para los selectores
-    form.id_paciente.choices = [(p.id, f"{p.nombre} {p.apellido} (Cédula: {p.cedula})") for p in pacientes]
-    form.id_medico.choices = [(m.id, f"{m.nombre} - {m.especialidad}") for m in medicos]
     
     if request.method == 'GET':
         # Llenar el formulario con los datos actuales
         form.id_paciente.data = cita.id_paciente
+        # El nombre viene con la cita: no hace falta buscar el paciente
+        if cita.paciente:
+            form.paciente.data = f"{cita.paciente.nombre} {cita.paciente.apellido}"
         form.id_medico.data = cita.id_medico
         if cita.fecha_hora:
             form.fecha.data = cita.fecha_hora.date()
@@ -96,6 +125,7 @@ def editar_cita(id):
         else:
             flash(f'Error: {mensaje}', 'danger')
     
+    _opciones_formulario(form)
     return render_template('citas/editar.html', form=form, cita=cita)
 
 @cita_bp.route('/eliminar/<int:id>', methods=['POST'])
@@ -152,11 +182,116 @@ def citas_por_fecha():
         else:
             fecha_fin = None
         
-        citas = CitaController.buscar_citas_por_fecha(fecha_inicio, fecha_fin)
-        return render_template('citas/por_fecha.html', 
-                               citas=citas, 
-                               form=form, 
-                               fecha_inicio=fecha_inicio, 
-                               fecha_fin=fecha_fin)
-    
-    return render_template('citas/buscar_fecha.html', form=form)
\ No newline at end of file
+        # Las citas se leen y se envían por lotes mientras se genera la página;
+        # un error en la consulta sale de aquí, antes de enviar nada
+        citas = LecturaPorPartes(CitaController.iterar_citas_por_fecha(fecha_inicio, fecha_fin))
+        return responder_por_partes('citas/por_fecha.html', 
+                                    citas=citas, 
+                                    form=form, 
+                                    fecha_inicio=fecha_inicio, 
+                                    fecha_fin=fecha_fin)
+    
+    return render_template('citas/buscar_fecha.html', form=form)
+
+@cita_bp.route('/exportar')
+def exportar_citas():
+    """Descarga las citas filtradas en CSV o Excel sin cargarlas completas en memoria"""
+    formato = request.args.get('formato', 'csv')
+    if formato not in ExportacionController.FORMATOS:
+        flash(f'Formato de exportación no soportado: {formato}', 'danger')
+        return redirect(url_for('citas.listar_citas'))
+    
+    exito, citas = ExportacionController.preparar_citas(
+        request.args.get('fecha_inicio'),
+        request.args.get('fecha_fin'),
+        request.args.get('id_medico', type=int),
+        request.args.get('id_paciente', type=int)
+    )
+    if not exito:
+        flash(f'Error: {citas}', 'danger')
+        return redirect(url_for('citas.listar_citas'))
+    
+    if formato == 'csv':
+        # Se envía por partes mientras se leen las filas por lotes. La primera se
+        # lee antes de responder: un error inicial se informa en la página, y uno
+        # posterior deja una fila final de error en lugar de un CSV cortado sin aviso
+        try:
+            citas = LecturaPorPartes(citas)
+        except Exception as e:
+            flash(f'Error: {e}', 'danger')
+            return redirect(url_for('citas.listar_citas'))
+        cuerpo = stream_with_context(ExportacionController.generar_csv(
+            citas, error=lambda: ERROR_INCOMPLETA if citas.error else None
+        ))
+        mimetype = 'text/csv'
+    else:
+        try:
+            cuerpo = ExportacionController.generar_xlsx(citas)
+        except Exception as e:
+            flash(f'Error: {e}', 'danger')
+            return redirect(url_for('citas.listar_citas'))
+        mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    
+    return Response(
+        cuerpo,
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=citas.{formato}'}
+    )
+
+@cita_bp.route('/disponibilidad')
+def disponibilidad():
+    """Indica en JSON si un médico está libre a una hora (fecha_hora en DD-MM-YYYY HH:MM)"""
+    id_medico = request.args.get('id_medico', type=int)
+    fecha_hora = request.args.get('fecha_hora', '')
+    if id_medico is None:
+        return jsonify(disponible=False, mensaje="Debe indicar el médico"), 400
+    
+    disponible, mensaje = DisponibilidadController.verificar_disponibilidad(
+        id_medico, fecha_hora, request.args.get('excluir_id', type=int)
+    )
+    return jsonify(disponible=disponible, mensaje=mensaje)
+
+@cita_bp.route('/espacios', methods=['GET', 'POST'])
+def espacios_libres():
+    """Vista para buscar los primeros huecos libres de una especialidad"""
+    form = BusquedaEspaciosForm()
+    espacios = None
+    
+    if form.validate_on_submit():
+        exito, resultado = DisponibilidadController.buscar_espacios_libres(
+            form.especialidad.data,
+            form.fecha_inicio.data.strftime('%d-%m-%Y'),
+            form.fecha_fin.data.strftime('%d-%m-%Y') if form.fecha_fin.data else None,
+            form.duracion.data
+        )
+        if exito:
+            espacios = resultado
+        else:
+            flash(f'Error: {resultado}', 'danger')
+    
+    return render_template('citas/espacios.html', form=form, espacios=espacios)
+
+@cita_bp.route('/espacios/buscar')
+def buscar_espacios_libres():
+    """Devuelve en JSON los primeros huecos libres de una especialidad"""
+    limite = request.args.get('limite', type=int)
+    exito, resultado = DisponibilidadController.buscar_espacios_libres(
+        request.args.get('especialidad', ''),
+        request.args.get('fecha_inicio', ''),
+        request.args.get('fecha_fin'),
+        request.args.get('duracion', type=int),
+        min(limite or 20, 200)
+    )
+    if not exito:
+        return jsonify(error=resultado), 400
+    
+    return jsonify(espacios=[
+        {
+            'inicio': espacio.inicio.strftime('%d-%m-%Y %H:%M'),
+            'fin': espacio.fin.strftime('%d-%m-%Y %H:%M'),
+            'id_medico': espacio.medico.id,
+            'medico': espacio.medico.nombre,
+            'especialidad': espacio.medico.especialidad,
+        }
+        for espacio in resultado
+    ])
@@ -0,0 +1,82 @@
+import os
+import sys
+import time
+from flask import render_template
+from markupsafe import Markup
+from config.cache import CacheLRU
+from models import eventos
+
+# Caché de las tablas de los listados ya renderizadas (HTML)
+HABILITADA = os.getenv('FRAGMENTOS_HABILITADA', '1') == '1'
+cache = CacheLRU(
+    max_entradas=int(os.getenv('FRAGMENTOS_MAX_ENTRADAS', '256')),
+    # La clave lleva la versión de los datos, así que el TTL solo acota el
+    # desfase con cambios hechos fuera de la aplicación (o de otros servidores)
+    ttl=float(os.getenv('FRAGMENTOS_TTL', '300')),
+    max_bytes=int(os.getenv('FRAGMENTOS_MAX_MB', '32')) * 1024 * 1024,
+    tamano=lambda entrada: sys.getsizeof(entrada[0])
+)
+
+# Tiempo de renderizado evitado por los aciertos, en segundos
+_ahorro = [0.0]
+
+
+def listado(plantilla, nombre, cargar_pagina, clave, entidades):
+    """
+    Tabla de un listado paginado, renderizada o leída de la caché
+
+    La clave de caché combina la plantilla, la variante pedida (cursor y límite)
+    y la versión de los datos de las entidades que muestra la tabla; cualquier
+    crear, actualizar o eliminar de esas entidades cambia la versión, así que
+    nunca se sirve una tabla anterior a un cambio. En un acierto no se consulta
+    la base de datos ni se renderiza nada.
+
+    El fragmento no debe depender de la sesión ni del usuario (sin tokens CSRF
+    ni mensajes flash): se comparte entre todas las peticiones.
+
+    Args:
+        plantilla (str): Plantilla del fragmento
+        nombre (str): Nombre de la variable con los elementos de la página
+        cargar_pagina (callable): Devuelve la Pagina a mostrar
+        clave (tuple): Parámetros que distinguen la variante (cursor, límite)
+        entidades (tuple): Entidades cuyos datos aparecen en la tabla
+
+    Returns:
+        Markup: HTML de la tabla
+    """
+    if not HABILITADA:
+        return _renderizar(plantilla, nombre, cargar_pagina())[0]
+
+    # La versión se lee antes de consultar: si cambia mientras se renderiza, la
+    # entrada queda con la versión anterior y no se vuelve a servir
+    completa = (plantilla, clave, eventos.version(*entidades))
+    renderizada = []
+
+    def cargar():
+        pagina = cargar_pagina()
+        renderizada.append(_renderizar(plantilla, nombre, pagina))
+        # Las páginas vacías no se guardan: cuestan poco y pueden deberse a un error de lectura
+        return renderizada[0] if pagina.elementos else None
+
+    entrada = cache.obtener(completa, cargar)
+    if renderizada:
+        return renderizada[0][0]
+    _ahorro[0] += entrada[1]
+    return entrada[0]
+
+
+def _renderizar(plantilla, nombre, pagina):
+    """Renderiza el fragmento y mide cuánto tarda"""
+    inicio = time.perf_counter()
+    html = Markup(render_template(plantilla, **{nombre: pagina.elementos, 'pagina': pagina}))
+    return html, time.perf_counter() - inicio
+
+
+def estadisticas():
+    """
+    Obtiene los contadores de la caché de fragmentos
+
+    Returns:
+        dict: Contadores de la caché, bytes ocupados y segundos de renderizado ahorrados
+    """
+    return {**cache.estadisticas(), 'segundos_ahorrados': round(_ahorro[0], 6)}
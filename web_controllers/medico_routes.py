@@ -1,14 +1,21 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from controllers.medico_controller import MedicoController
 from forms.medico_forms import MedicoForm
+from web_controllers import fragmentos
 
 medico_bp = Blueprint('medicos', __name__)
 
 @medico_bp.route('/')
 def listar_medicos():
     """Vista para listar médicos"""
-    medicos = MedicoController.listar_medicos()
-    return render_template('medicos/listar.html', medicos=medicos)
+    cursor = request.args.get('cursor')
+    limite = request.args.get('limite')
+    tabla = fragmentos.listado(
+        'medicos/_tabla.html', 'medicos',
+        lambda: MedicoController.listar_medicos_paginados(cursor, limite),
+        (cursor, limite), ('medico',)
+    )
+    return render_template('medicos/listar.html', tabla=tabla)
 
 @medico_bp.route('/crear', methods=['GET', 'POST'])
 def crear_medico():
@@ -81,4 +88,9 @@ def buscar_por_especialidad():
                               busqueda=True, 
                               especialidad=especialidad)
     
-    return redirect(url_for('medicos.listar_medicos'))
\ No newline at end of file
+    return redirect(url_for('medicos.listar_medicos'))
+
+@medico_bp.route('/especialidades/sugerir')
+def sugerir_especialidades():
+    """Sugerencias de especialidad para autocompletar (JSON)"""
+    return jsonify(MedicoController.sugerir_especialidades(request.args.get('q', '')))
@@ -1,6 +1,7 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from controllers.paciente_controller import PacienteController
 from forms.paciente_forms import PacienteForm
+from web_controllers import fragmentos
 from datetime import datetime
 
 paciente_bp = Blueprint('pacientes', __name__)
@@ -8,8 +9,34 @@ paciente_bp = Blueprint('pacientes', __name__)
 @paciente_bp.route('/')
 def listar_pacientes():
     """Vista para listar pacientes"""
-    pacientes = PacienteController.listar_pacientes()
-    return render_template('pacientes/listar.html', pacientes=pacientes)
+    cursor = request.args.get('cursor')
+    limite = request.args.get('limite')
+    tabla = fragmentos.listado(
+        'pacientes/_tabla.html', 'pacientes',
+        lambda: PacienteController.listar_pacientes_paginados(cursor, limite),
+        (cursor, limite), ('paciente',)
+    )
+    return render_template('pacientes/listar.html', tabla=tabla)
+
+@paciente_bp.route('/busqueda')
+def buscar_pacientes():
+    """Vista para buscar pacientes por nombre, apellido, email o cédula"""
+    texto = request.args.get('q', '').strip()
+    if not texto:
+        return redirect(url_for('pacientes.listar_pacientes'))
+    pagina = PacienteController.buscar_pacientes(
+        texto,
+        request.args.get('cursor'),
+        request.args.get('limite')
+    )
+    return render_template('pacientes/listar.html', pacientes=pagina.elementos, pagina=pagina, busqueda=texto)
+
+@paciente_bp.route('/sugerir')
+def sugerir_pacientes():
+    """Sugerencias de paciente para el buscador del formulario de citas (JSON)"""
+    limite = request.args.get('limite', type=int)
+    pacientes = PacienteController.sugerir_pacientes(request.args.get('q', ''), min(limite or 10, 50))
+    return jsonify([{'id': paciente.id, 'texto': str(paciente)} for paciente in pacientes])
 
 @paciente_bp.route('/crear', methods=['GET', 'POST'])
 def crear_paciente():
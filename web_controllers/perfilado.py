@@ -0,0 +1,171 @@
+import hmac
+import os
+import random
+import threading
+import time
+from controllers.perfil_controller import PerfilController
+
+# Fracción de peticiones que se perfilan al azar (0 = ninguna)
+MUESTREO = float(os.getenv('PERFIL_MUESTREO', '0'))
+# Secreto que activa el perfil de una petición con la cabecera X-Perfilar y da
+# acceso a /admin/perfiles; sin él, las páginas de administración no se montan
+TOKEN = os.getenv('PERFIL_TOKEN', '')
+# 'cprofile' (biblioteca estándar) o 'pyinstrument' (paquete opcional)
+MOTOR = os.getenv('PERFIL_MOTOR', 'cprofile').lower()
+# Sin muestreo ni token el middleware no se instala y no cuesta nada
+HABILITADO = MUESTREO > 0 or bool(TOKEN)
+CABECERA = 'HTTP_X_PERFILAR'
+# Prefijo de las páginas de administración; sus peticiones no se perfilan
+RUTA_ADMIN = '/admin'
+
+
+def token_valido(valor):
+    """Compara con el token configurado en tiempo constante"""
+    return bool(TOKEN) and hmac.compare_digest((valor or '').encode(), TOKEN.encode())
+
+
+class _CapturaCProfile:
+    def __init__(self):
+        import cProfile
+        self.perfil = cProfile.Profile()
+
+    def iniciar(self):
+        self.perfil.enable()
+
+    def pausar(self):
+        self.perfil.disable()
+
+    def escribir(self, ruta):
+        self.perfil.dump_stats(ruta)
+
+
+class _CapturaPyinstrument:
+    def __init__(self):
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise Exception("El perfilado con pyinstrument requiere el paquete pyinstrument")
+        self.perfil = Profiler(async_mode='disabled')
+
+    def iniciar(self):
+        self.perfil.start()
+
+    def pausar(self):
+        self.perfil.stop()
+
+    def escribir(self, ruta):
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            archivo.write(self.perfil.output_html())
+
+
+_MOTORES = {'cprofile': _CapturaCProfile, 'pyinstrument': _CapturaPyinstrument}
+
+
+class MiddlewarePerfilado:
+    """
+    Middleware WSGI que perfila peticiones sueltas y guarda el perfil en disco
+
+    Una petición se perfila si trae la cabecera X-Perfilar con el token o si la
+    elige el muestreo. El perfil cubre la vista, las consultas y el renderizado de
+    la plantilla, también en las respuestas enviadas por partes (el perfilador se
+    pausa mientras el servidor escribe cada parte). Solo se perfila una petición a
+    la vez por proceso; si llega otra mientras tanto, se atiende sin perfil.
+    """
+
+    def __init__(self, app, muestreo=MUESTREO, motor=MOTOR):
+        if motor not in _MOTORES:
+            raise ValueError(f"Motor de perfilado no soportado: {motor}")
+        self.app = app
+        self.muestreo = muestreo
+        self.motor = motor
+        self._ocupado = threading.Lock()
+
+    def _elegida(self, environ):
+        """Decide si se perfila la petición"""
+        if environ.get('PATH_INFO', '').startswith(RUTA_ADMIN + '/'):
+            return False
+        cabecera = environ.get(CABECERA)
+        if cabecera is not None:
+            return token_valido(cabecera)
+        return self.muestreo > 0 and random.random() < self.muestreo
+
+    def __call__(self, environ, start_response):
+        if not self._elegida(environ) or not self._ocupado.acquire(blocking=False):
+            return self.app(environ, start_response)
+        try:
+            captura = _MOTORES[self.motor]()
+        except Exception as e:
+            self._ocupado.release()
+            print(f"Error al iniciar el perfilado: {e}")
+            return self.app(environ, start_response)
+
+        estado = []
+
+        def registrar_estado(status, headers, exc_info=None):
+            estado.append(status.split(' ', 1)[0])
+            return start_response(status, headers, exc_info)
+
+        inicio = time.perf_counter()
+        captura.iniciar()
+        try:
+            respuesta = self.app(environ, registrar_estado)
+        except Exception:
+            captura.pausar()
+            self._ocupado.release()
+            raise
+        captura.pausar()
+        return _RespuestaPerfilada(self, respuesta, captura, environ, estado, inicio)
+
+    def _terminar(self, captura, environ, estado, duracion):
+        """Guarda el perfil y libera el perfilador"""
+        try:
+            PerfilController.guardar_perfil(
+                environ.get('REQUEST_METHOD', 'GET'), environ.get('PATH_INFO', '/'),
+                estado[0] if estado else '', duracion * 1000, self.motor, captura.escribir
+            )
+        finally:
+            self._ocupado.release()
+
+
+class _RespuestaPerfilada:
+    """Recorre la respuesta con el perfilador activo y guarda el perfil al cerrarla"""
+
+    def __init__(self, middleware, respuesta, captura, environ, estado, inicio):
+        self.middleware = middleware
+        self.respuesta = respuesta
+        self.captura = captura
+        self.environ = environ
+        self.estado = estado
+        # Solo cuenta el tiempo con el perfilador activo, no las escrituras al cliente
+        self.duracion = time.perf_counter() - inicio
+        self._cerrada = False
+
+    def __iter__(self):
+        iterador = iter(self.respuesta)
+        while True:
+            inicio = time.perf_counter()
+            self.captura.iniciar()
+            try:
+                parte = next(iterador)
+            except StopIteration:
+                return
+            finally:
+                self.captura.pausar()
+                self.duracion += time.perf_counter() - inicio
+            yield parte
+
+    def close(self):
+        if self._cerrada:
+            return
+        self._cerrada = True
+        try:
+            if hasattr(self.respuesta, 'close'):
+                inicio = time.perf_counter()
+                self.captura.iniciar()
+                try:
+                    self.respuesta.close()
+                finally:
+                    self.captura.pausar()
+                    self.duracion += time.perf_counter() - inicio
+        finally:
+            self.middleware._terminar(self.captura, self.environ, self.estado, self.duracion)
@@ -0,0 +1,62 @@
+from itertools import islice
+from flask import Response, stream_template
+
+# Fragmentos de plantilla que se acumulan antes de enviar cada bloque al cliente
+TAMANO_BUFFER = 40
+
+
+class LecturaPorPartes:
+    """
+    Resultados que una plantilla recorre mientras se envía la respuesta
+
+    El primer elemento se lee al crear el objeto, antes de enviar nada: si la
+    consulta falla, la excepción sale de la vista y la atiende el manejador de
+    errores. Un fallo a mitad del recorrido ya no puede cambiar el estado HTTP;
+    el recorrido termina y el mensaje queda en error para que la plantilla
+    cierre la tabla y lo muestre.
+    """
+
+    def __init__(self, iterable):
+        self._iterador = iter(iterable)
+        self._primero = list(islice(self._iterador, 1))
+        self.error = None
+
+    def __iter__(self):
+        yield from self._primero
+        try:
+            yield from self._iterador
+        except Exception as e:
+            print(f"Error al leer los resultados de la respuesta por partes: {e}")
+            self.error = str(e)
+
+
+def _agrupar(fragmentos, tamano):
+    """Junta los fragmentos de la plantilla para enviar menos bloques y más grandes"""
+    bloque = []
+    for fragmento in fragmentos:
+        bloque.append(fragmento)
+        if len(bloque) >= tamano:
+            yield ''.join(bloque)
+            bloque = []
+    if bloque:
+        yield ''.join(bloque)
+
+
+def responder_por_partes(nombre, tamano_buffer=TAMANO_BUFFER, **contexto):
+    """
+    Renderiza una plantilla de forma incremental y la envía por partes
+
+    Las filas se generan mientras Jinja recorre los iteradores del contexto, de modo
+    que la respuesta empieza a enviarse antes de terminar la consulta y la memoria
+    no crece con el número de filas.
+
+    Args:
+        nombre (str): Ruta de la plantilla
+        tamano_buffer (int): Fragmentos agrupados en cada envío
+        **contexto: Variables para la plantilla
+
+    Returns:
+        Response: Respuesta con transferencia por partes (chunked)
+    """
+    # flask.stream_template mantiene el contexto de la petición mientras se genera
+    return Response(_agrupar(stream_template(nombre, **contexto), tamano_buffer), mimetype='text/html')
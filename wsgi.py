@@ -0,0 +1,10 @@
+"""
+Punto de entrada WSGI para producción
+
+Uso:
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+from web_app import create_app
+
+app = create_app()